@@ -1,6 +1,7 @@
 """
 This module contains the base class for all game assets and image processing.
 """
+import contextlib
 import io
 import os
 from pathlib import Path
@@ -10,22 +11,55 @@ from bs4 import BeautifulSoup
 from PyDictionary import PyDictionary
 
 
+# the names pickled by assets from before their metadata moved to the class
+ASSET_METADATA = frozenset({"emoji", "image_directory", "base_url", "query"})
+
+
 class GameAsset:
     """
     GameAsset is the base class for all game assets.
+    The emoji and where its image comes from are the same for every asset of a class, so they
+    are class attributes, and every subclass declares __slots__ so an asset doesn't carry a
+    __dict__ of its own.
     """
 
+    __slots__ = ("size", "path_to_image", "url_for_emoji", "image_name", "image_path")
+
+    emoji = "💩"
+    image_directory = "images"
+    base_url = "https://emojipedia.org"
+
     def __init__(self, size=50):
-        self.emoji = "💩"
         self.path_to_image = None
         self.size = size
-        self.image_directory = "images"
         self.url_for_emoji = None
-        self.base_url = "https://emojipedia.org"
-        self.query = self.__str__().lower()
         self.image_name = None
         self.image_path = None
 
+    @property
+    def query(self):
+        """
+        :return: the word the image of the asset is searched for with
+        """
+        return self.__str__().lower()
+
+    def __setstate__(self, state):
+        """
+        This method is called when a pickled asset is loaded.
+        Assets pickled before they had slots come as a dictionary that also holds the class
+        metadata, which is skipped, as are attributes the class no longer has.
+        :param state: a dictionary, or a tuple of a dictionary and the slots
+        :return:
+        """
+        if isinstance(state, tuple):
+            instance_state, slot_state = state
+            state = {**(instance_state or {}), **(slot_state or {})}
+        for name, value in state.items():
+            if name in ASSET_METADATA:
+                continue
+            with contextlib.suppress(AttributeError):
+                setattr(self, name, value)
+
     def process_image(self):
         """
         This method checks the if the directory for the image exists and if the image exists.
@@ -25,17 +25,25 @@ class DatabaseConnection:
     """
 
     _instance = None
+    # the database every connection in this process goes to, see use_database
+    database_name = "zoo.db"
 
     def __new__(cls, *args, **kwargs):
         if not cls._instance:
             print("Creating the database connection...")
-            cls._instance = super(DatabaseConnection, cls).__new__(cls, *args, **kwargs)
+            cls._instance = super(DatabaseConnection, cls).__new__(cls)
+            cls._instance.conn = None
         return cls._instance
 
-    def __init__(self, database_name="zoo.db"):
+    def __init__(self, database_name=None):
+        database_name = database_name or type(self).database_name
+        if self.conn is not None and self.connected_to == database_name:
+            # the connection is reused, an in-memory database only lives as long as it
+            return
         try:
             self.conn = sqlite3.connect(database_name)
             self.cur = self.conn.cursor()
+            self.connected_to = database_name
         except DatabaseError as e:
             print(e)
 
@@ -69,7 +77,9 @@ class DatabaseConnection:
         """
         This method closes the connection.
         """
-        self.conn.close()
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
 
     def drop(self, database_name="zoo.db"):
         """
@@ -127,8 +137,53 @@ class DatabaseConnection:
         self.cur.executemany(sql, _values)
         self.conn.commit()
 
+    def upsert_many(self, table_name, columns, rows):
+        """
+        This method inserts many rows, replacing the ones whose id already exists.
+        The created_dt of an existing row is kept.
+        :param table_name: the name of the table
+        :param columns: the columns of the table, the first one is the id
+        :param rows: the rows to write
+        """
+        updates = ",".join(
+            f"{column}=excluded.{column}"
+            for column in columns[1:]
+            if column != "created_dt"
+        )
+        sql = f"""
+            INSERT INTO {table_name} ({','.join(columns)}) VALUES ({','.join(['?' for _ in columns])})
+            ON CONFLICT({columns[0]}) DO UPDATE SET {updates}
+        """
+        self.cur.executemany(sql, rows)
+        self.conn.commit()
+
+    def delete_many(self, table_name, ids):
+        """
+        This method deletes many rows by id.
+        :param table_name: the name of the table
+        :param ids: the ids of the rows to delete
+        """
+        sql = f"""
+            DELETE FROM {table_name} WHERE id=?
+        """
+        self.cur.executemany(sql, [(_id,) for _id in ids])
+        self.conn.commit()
+
     def __del__(self):
-        self.conn.close()
+        self.close()
+
+
+def use_database(database_name):
+    """
+    Point every connection in this process at another database, e.g. a file per worker
+    process or ":memory:".
+    :param database_name: the path of the database file, or ":memory:"
+    :return: the connection
+    """
+    if DatabaseConnection._instance is not None:
+        DatabaseConnection._instance.close()
+    DatabaseConnection.database_name = database_name
+    return DatabaseConnection()
 
 
 class Table:
@@ -284,8 +339,6 @@ class Entity(Table):
         """
         This method loads the entity from the database.
         """
-        if not isinstance(id, str):
-            id = str(id)
         if table_name is None:
             table_name = cls.table_name
         if table_name in ("elephant", "zebra", "lion", "giraffe"):
@@ -0,0 +1,152 @@
+"""
+Integer ids for the entities of a zoo.
+Every zoo is given a number the first time it hands out an id, and its entities are numbered
+(zoo number << ID_BITS) | 1, 2, 3, ... in the order they are made. The ids are reserved from the
+id_allocators table a block at a time, so handing one out is a counter bump and a zoo never
+hands out the same id twice, even after it is loaded again.
+Things that don't belong to a zoo (home_id None) are numbered in memory under zoo number 0.
+"""
+import uuid
+
+from database import DatabaseConnection, Table
+
+# the low bits of an id count the entities of a zoo, the high bits are the zoo's number
+ID_BITS = 32
+# the number of ids reserved from the database at a time
+BLOCK_SIZE = 4096
+# ids are turned into UUIDs in this namespace for anything outside the zoo
+ID_NAMESPACE = uuid.UUID("6c1f4a2e-9d8b-5e37-a0c4-2b7d9e813f56")
+
+# the allocators of every zoo in this process, by zoo id
+ALLOCATORS = {}
+
+
+def allocator_schema():
+    """
+    :return: a dictionary of the schema of the id_allocators table
+    """
+    return {
+        "number": "INTEGER PRIMARY KEY AUTOINCREMENT",
+        "zoo_id": "TEXT UNIQUE NOT NULL",
+        "next_id": "INTEGER NOT NULL",
+    }
+
+
+class IdAllocator:
+    """
+    Hands out the ids of the entities of one zoo.
+    """
+
+    def __init__(self, zoo_id):
+        """
+        This method is called when the allocator is created.
+        :param zoo_id: the id of the zoo, None for things that aren't in one
+        """
+        self.zoo_id = zoo_id
+        self.number = 0
+        self.next = 1
+        # the ids below the limit are reserved, an allocator without a zoo never runs out
+        self.limit = 1 if zoo_id is not None else 1 << ID_BITS
+
+    def allocate(self):
+        """
+        :return: the next id of the zoo
+        """
+        if self.next >= self.limit:
+            self.reserve()
+        counter = self.next
+        self.next += 1
+        return (self.number << ID_BITS) | counter
+
+    def reserve(self):
+        """
+        Reserve the next block of ids of the zoo in the database.
+        :return:
+        """
+        self.adopt(*self.hand_out(BLOCK_SIZE))
+
+    def hand_out(self, size):
+        """
+        Reserve a block of ids of the zoo in the database without using it, e.g. for a worker
+        process that makes entities of the zoo.
+        :param size: the number of ids in the block
+        :return: a tuple of (zoo number, first id, id after the last one)
+        """
+        db = DatabaseConnection()
+        Table(table_name="id_allocators", columns_and_types=allocator_schema()).create_table()
+        row = db.conn.execute(
+            "SELECT number, next_id FROM id_allocators WHERE zoo_id = ?", (self.zoo_id,)
+        ).fetchone()
+        if row is None:
+            cursor = db.conn.execute(
+                "INSERT INTO id_allocators (zoo_id, next_id) VALUES (?, 1)", (self.zoo_id,)
+            )
+            row = cursor.lastrowid, 1
+        number, start = row
+        if start + size > 1 << ID_BITS:
+            raise ValueError(f"zoo {self.zoo_id} has run out of ids")
+        db.conn.execute(
+            "UPDATE id_allocators SET next_id = ? WHERE number = ?",
+            (start + size, number),
+        )
+        db.conn.commit()
+        return number, start, start + size
+
+    def adopt(self, number, start, stop):
+        """
+        Hand out the ids of a reserved block from now on.
+        :param number: the number of the zoo
+        :param start: the first id of the block
+        :param stop: the id after the last one
+        :return:
+        """
+        self.number, self.next, self.limit = number, start, stop
+
+    def remaining(self):
+        """
+        :return: how many ids are left before another block has to be reserved
+        """
+        return self.limit - self.next
+
+
+def allocator_for(zoo_id):
+    """
+    :return: the IdAllocator of a zoo, made on first use
+    """
+    if zoo_id not in ALLOCATORS:
+        ALLOCATORS[zoo_id] = IdAllocator(zoo_id)
+    return ALLOCATORS[zoo_id]
+
+
+def next_id(zoo_id):
+    """
+    :param zoo_id: the id of the zoo the entity belongs to, or None
+    :return: a new integer id
+    """
+    return allocator_for(zoo_id).allocate()
+
+
+def zoo_number(entity_id):
+    """
+    :return: the number of the zoo an id was handed out by
+    """
+    return entity_id >> ID_BITS
+
+
+def as_uuid(zoo_id, entity_id):
+    """
+    Turn the id of an entity into a UUID for use outside the zoo, the same entity always gets
+    the same UUID.
+    :param zoo_id: the id of the zoo the entity belongs to
+    :param entity_id: the id of the entity
+    :return: a uuid.UUID
+    """
+    return uuid.uuid5(ID_NAMESPACE, f"{zoo_id}/{entity_id}")
+
+
+def column_value(entity_id):
+    """
+    :return: the id as it is written to an id column, ids from before the integer ids were
+        UUIDs and are written as text
+    """
+    return entity_id if isinstance(entity_id, int) else str(entity_id)
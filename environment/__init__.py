@@ -1 +1 @@
-from . import base_elements, buildings, liquids
+from . import base_elements, buildings, engine, liquids
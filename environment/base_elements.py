@@ -3,17 +3,20 @@ This file contains the base elements of the environment.
 These are the elements that are not animals or plants or water or buildings.
 """
 
-import uuid
-
 from assets import GameAsset
 
 
 class Dirt(GameAsset):
     """
     This is the class for dirt.
+    The dirt of a zoo lives in its terrain layer, a Dirt put on the grid becomes dirt there.
     """
 
-    def __init__(self, position=None, home_id=None, id=str(uuid.uuid4())):
+    __slots__ = ("nutrients", "position", "home_id")
+
+    emoji = "🪨 "
+
+    def __init__(self, position=None, home_id=None):
         """
         This method is called when dirt is created.
         """
@@ -23,9 +26,7 @@ class Dirt(GameAsset):
         self.size = 1
         self.nutrients = 0
         self.position = position
-        self.emoji = "🪨 "
         self.home_id = home_id
-        self.id = id
 
     def __str__(self):
         """
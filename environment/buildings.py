@@ -1,30 +1,77 @@
 import contextlib
+import functools
 import io
 import itertools
 import os
 import pickle
-import random
 import sqlite3
 import time
 import uuid
 from dataclasses import dataclass, field
 import arrow
+import numpy as np
 import pandas as pd
 import database
-import environment.grid
+from database.ids import column_value
 from environment.base_elements import Dirt
-from environment.grid import Tile, create_tiles_table
+from environment.chunks import ChunkedGrid
+from environment.engine import ANIMAL, EMPTY, GridEngine
+from environment.fields import CachedField, LocalField
+from environment.grid import GridRow, Tile, create_tiles_table
 from environment.liquids import Water
+from environment.occupancy import OccupancyIndex
+from environment.paging import PAGE_BUDGET, ChunkStore, PagedChunkGrid
+from environment.registry import ZooRegistry
+from environment.rng import RandomService, service_for
+from environment.scheduler import Scheduler, takes_turns
+from environment.spatial import SpatialHash
+from environment.terrain import BARE, DIRT, WATER, TerrainLayer, make_terrain
+from environment.weather import INTENSITIES, RAIN_EFFECTS, rain_changes
 from organisms.dead_things import Corpse
 from organisms.plants import Bush, Grass, Tree
 import organisms
 
+# zoos with at least this many cells get a sparse, chunked grid unless told otherwise
+SPARSE_AREA = 1_000_000
+# the tables water and dirt were stored in, one row each, before the terrain layer
+LEGACY_TERRAIN_TABLES = ("water", "dirt")
 
-def make_blank_grid(height, width):
+
+def is_vacant(cell):
+    """
+    :return: True if nothing lives in the cell, i.e. it is empty or just dirt
+    """
+    return cell is None or isinstance(cell, Dirt)
+
+
+def cell_emoji(cell, terrain=None):
+    """
+    :param terrain: the terrain kind of the cell, shown when nothing is on it
+    :return: the emoji that represents a cell of the grid
+    """
+    if isinstance(cell, Tile):
+        cell = cell.type
+    if cell is None:
+        return Dirt.emoji if terrain == DIRT else "  "
+    return cell.emoji
+
+
+def is_sparse(height, width, sparse=None):
+    """
+    :param sparse: True or False to force it, None to decide by the area
+    :return: True if a zoo of this size should have a sparse, chunked grid
+    """
+    return height * width >= SPARSE_AREA if sparse is None else sparse
+
+
+def make_blank_grid(height, width, sparse=False):
     """
     This method creates a blank grid for the zoo.
+    :param sparse: make a ChunkedGrid, which allocates nothing until cells are set
     :return:
     """
+    if sparse:
+        return ChunkedGrid(height, width)
     return [[None for _ in range(height)] for _ in range(width)]
 
 
@@ -42,42 +89,307 @@ class Zoo:
     This is the class for the zoo.
     """
 
-    _instance = None
-
-    def __init__(self, height: int, width: int, id: str = None):
+    # the live zoos of the process, a zoo is saved before it is evicted
+    registry = ZooRegistry(on_evict=lambda zoo: zoo.persist_changes())
+    # cross-check the live vacancy count against a full scan of the grid
+    debug_occupancy = bool(os.environ.get("ZOO_DEBUG_OCCUPANCY"))
+
+    def __init__(
+        self,
+        height: int,
+        width: int,
+        id: str = None,
+        seed: int = None,
+        sparse: bool = None,
+        page_budget: int = None,
+    ):
         """
         This method is called when the zoo is created.
+        :param seed: seeds the random numbers of the zoo, None for a fresh seed
+        :param sparse: store the grid in chunks that are allocated on demand, None to decide
+            by the area of the zoo
+        :param page_budget: keep at most this many chunks in memory and page the rest to the
+            database, None to keep the whole grid in memory
         """
         now = arrow.now().isoformat()
-        self.full: bool = False
+        self.vacant_cells: int = 0
+        self.grid_version: int = 0
+        self._dirty_cells: dict = {}
+        self._emojis: list = None
+        self._departed: dict = {}
+        self.autosave: bool = True
+        self._terrain_written: bool = False
+        self.occupancy: OccupancyIndex = None
+        self.spatial: SpatialHash = None
+        self.flow_fields: dict = {}
+        # the snapshots of the intent/resolve model that are told what changed, see keep
+        self.snapshots: list = []
+        self.engine: GridEngine = None
+        self.terrain: TerrainLayer = None
+        self.scheduler: Scheduler = Scheduler()
         self.height: int = 0
         self.width: int = 0
+        self.page_budget: int = page_budget
+        self.sparse: bool = bool(page_budget) or is_sparse(height, width, sparse)
         self.id: str = str(uuid.uuid4()) if id is None else id
+        self.rng: RandomService = service_for(self.id, seed)
         self.csv_path: str = f"zoo_{self.id}.csv"
         self.created_dt: str = now
         self.updated_dt: str = now
         self.is_raining: bool = False
         self.water_sources: list = []
-        self.tiles_to_refresh: list = []
+        # the tiles an animal moved onto, by cell, see reprocess_tiles
+        self.tiles_to_refresh: dict = {}
         self.grid: list = []
         self.height = height
         self.width = width
         # grid is a matrix of the same size as the zoo
         # it contains the string representation of the animal at that position
-        self.grid = [[None for _ in range(self.width)] for _ in range(self.height)]
+        if self.page_budget:
+            self.grid = PagedChunkGrid(
+                self.height,
+                self.width,
+                ChunkStore(self.id, is_vacant, takes_turns),
+                budget=self.page_budget,
+                on_load=self._chunk_paged_in,
+                on_evict=self._chunk_paged_out,
+            )
+        elif self.sparse:
+            self.grid = ChunkedGrid(self.height, self.width)
+        else:
+            self.grid = [[None for _ in range(self.width)] for _ in range(self.height)]
         self.elapsed_turns: int = 0
         self.db = database.DatabaseConnection()
 
+    @property
+    def grid(self):
+        """
+        The grid of the zoo, every cell assignment is reported to _cell_changed.
+        """
+        return self._grid
+
+    @grid.setter
+    def grid(self, grid):
+        """
+        This method is called when the whole grid is replaced.
+        A sparse zoo keeps a ChunkedGrid, any other grid is copied into one.
+        The terrain layer is rebuilt from the dirt and water on the new grid.
+        """
+        if self.sparse:
+            if not isinstance(grid, ChunkedGrid):
+                grid = ChunkedGrid.from_rows(grid)
+            grid.on_change = None
+            self.terrain = make_terrain(grid.height, grid.width, sparse=True)
+            self._split_terrain(grid.resident_items(), lambda x, y: grid.set(x, y, None))
+            grid.on_change = self._cell_changed
+            self._grid = grid
+            # only the occupants of the chunks in memory of a paged grid take turns
+            cells = (thing for _, _, thing in grid.resident_items())
+        else:
+            self._grid = [
+                GridRow(row, index, self._cell_changed) for index, row in enumerate(grid)
+            ]
+            self.terrain = make_terrain(len(self._grid), len(grid[0]) if grid else 0)
+            self._split_terrain(
+                ((x, y, cell) for x, row in enumerate(self._grid) for y, cell in enumerate(row)),
+                lambda x, y: list.__setitem__(self._grid[x], y, None),
+            )
+            cells = (cell for row in self._grid for cell in row)
+        self.terrain.on_resize = self._terrain_resized
+        self.vacant_cells = self.count_vacant_cells()
+        self.grid_version += 1
+        self.scheduler = Scheduler(
+            cell.type if isinstance(cell, Tile) else cell for cell in cells
+        )
+        # anything derived from the old grid is rebuilt on demand
+        self._dirty_cells = {}
+        self._departed = {}
+        self.occupancy = None
+        self.spatial = None
+        self.flow_fields = {}
+        if self.engine is not None:
+            self.engine = self._pack_engine()
+
+    def _split_terrain(self, cells, clear):
+        """
+        This method moves the dirt on a new grid into the terrain layer and binds its water
+        to it.
+        :param cells: the (row, column, thing) of the cells of the grid
+        :param clear: a function that empties a cell of the grid without reporting it
+        :return:
+        """
+        for x, y, thing in list(cells):
+            if isinstance(thing, Dirt):
+                self.terrain.set(x, y, DIRT, thing.size)
+                clear(x, y)
+            elif isinstance(thing, Water):
+                self.terrain.bind(x, y, thing)
+
+    def _terrain_resized(self, x, y, size):
+        """
+        This method is called when water changes size in the terrain layer, e.g. when it is
+        drunk from, so the engine has the new size.
+        :return:
+        """
+        if self.engine is not None:
+            self.engine.size[x, y] = size
+
+    @property
+    def full(self):
+        """
+        The zoo is full when there are no empty or dirt cells left.
+        """
+        return self.vacant_cells == 0
+
+    def _cell_changed(self, x, y, old, new):
+        """
+        This method is called after any cell of the grid changes.
+        :param x: the row of the cell
+        :param y: the column of the cell
+        :param old: what was in the cell
+        :param new: what is in the cell now
+        :return:
+        """
+        self.vacant_cells += is_vacant(new) - is_vacant(old)
+        self.grid_version += 1
+        for snapshot in self.snapshots:
+            snapshot.keep(x, y, old)
+        self.scheduler.add(new.type if isinstance(new, Tile) else new)
+        for cells in self._dirty_cells.values():
+            cells.add((x, y))
+        if "persistence" in self._dirty_cells and getattr(old, "id", None) is not None:
+            self._departed[old.id] = old
+        if isinstance(old, Water):
+            self.terrain.unbind(x, y, old)
+        if isinstance(new, Water):
+            self.terrain.bind(x, y, new)
+        elif isinstance(new, Dirt):
+            self.terrain.set(x, y, DIRT, new.size)
+        if self.engine is not None:
+            self.engine.release_cell(x, y, old)
+            self.engine.pack_cell(x, y, new)
+            if new is None and self.terrain.kind_at(x, y) == DIRT:
+                self.engine.pack_dirt(x, y, self.terrain.size_at(x, y))
+        if self.occupancy is not None:
+            self.occupancy.remove(x, y, old)
+            self.occupancy.add(x, y, new)
+        if self.spatial is not None:
+            self.spatial.remove(x, y, old)
+            self.spatial.add(x, y, new)
+        if self.flow_fields:
+            self._stale_flow_fields(x, y, old, new)
+
+    def _chunk_paged_in(self, items):
+        """
+        This method is called after a chunk of a paged grid is read in, its occupants take
+        turns again and the indexes learn about them if they didn't know yet.
+        :param items: the (row, column, thing) of the occupants of the chunk
+        :return:
+        """
+        for x, y, thing in items:
+            thing = thing.type if isinstance(thing, Tile) else thing
+            self.scheduler.add(thing)
+            if isinstance(thing, Water):
+                self.terrain.bind(x, y, thing)
+            if self.occupancy is not None:
+                self.occupancy.add(x, y, thing)
+            if self.spatial is not None:
+                self.spatial.add(x, y, thing)
+            # the water was in the terrain all along, only the occupants are new to the fields
+            if self.flow_fields and not isinstance(thing, Water):
+                self._stale_flow_fields(x, y, None, thing)
+
+    def _chunk_paged_out(self, items):
+        """
+        This method is called after a chunk of a paged grid is written out, its occupants
+        are frozen until it is read in again.
+        The indexes keep what they know about the chunk, its occupants are still there.
+        :param items: the (row, column, thing) of the occupants of the chunk
+        :return:
+        """
+        for _, _, thing in items:
+            self.scheduler.discard(thing.type if isinstance(thing, Tile) else thing)
+
+    def set_cell(self, x, y, thing):
+        """
+        This method puts a thing in a cell of the grid.
+        :param x: the row of the cell
+        :param y: the column of the cell
+        :param thing: the thing to put in the cell
+        :return: the thing
+        """
+        self.grid[x][y] = thing
+        return thing
+
+    def clear_cell(self, x, y):
+        """
+        This method empties a cell of the grid.
+        :param x: the row of the cell
+        :param y: the column of the cell
+        :return: what was in the cell
+        """
+        old = self.grid[x][y]
+        self.grid[x][y] = None
+        return old
+
+    def pop_dirty_cells(self, consumer):
+        """
+        This method hands a consumer (persistence, rendering, a cache) the cells that
+        changed since it last asked.
+        :param consumer: the name of the consumer
+        :return: a set of (x, y) cells, or None on the first call or after the whole
+            grid was replaced, meaning every cell should be treated as changed
+        """
+        if consumer not in self._dirty_cells:
+            self._dirty_cells[consumer] = set()
+            return None
+        cells = self._dirty_cells[consumer]
+        self._dirty_cells[consumer] = set()
+        return cells
+
+    def holds(self, thing):
+        """
+        This method checks if a thing is on the grid at its own position.
+        :param thing: the thing
+        :return: True if the cell at the thing's position holds the thing, things in the
+            chunks of a paged grid that aren't in memory are frozen and not held
+        """
+        position = getattr(thing, "position", None)
+        try:
+            if isinstance(self._grid, PagedChunkGrid) and not self._grid.resident_at(
+                position[0], position[1]
+            ):
+                return False
+            return self.grid[position[0]][position[1]] is thing
+        except (TypeError, IndexError):
+            return False
+
+    def count_vacant_cells(self):
+        """
+        This method counts the empty or dirt cells by scanning the whole grid.
+        :return: the number of vacant cells
+        """
+        if isinstance(self._grid, ChunkedGrid):
+            return self._grid.count(is_vacant)
+        return sum(is_vacant(cell) for row in self._grid for cell in row)
+
     @classmethod
-    def load_instance(cls, zoo_id: str):
+    def load_instance(cls, zoo_id: str, sparse: bool = None, page_budget: int = None):
         """
-        This method loads a Zoo instance from the database.
+        This method returns the live Zoo instance of an id from the registry, loading it
+        from the database if it isn't live.
+        A zoo that keeps its grid in the chunks table is opened without reading its chunks,
+        they are paged in as they are used.
+        :param zoo_id: the id of the zoo, None for the zoo that was used last
+        :param sparse: give the zoo a sparse grid, None to decide by the area of the zoo
+        :param page_budget: page the grid of the zoo, None unless it already is
         """
         if not isinstance(zoo_id, str) and isinstance(zoo_id, Zoo):
             zoo_id = zoo_id.id
 
-        if cls._instance is not None:
-            return cls._instance
+        live = cls.registry.most_recent() if zoo_id is None else cls.registry.get(zoo_id)
+        if live is not None:
+            return live
         db = database.DatabaseConnection()
         conn = db.conn
         df = pd.read_sql_query(
@@ -89,45 +401,245 @@ class Zoo:
         # create a dictionary from the DataFrame
         zoo_dict = df.to_dict(orient="records")[0]
         # deserialize the string representations of the lists
-        grid = cls.get_all_zoos_things(
-            zoo_id=zoo_id, height=zoo_dict["height"], width=zoo_dict["width"]
-        )
+        sparse = is_sparse(zoo_dict["height"], zoo_dict["width"], sparse)
+        if page_budget is None and ChunkStore.has_chunks(zoo_id):
+            page_budget = PAGE_BUDGET
+        if page_budget is None:
+            grid = cls.get_all_zoos_things(
+                zoo_id=zoo_id,
+                height=zoo_dict["height"],
+                width=zoo_dict["width"],
+                sparse=sparse,
+            )
         if zoo_dict.get("id"):
             zoo = cls(
-                id=zoo_dict["id"], height=zoo_dict["height"], width=zoo_dict["width"]
+                id=zoo_dict["id"],
+                height=zoo_dict["height"],
+                width=zoo_dict["width"],
+                sparse=sparse,
+                page_budget=page_budget,
             )
         else:
-            zoo = cls(height=zoo_dict["height"], width=zoo_dict["width"])
-        zoo.grid = grid
+            zoo = cls(
+                height=zoo_dict["height"],
+                width=zoo_dict["width"],
+                sparse=sparse,
+                page_budget=page_budget,
+            )
+        if page_budget is None:
+            zoo.grid = grid
+        else:
+            # only the chunks with the most going on are read up front
+            zoo.grid.warm()
+        zoo.load_terrain()
         for key, value in zoo_dict.items():
             if key == "grid":
                 continue
             setattr(zoo, key, value)
+        # the zoo is what the database holds, its changes are tracked from here so it can be
+        # saved when it is evicted
+        zoo.pop_dirty_cells("persistence")
+        return cls.registry.add(zoo)
 
-        cls._instance = zoo
-        return zoo
+    @classmethod
+    def clear_instance(cls):
+        """
+        This method forgets every live zoo without saving them, so the next load_instance
+        reads from the database.
+        :return:
+        """
+        cls.registry.clear()
+
+    @classmethod
+    def invalidate(cls, zoo_id):
+        """
+        This method forgets the live zoo of an id without saving it, so the next
+        load_instance of it reads from the database.
+        :return: the zoo that was live, or None
+        """
+        return cls.registry.discard(zoo_id)
 
     def refresh_from_db(self):
         """
-        This method queries the database for the latest version of the zoo.
-        And updates the attributes of the instance.
+        This method reads the row of the zoo from the database and updates the attributes
+        of the instance from it.
+        The grid isn't read again, the live zoo is newer than its rows.
         :return:
         """
-        self._instance = None
-        self._instance = self.load_instance(zoo_id=self.id)
+        cursor = self.db.conn.execute("SELECT * FROM zoos WHERE id = ?", (self.id,))
+        row = cursor.fetchone()
+        if row is None:
+            return
+        for (key, *_), value in zip(cursor.description, row):
+            setattr(self, key, value)
+
+    def enable_engine(self):
+        """
+        This method switches on the array-backed grid engine.
+        The grid is packed once, after that every cell is packed as it changes and the
+        organisms on the grid read and write their stats in the arrays.
+        :return: the engine
+        """
+        self.engine = self._pack_engine()
+        return self.engine
+
+    def _pack_engine(self):
+        """
+        This method packs the grid and the dirt of the terrain layer into a new engine.
+        :return: the engine
+        """
+        engine = GridEngine.from_grid(self.grid)
+        engine.pack_terrain(self.terrain)
+        return engine
+
+    def sync_engine(self):
+        """
+        This method packs the grid into a new engine if the engine is enabled and the grid
+        changed size. Otherwise the engine is up to date, it is packed as the cells change.
+        :return:
+        """
+        if self.engine is None:
+            return
+        if (self.engine.height, self.engine.width) != (len(self.grid), len(self.grid[0])):
+            self.engine = self._pack_engine()
+
+    def refresh_occupancy(self):
+        """
+        This method rebuilds the per-type occupancy bitmaps from the grid.
+        :return: the occupancy index
+        """
+        self.occupancy = OccupancyIndex.from_grid(self.grid)
+        return self.occupancy
+
+    def occupancy_index(self):
+        """
+        This method returns the occupancy index, building it if it doesn't exist yet.
+        :return: the occupancy index
+        """
+        if self.occupancy is None or (
+            self.occupancy.height,
+            self.occupancy.width,
+        ) != (len(self.grid), len(self.grid[0])):
+            return self.refresh_occupancy()
+        return self.occupancy
+
+    def spatial_index(self):
+        """
+        This method returns the spatial hash of the animals and corpses, building it if it
+        doesn't exist yet. It is kept up to date as they move, are born and die.
+        :return: the SpatialHash
+        """
+        if self.spatial is None or (self.spatial.height, self.spatial.width) != (
+            len(self.grid),
+            len(self.grid[0]),
+        ):
+            self.spatial = SpatialHash.from_grid(self.grid)
+        return self.spatial
+
+    def empty_mask(self):
+        """
+        This method returns a boolean array-like of the empty cells of the grid, that can be
+        indexed with arrays of rows and columns.
+        The engine is switched on for a dense zoo, a sparse zoo looks the cells up in its chunks.
+        :return: the mask
+        """
+        if self.sparse:
+            return self.grid.empty_mask()
+        engine = self.engine if self.engine is not None else self.enable_engine()
+        return engine.kind == EMPTY
+
+    def get_flow_field(self, target_class):
+        """
+        This method returns the flow field to the nearest thing of a class (water, a kind of
+        food, corpses), which goes around the water in the way.
+        The field is kept while a thing of the class comes or goes, or the water changes, and
+        only the cells such a change could reach are worked out again. A dense zoo gets a
+        CachedField over the whole grid. A sparse zoo gets a LocalField, which only works out
+        the blocks of cells it is asked about and only sees the things near them.
+        :param target_class: the class of thing to head for
+        :return: the CachedField or LocalField
+        """
+        field = self.flow_fields.get(target_class)
+        if field is not None:
+            return field
+        sources = functools.partial(self._field_sources, target_class)
+        if self.sparse:
+            field = LocalField(len(self.grid), len(self.grid[0]), sources, passable=self._passable)
+        else:
+            field = CachedField(sources, passable=self._passable)
+        self.flow_fields[target_class] = field
+        return field
+
+    def _field_sources(self, target_class, window=None):
+        """
+        :param target_class: the class of thing a flow field heads for
+        :param window: the first row, last row + 1, first column and last column + 1 of the
+            cells to cover, the whole grid if None
+        :return: a bitmap of the cells of the window holding a thing of the class
+        """
+        if issubclass(target_class, Water):
+            return self.terrain.mask(WATER, window)
+        return self.occupancy_index().bitmap(target_class, window)
+
+    def _passable(self, window=None):
+        """
+        :return: a bitmap of the cells of a window the flow fields go through, every cell
+            but water
+        """
+        return ~self.terrain.mask(WATER, window)
+
+    def get_water_field(self):
+        """
+        This method returns the flow field to the nearest water.
+        :return: the water CachedField or LocalField
+        """
+        return self.get_flow_field(Water)
+
+    def _stale_flow_fields(self, x, y, old, new):
+        """
+        This method tells the flow fields a cell change makes out of date: the fields of the
+        classes of what left and what came, and every field when water came or went, since
+        the fields go around it.
+        :param x: the row of the cell
+        :param y: the column of the cell
+        :param old: what was in the cell
+        :param new: what is in the cell now
+        :return:
+        """
+        old = old.type if isinstance(old, Tile) else old
+        new = new.type if isinstance(new, Tile) else new
+        water_changed = isinstance(old, Water) or isinstance(new, Water)
+        for target_class, field in self.flow_fields.items():
+            if water_changed or isinstance(old, target_class) or isinstance(new, target_class):
+                field.forget(x, y)
+
+    def count_animals(self):
+        """
+        This method counts the living animals in the zoo.
+        :return: the number of animals
+        """
+        if self.engine is not None:
+            return self.engine.count(ANIMAL)
+        # holds can page chunks in, which registers their occupants
+        return sum(
+            isinstance(entity, organisms.animals.Animal) and self.holds(entity)
+            for entity in list(self.scheduler)
+        )
 
     def check_full(self):
         """
         This method checks if the zoo is full.
+        The vacancy count is kept up to date by every grid change, so this is O(1)
+        unless debug_occupancy is switched on.
+        :return: True if the zoo is full
         """
-        # check if there are any empty positions in the grid
-        max_capacity = self.height * self.width
-        for row in self.grid:
-            for cell in row:
-                # check if the cell is empty or Dirt
-                if cell is None or isinstance(cell, Dirt):
-                    max_capacity -= 1
-        self.full = max_capacity == 0
+        if self.debug_occupancy:
+            scanned = self.count_vacant_cells()
+            if scanned != self.vacant_cells:
+                raise ZooError(
+                    f"Vacancy count is {self.vacant_cells} but the grid has {scanned} vacant cells."
+                )
+        return self.full
 
     def __str__(self):
         """
@@ -142,47 +654,59 @@ class Zoo:
         param visualise: bool - whether to print the grid to the console or not (default: True).
         :return:
         """
-        self.reprocess_tiles()
-        self.refresh_from_db()
-
-        intensity, is_raining = self.weather()
-        self.fill_blanks(intensity)
-        self._instance = None
-        self._instance = self.load_instance(zoo_id=self.id)
+        self.advance_environment()
 
-        grid = []
+        grid = self.render_emojis()
 
-        # Clear the console screen
-
-        for row in self.grid:
-            row_emojis = []
-            for cell in row:
-                if isinstance(cell, Tile):
-                    row_emojis.append(cell.type.emoji)
-                else:
-                    row_emojis.append(cell.emoji)
-            grid.append(row_emojis)
-            if visualise:
-                print("".join([cell for cell in row_emojis]))
+        if visualise:
+            for row_emojis in grid:
+                print("".join(row_emojis))
 
         # Add a small delay to control the refresh rate (optional)
         # time.sleep(0.1)
 
         return grid
 
+    def advance_environment(self, verbose=True):
+        """
+        This method runs the end of turn housekeeping: tiles, weather and filling in blanks.
+        :param verbose: whether to print the weather
+        :return:
+        """
+        self.reprocess_tiles()
+        self.refresh_from_db()
+        self.sync_engine()
+
+        intensity, is_raining = self.weather(verbose=verbose)
+        if is_raining:
+            self.apply_rain(intensity)
+        self.fill_blanks(intensity)
+
+    def render_emojis(self):
+        """
+        This method returns the emoji for every cell of the grid.
+        Only the cells that changed since the last render are looked up again.
+        :return: a list of rows of emojis
+        """
+        dirty = self.pop_dirty_cells("render")
+        if dirty is None or self._emojis is None:
+            self._emojis = [
+                [cell_emoji(cell, self.terrain.kind_at(x, y)) for y, cell in enumerate(row)]
+                for x, row in enumerate(self.grid)
+            ]
+        else:
+            for x, y in dirty:
+                self._emojis[x][y] = cell_emoji(self.grid[x][y], self.terrain.kind_at(x, y))
+        return [row[:] for row in self._emojis]
+
     @staticmethod
-    def get_all_zoos_things(zoo_id: str, height: int, width: int):
+    def get_all_zoos_things(zoo_id: str, height: int, width: int, sparse: bool = False):
         """
         Load all the things in the zoo from the database.
+        :param sparse: load them into a ChunkedGrid
         :return: a list of all the things in the zoo
         """
-        zoo_tiles_schema = {
-            "id": "TEXT PRIMARY KEY",
-            "home_id": "TEXT REFERENCES zoos(id)",
-            "pickled_instance": "BLOB",
-            "created_dt": "TEXT",
-            "updated_dt": "TEXT",
-        }
+        zoo_tiles_schema = occupant_schema()
         try:
             animals = database.Entity.load_all(
                 "animals", zoo_id, schema=zoo_tiles_schema
@@ -193,6 +717,7 @@ class Zoo:
             plants = database.Entity.load_all("plants", zoo_id, schema=zoo_tiles_schema)
         except sqlite3.OperationalError:
             plants = []
+        # zoos from before the terrain layer kept a row for every water and dirt
         try:
             water_sources = database.Entity.load_all(
                 "water", zoo_id, schema=zoo_tiles_schema
@@ -209,7 +734,7 @@ class Zoo:
             "water_sources": water_sources,
             "dirt": dirt,
         }
-        grid = make_blank_grid(height, width)
+        grid = make_blank_grid(height, width, sparse=sparse)
         if not tiles:
             # if there are no tiles yet then there is no need to refresh the grid
             raise ZooError("No tiles found in the database.")
@@ -224,6 +749,9 @@ class Zoo:
                 tile = pickle.load(file_data)
                 if grid[tile.position[0]][tile.position[1]] is None:
                     grid[tile.position[0]][tile.position[1]] = tile
+                elif occupant_table(tile) is None:
+                    # water and dirt rows from before the terrain layer never cover an occupant
+                    continue
                 else:
                     current_tile = grid[tile.position[0]][tile.position[1]]
                     current_tile_from_db = database.Entity.load(
@@ -240,76 +768,144 @@ class Zoo:
                     grid[tile.position[0]][tile.position[1]] = most_recent_tile
         return grid
 
-    def weather(self):
-        self.is_raining = random.choice([True, False])
+    def weather(self, verbose=True):
+        rolls = self.rng.stream("weather")
+        self.is_raining = rolls.coin()
         intensity = None
         if self.is_raining:
-            intensities = {
-                "torrential": 0.01,
-                "heavy": 0.05,
-                "moderate": 0.9,
-                "mist": 0.1,
-            }
-            intensity = random.choices(
-                list(intensities.keys()), weights=list(intensities.values())
-            )[0]
-            print(f"It is raining {intensity}.")
+            intensity = rolls.weighted_choice(
+                list(INTENSITIES.keys()), list(INTENSITIES.values())
+            )
+            if verbose:
+                print(f"It is raining {intensity}.")
         return intensity, self.is_raining
 
-    def fill_blanks(self, is_raining=False):
+    def fill_blanks(self, is_raining=False, rolls=None, rows=None):
         """
-        This method fills any vacant tiles with dirt or grass.
+        This method fills the bare, empty cells with dirt, or with puddles when it is raining.
+        The dirt is laid in the terrain layer, no objects are made for it.
         param is_raining: if it is raining
+        :param rolls: the CellRolls for the sizes, the zoo's "fill" rolls for this turn if None
+        :param rows: the first row and the row after the last to fill, every row if None
         :return: None
         """
-
-        for i in range(self.width):
-            for j in range(self.height):
-                if self.grid[i][j] is None:
-                    if is_raining:
-                        self.make_puddle(i, j, random.randint(1, 10))
-                    else:
-                        self.grid[i][j] = Dirt()
-                        self.grid[i][j].position = (i, j)
-                        self.grid[i][j].size = random.randint(1, 10)
+        if self.sparse:
+            # the empty cells of a sparse zoo are bare ground, filling them would allocate
+            # every chunk
+            return
+        if rolls is None:
+            rolls = self.rng.cell_rolls("fill")
+        first, last = rows or (0, len(self.grid))
+        if self.engine is not None:
+            blanks = [(i, j) for i, j in self.engine.positions(EMPTY) if first <= i < last]
+        else:
+            blanks = [
+                (i, j)
+                for i in range(first, last)
+                for j in range(len(self.grid[i]))
+                if self.grid[i][j] is None and self.terrain.kind_at(i, j) == BARE
+            ]
+        if not blanks:
+            return
+        xs, ys = zip(*blanks)
+        sizes = rolls.rolls(1, 10, xs, ys)
+        if is_raining:
+            for (i, j), size in zip(blanks, sizes.tolist()):
+                self.make_puddle(i, j, size)
+            return
+        self.lay_dirt(xs, ys, sizes)
+
+    def lay_dirt(self, xs, ys, sizes):
+        """
+        This method lays dirt in the terrain layer of cells, under whatever is on them.
+        The cells are handed to the consumers of dirty cells, their occupants didn't change.
+        :param xs: the rows of the cells
+        :param ys: the columns of the cells
+        :param sizes: the sizes of the dirt
+        :return:
+        """
+        xs, ys, sizes = (np.atleast_1d(values) for values in (xs, ys, sizes))
+        self.terrain.fill(xs, ys, DIRT, sizes)
+        self.grid_version += 1
+        for cells in self._dirty_cells.values():
+            cells.update(zip(xs.tolist(), ys.tolist()))
+        if self.engine is not None:
+            empty = self.engine.kind[xs, ys] == EMPTY
+            self.engine.pack_dirt(xs[empty], ys[empty], sizes[empty])
 
     def make_puddle(self, x, y, water_size):
-        self.grid[x][y] = Water()
-        self.grid[x][y].position = (x, y)
-        self.grid[x][y].size = water_size
+        water = Water(position=(x, y), home_id=self.id, size=water_size)
+        self.set_cell(x, y, water)
 
-    def rain(self, i, j, intensity):
+    def apply_rain(self, intensity, rolls=None, rows=None):
+        """
+        This method rains on the whole grid at once.
+        The effects are worked out on the packed arrays of the engine, which is switched on
+        if it isn't yet, and only the cells that change are touched.
+        :param intensity: The intensity of the rain
+        :param rolls: the CellRolls of the rain, the zoo's "rain" rolls for this turn if None
+        :param rows: the first row and the row after the last to rain on, every row if None
+        :return: the number of cells that changed
+        """
+        if rolls is None:
+            rolls = self.rng.cell_rolls("rain")
+        first, last = rows or (0, len(self.grid))
+        if self.sparse:
+            # rain only falls on the occupied cells of a sparse zoo (that are in memory) and
+            # its dirt, one by one, since the packed arrays of the engine are as big as the
+            # whole zoo
+            cells = [(x, y) for x, y, _ in self.grid.resident_items() if first <= x < last]
+            xs, ys = self.terrain.cells(DIRT)
+            cells += [
+                (x, y)
+                for x, y in zip(xs.tolist(), ys.tolist())
+                if first <= x < last
+                and self.grid.resident_at(x, y)
+                and self.grid[x][y] is None
+            ]
+            return sum(bool(self.rain(x, y, intensity, rolls)) for x, y in cells)
+        engine = self.engine if self.engine is not None else self.enable_engine()
+        changed = 0
+        for effect, xs, ys, amounts in rain_changes(engine, intensity, rolls, rows):
+            for x, y, amount in zip(xs.tolist(), ys.tolist(), amounts.tolist()):
+                self._rain_on(x, y, effect, amount)
+            changed += len(xs)
+        return changed
+
+    def _rain_on(self, x, y, effect, amount):
         """
-        This method is called when it is raining.
+        This method applies one effect of the rain to one cell.
+        """
+        if effect == "puddle":
+            self.make_puddle(x, y, amount)
+            return
+        cell = self.grid[x][y]
+        water = cell.type if isinstance(cell, Tile) else cell
+        water.size += amount
+
+    def rain(self, i, j, intensity, rolls=None):
+        """
+        This method is called when it is raining on a single tile.
+        It rolls like apply_rain does for the tile, so the tile gets the same rain either way.
         :param i: The x coordinate of the tile
         :param j: The y coordinate of the tile
         :param intensity: The intensity of the rain
-        :return:
+        :param rolls: the CellRolls of the rain, the zoo's "rain" rolls for this turn if None
+        :return: True if the rain changed the tile
         """
-        if (
-            self.grid[i][j].__class__ == Water and intensity == "mist"
-        ) and random.choice([True, False]):
-            self.grid[i][j].size += random.randint(1, 10)
-        if (
-            self.grid[i][j].__class__ == Dirt and intensity == "moderate"
-        ) and random.choice([True, False]):
-            self.grid[i][j] = Water()
-            self.grid[i][j].position = (i, j)
-            self.grid[i][j].size = random.randint(1, 10)
-        if (
-            self.grid[i][j].__class__ == Dirt and intensity == "heavy"
-        ) and random.choice([True, False]):
-            self.make_puddle(i, j, 50)
-        if self.grid[i][j].__class__ == Dirt and intensity == "torrential":
-            self.make_puddle(i, j, 75)
-        if (
-            self.grid[i][j].__class__ == Grass and intensity == "torrential"
-        ) and random.choice([True, False]):
-            self.make_puddle(i, j, 20)
-        if (
-            self.grid[i][j].__class__ == Water and intensity == "torrential"
-        ) and random.choice([True, False]):
-            self.grid[i][j].size += random.randint(1, 20)
+        if rolls is None:
+            rolls = self.rng.cell_rolls("rain")
+        cell = self.grid[i][j]
+        kind = cell.__class__
+        if cell is None and self.terrain.kind_at(i, j) == DIRT:
+            kind = Dirt
+        for index, (target, chance, effect, low, high) in enumerate(
+            RAIN_EFFECTS.get(intensity, ())
+        ):
+            if kind == target and (chance >= 1 or rolls.uniform(i, j, 2 * index) < chance):
+                self._rain_on(i, j, effect, int(rolls.rolls(low, high, i, j, 2 * index + 1)))
+                return True
+        return False
 
     def tiles_neighbors(self, i, j):
         try:
@@ -365,38 +961,48 @@ class Zoo:
             "south_west": south_west_neighbour,
         }
 
-    def reprocess_tiles(self):
+    def refresh_tile(self, tile):
         """
-        This method reprocesses the tiles that have been changed.
-        :return:
+        This method queues the tile an animal moved onto to be put back on its cell.
+        :param tile: what was in the cell, nothing is queued for None
+        :return: the cell of the tile, or None
         """
-        new_tiles_to_refresh = []
-        tiles_to_remove = []
+        if tile is None:
+            return None
+        thing = tile.type if isinstance(tile, Tile) else tile
+        cell = (thing.position[0], thing.position[1])
+        self.tiles_to_refresh[cell] = thing
+        return cell
 
-        for tile in self.tiles_to_refresh:
+    def reprocess_tiles(self, cells=None):
+        """
+        This method puts the queued tiles back on their cells if an animal is on them.
+        A tile whose cell holds anything else is dropped, only the tiles of cells of a paged
+        grid that aren't in memory wait until they are.
+        :param cells: the (row, column) cells to reprocess, every queued cell if None
+        :return:
+        """
+        if cells is None:
+            cells = list(self.tiles_to_refresh)
+        for x, y in cells:
+            tile = self.tiles_to_refresh.pop((x, y), None)
             if tile is None:
-                tiles_to_remove.append(tile)
                 continue
+            if isinstance(self.grid, PagedChunkGrid) and not self.grid.resident_at(x, y):
+                self.tiles_to_refresh[x, y] = tile
+                continue
+            if isinstance(self.grid[x][y], organisms.animals.Animal):
+                self.set_cell(x, y, tile)
 
-            if isinstance(tile, Tile):
-                tile = tile.type
-
-            # Check if the cell is an instance of an Animal
-            if issubclass(
-                self.grid[tile.position[0]][tile.position[1]].__class__, organisms.animals.Animal
-            ):
-                # If it is, replace the tile with the animal
-                self.grid[tile.position[0]][tile.position[1]] = tile
-            else:
-                # If it isn't, add it to the list of tiles to refresh
-                new_tiles_to_refresh.append(tile)
-
-        # Remove any None values from self.tiles_to_refresh
-        for tile in tiles_to_remove:
-            self.tiles_to_refresh.remove(tile)
-
-        # Replace the old list with the new one
-        self.tiles_to_refresh = new_tiles_to_refresh
+    def forget_tiles(self, cells):
+        """
+        This method drops the tiles waiting to be put back on cells that something has since
+        moved into or been born on, so reprocess_tiles doesn't put the old tile over it.
+        :param cells: a set of (row, column) tuples
+        :return:
+        """
+        for cell in cells:
+            self.tiles_to_refresh.pop(tuple(cell), None)
 
     def save_instance(self):
         """
@@ -404,7 +1010,6 @@ class Zoo:
         :return:
         """
         load_id = self.id or None
-        self._instance = None
         columns_to_update = zoo_schema_as_dict()
         columns_to_update.pop("id")
         updated_values = {}
@@ -425,37 +1030,167 @@ class Zoo:
             return None
 
 
-def create_zoo(height=20, width=20, options=None, animals=None, plants=None):
+    def persist_changes(self):
+        """
+        This method writes the occupants of the cells that changed since the last call to
+        the database, and deletes the rows of things that have left the grid.
+        The first call writes every cell.
+        A paged zoo writes its changed chunks instead.
+        The terrain layer is written as one row when it changed.
+        :return: the number of rows written or deleted
+        """
+        terrain_rows = self.persist_terrain()
+        if self.page_budget:
+            return self.grid.flush() + terrain_rows
+        dirty = self.pop_dirty_cells("persistence")
+        if dirty is None and self.sparse:
+            dirty = [(x, y) for x, y, _ in self.grid.items()]
+        elif dirty is None:
+            dirty = itertools.product(range(len(self.grid)), range(len(self.grid[0])))
+        departed, self._departed = self._departed, {}
+
+        now = arrow.now().isoformat()
+        rows = {}
+        for x, y in dirty:
+            thing = self.grid[x][y]
+            if isinstance(thing, Tile):
+                thing = thing.type
+            if table_name := occupant_table(thing):
+                departed.pop(thing.id, None)
+                rows.setdefault(table_name, []).append(
+                    (column_value(thing.id), self.id, pickle.dumps(thing), now, now)
+                )
+        removed = {}
+        for thing in departed.values():
+            position = getattr(thing, "position", None)
+            still_here = position is not None and self.grid[position[0]][position[1]] is thing
+            if not still_here and (table_name := occupant_table(thing)):
+                removed.setdefault(table_name, []).append(column_value(thing.id))
+
+        schema = occupant_schema()
+        for table_name, values in rows.items():
+            database.Table(table_name=table_name, columns_and_types=schema).create_table()
+            self.db.upsert_many(table_name, tuple(schema), values)
+        for table_name, ids in removed.items():
+            self.db.delete_many(table_name, ids)
+        return sum(map(len, rows.values())) + sum(map(len, removed.values())) + terrain_rows
+
+    def persist_terrain(self):
+        """
+        This method writes the terrain layer to the database if it changed since it was last
+        written. The water and dirt rows a zoo had from before the terrain layer are deleted
+        the first time its terrain is written.
+        :return: the number of rows written
+        """
+        if not self.terrain.dirty:
+            return 0
+        self.terrain.save(self.id, self.db)
+        if not self._terrain_written:
+            for table_name in LEGACY_TERRAIN_TABLES:
+                with contextlib.suppress(sqlite3.OperationalError):
+                    self.db.conn.execute(
+                        f"DELETE FROM {table_name} WHERE home_id = ?", (self.id,)
+                    )
+            self.db.conn.commit()
+            self._terrain_written = True
+        return 1
+
+    def load_terrain(self):
+        """
+        This method reads the terrain layer of the zoo from the database, if it has one, and
+        puts water on the grid wherever the terrain is water.
+        :return:
+        """
+        stored = TerrainLayer.load(self.id, sparse=self.sparse)
+        if stored is None:
+            return
+        self.terrain.restore(stored)
+        xs, ys = stored.cells(WATER)
+        for x, y, size in zip(xs.tolist(), ys.tolist(), stored.sizes(xs, ys).tolist()):
+            if isinstance(self._grid, PagedChunkGrid) and not self._grid.resident_at(x, y):
+                # the water of a chunk that isn't in memory is bound when it is read in
+                continue
+            cell = self.grid[x][y]
+            if cell is None:
+                self.set_cell(x, y, Water(position=[x, y], home_id=self.id, size=size))
+            elif not isinstance(cell, Water):
+                self.terrain.clear(x, y)
+        self.terrain.dirty = False
+
+    def checkpoint(self):
+        """
+        This method saves the zoo and every grid change since the last checkpoint.
+        :return: the number of occupant rows written or deleted
+        """
+        self.save_instance()
+        return self.persist_changes()
+
+
+def create_zoo(
+    height=20,
+    width=20,
+    options=None,
+    animals=None,
+    plants=None,
+    process_images=True,
+    seed=None,
+    sparse=None,
+    density=1.0,
+    page_budget=None,
+):
     """
     This function creates the zoo.
+    :param process_images: whether to make sure every occupant has an image, headless
+        runs don't need them
+    :param seed: seeds the random numbers of the zoo, None for a fresh seed
+    :param sparse: give the zoo a sparse, chunked grid, None to decide by the area
+    :param density: the share of the cells that are stocked, the rest are left empty
+    :param page_budget: keep at most this many chunks of the zoo in memory, the rest are
+        paged to the database
     """
     # get the system width and height
 
     if options is None:
         options = ["animal", "plant", "water"]
-    zoo = Zoo(height=height, width=width)
+    zoo = Zoo(height=height, width=width, seed=seed, sparse=sparse, page_budget=page_budget)
+    rolls = zoo.rng.stream("create")
     zoo, zoo_entity = zoo_database_operations(zoo)
 
     water_limit = 0.1 * height * width
     water_placed = 0
     animal_instances = []
     plant_instances = []
-    water_instances = []
-    dirt_instances = []
 
     # fill the zoo with random animals
     empty_grid_tiles = zoo.height * zoo.width
-    for row, column in itertools.product(range(width), range(height)):
-        selection = random.choice(options)
+    cells = itertools.product(range(width), range(height))
+    if density < 1:
+        # only visit a random sample of the cells, a huge zoo is never walked cell by cell
+        picks = np.unique(rolls.rolls(0, height * width - 1, int(density * height * width)))
+        cells = ((cell // height, cell % height) for cell in picks.tolist())
+    for row, column in cells:
+        selection = rolls.choice(options)
         try:
             if selection == "animal":
                 empty_grid_tiles = make_animal(
-                    animal_instances, animals, column, empty_grid_tiles, row, zoo
+                    animal_instances,
+                    animals,
+                    column,
+                    empty_grid_tiles,
+                    row,
+                    zoo,
+                    process_images=process_images,
                 )
             elif selection == "plant":
                 if empty_grid_tiles > 0:
                     empty_grid_tiles = make_plant(
-                        column, empty_grid_tiles, plant_instances, plants, row, zoo
+                        column,
+                        empty_grid_tiles,
+                        plant_instances,
+                        plants,
+                        row,
+                        zoo,
+                        process_images=process_images,
                     )
             elif selection == "water" and not water_placed > water_limit:
                 if empty_grid_tiles > 0:
@@ -463,83 +1198,84 @@ def create_zoo(height=20, width=20, options=None, animals=None, plants=None):
                         column,
                         empty_grid_tiles,
                         row,
-                        water_instances,
                         water_placed,
                         zoo,
+                        process_images=process_images,
                     )
             else:
-                make_dirt(column, dirt_instances, row, zoo)
+                make_dirt(column, row, zoo, process_images=process_images)
         except IndexError:
             continue
-    insert_zoos_occupants(
-        animal_instances, dirt_instances, plant_instances, water_instances, zoo
-    )
+    if zoo.page_budget:
+        # a paged zoo keeps its occupants in its chunks
+        zoo.grid.flush()
+    else:
+        insert_zoos_occupants(animal_instances, plant_instances, zoo)
+    # the water and dirt are in the terrain layer, one row for the whole zoo
+    zoo.persist_terrain()
     zoo.save_instance()
     return zoo.load_instance(zoo.id)
 
 
-def insert_zoos_occupants(
-    animal_instances, dirt_instances, plant_instances, water_instances, zoo
-):
+def insert_zoos_occupants(animal_instances, plant_instances, zoo):
     db = database.DatabaseConnection()
     for key, value in {
         "animals": animal_instances,
         "plants": plant_instances,
-        "water": water_instances,
-        "dirt": dirt_instances,
     }.items():
         if value:
             batch_insert(key, value, zoo, db)
 
 
-def make_dirt(column, dirt_instances, row, zoo):
-    dirt_id = str(uuid.uuid4())
-    dirt = Dirt(position=[row, column], home_id=zoo.id, id=dirt_id)
-    dirt.process_image()
-    zoo.grid[row][column] = dirt
-    tile = environment.grid.Tile(position=[row, column], home_id=zoo.id, _type=dirt)
-    zoo.tiles_to_refresh.append(tile)
-    dirt_instances.append(dirt)
+def make_dirt(column, row, zoo, process_images=True):
+    if process_images:
+        Dirt(position=[row, column], home_id=zoo.id).process_image()
+    # dirt is only terrain, it is under whatever comes to the cell later
+    zoo.lay_dirt(row, column, 1)
 
 
-def make_water(column, empty_grid_tiles, row, water_instances, water_placed, zoo):
+def make_water(
+    column,
+    empty_grid_tiles,
+    row,
+    water_placed,
+    zoo,
+    process_images=True,
+):
     empty_grid_tiles -= 1
-    water_id = str(uuid.uuid4())
-    water = Water(home_id=zoo.id, position=[row, column], id=water_id)
-    water.process_image()
-    zoo.grid[row][column] = water
+    water = Water(home_id=zoo.id, position=[row, column])
+    if process_images:
+        water.process_image()
+    zoo.set_cell(row, column, water)
     water_placed += 1
-    tile = environment.grid.Tile(position=[row, column], home_id=zoo.id, _type=water)
-    zoo.tiles_to_refresh.append(tile)
-    water_instances.append(water)
     return empty_grid_tiles, water_placed
 
 
-def make_plant(column, empty_grid_tiles, plant_instances, plants, row, zoo):
+def make_plant(
+    column, empty_grid_tiles, plant_instances, plants, row, zoo, process_images=True
+):
     empty_grid_tiles -= 1
-    plant = random.choice(plants)
+    plant = zoo.rng.stream("create").choice(plants)
     plant = plant(home_id=zoo.id)
-    plant.process_image()
+    if process_images:
+        plant.process_image()
     plant.position = [row, column]
-    zoo.grid[row][column] = plant
-    tile = environment.grid.Tile(position=[row, column], home_id=zoo.id, _type=plant)
-    zoo.tiles_to_refresh.append(tile)
+    zoo.set_cell(row, column, plant)
     plant_instances.append(plant)
     return empty_grid_tiles
 
 
-def make_animal(animal_instances, animals, column, empty_grid_tiles, row, zoo):
+def make_animal(
+    animal_instances, animals, column, empty_grid_tiles, row, zoo, process_images=True
+):
     if empty_grid_tiles > 0:
         empty_grid_tiles -= 1
-        animal = random.choice(animals)
+        animal = zoo.rng.stream("create").choice(animals)
         animal = animal(home_id=zoo.id)
-        animal.process_image()
+        if process_images:
+            animal.process_image()
         animal.position = [row, column]
-        zoo.grid[row][column] = animal
-        tile = environment.grid.Tile(
-            position=[row, column], home_id=zoo.id, _type=animal
-        )
-        zoo.tiles_to_refresh.append(tile)
+        zoo.set_cell(row, column, animal)
         animal_instances.append(animal)
     return empty_grid_tiles
 
@@ -559,9 +1295,11 @@ def zoo_database_operations(zoo):
         columns_and_types=columns_and_types,
     )
     inserted_zoo = zoo_entity.insert()
-    zoo = zoo.load_instance(inserted_zoo["id"])
+    zoo = zoo.load_instance(
+        inserted_zoo["id"], sparse=zoo.sparse, page_budget=zoo.page_budget
+    )
     tile_schema = {
-        "id": "TEXT PRIMARY KEY",
+        "id": "INTEGER PRIMARY KEY",
         "occupied": "BOOLEAN",
         "position": "TEXT",
         "home_id": "TEXT",
@@ -587,6 +1325,34 @@ def zoo_schema_as_dict():
     }
 
 
+def occupant_schema():
+    """
+    :return: a dictionary of the schema shared by the animals and plants tables, and the water
+        and dirt tables of zoos from before the terrain layer
+    """
+    return {
+        "id": "INTEGER PRIMARY KEY",
+        "home_id": "TEXT REFERENCES zoos(id)",
+        "pickled_instance": "BLOB",
+        "created_dt": "TEXT",
+        "updated_dt": "TEXT",
+    }
+
+
+def occupant_table(thing):
+    """
+    :return: the name of the table a thing is stored in, or None if it isn't stored
+    """
+    if isinstance(thing, Tile):
+        thing = thing.type
+    if isinstance(thing, organisms.animals.Animal):
+        return "animals"
+    if isinstance(thing, organisms.plants.Plant):
+        return "plants"
+    # water and dirt are stored with the terrain layer
+    return None
+
+
 def create_zoo_table(columns_and_types):
     zoo_table = database.Table(table_name="zoos", columns_and_types=columns_and_types)
     zoo_table.create_table()
@@ -594,19 +1360,13 @@ def create_zoo_table(columns_and_types):
 
 def batch_insert(table_name, zoo_list, zoo, db):
     # create the water
-    _schema = {
-        "id": "TEXT PRIMARY KEY",
-        "home_id": "TEXT REFERENCES zoos(id)",
-        "pickled_instance": "BLOB",
-        "created_dt": "TEXT",
-        "updated_dt": "TEXT",
-    }
+    _schema = occupant_schema()
     table = database.Table(table_name=table_name, columns_and_types=_schema)
     batch = []
     table.create_table()
     for item in zoo_list:
         # pickle the water
-        _id = str(item.id)
+        _id = column_value(item.id)
         _pickle = pickle.dumps(item)
         _entity = database.Entity(
             table_name=table_name,
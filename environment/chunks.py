@@ -0,0 +1,384 @@
+"""
+A sparse, chunked grid for huge zoos that are mostly empty.
+The grid is cut into square chunks that are only allocated the first time one of their cells
+is set to something other than the fill of the grid. A chunk whose cells are all the same is
+stored as that single value, a chunk with a few things in it as a dictionary of those cells,
+and only a crowded chunk as a full list, so memory grows with the occupied cells rather than
+the area.
+The grid looks like the list of rows the rest of the zoo expects: grid[x][y] reads and writes
+a cell, len(grid) is the height and len(grid[0]) the width.
+"""
+import numpy as np
+
+CHUNK_SIZE = 64
+# a chunk keeps its cells in a dictionary until more than this share of them is set
+CROWDED = 0.25
+
+
+class Chunk:
+    """
+    A square block of cells, addressed by their offset (row * size + column) in the chunk.
+    The cells are None while they all hold the fill value, a dictionary of the offsets that
+    hold something else while there are few of them, and a list of every cell after that.
+    """
+
+    __slots__ = ("size", "fill", "cells")
+
+    def __init__(self, size, fill=None):
+        """
+        This method is called when a chunk is created.
+        :param size: the number of rows and columns of the chunk
+        :param fill: the value of every cell that was not set
+        """
+        self.size = size
+        self.fill = fill
+        self.cells = None
+
+    @property
+    def uniform(self):
+        """
+        :return: True if every cell of the chunk holds the fill value
+        """
+        return self.cells is None
+
+    def get(self, offset):
+        """
+        :return: the value of a cell
+        """
+        if self.cells is None:
+            return self.fill
+        if isinstance(self.cells, dict):
+            return self.cells.get(offset, self.fill)
+        return self.cells[offset]
+
+    def set(self, offset, value):
+        """
+        Set a cell, moving the cells to a list once the chunk gets crowded.
+        :return:
+        """
+        if self.cells is None:
+            if value is self.fill:
+                return
+            self.cells = {}
+        if isinstance(self.cells, dict):
+            if value is self.fill:
+                self.cells.pop(offset, None)
+                return
+            self.cells[offset] = value
+            if len(self.cells) > CROWDED * self.size * self.size:
+                cells = [self.fill] * (self.size * self.size)
+                for key, thing in self.cells.items():
+                    cells[key] = thing
+                self.cells = cells
+            return
+        self.cells[offset] = value
+
+    def things(self):
+        """
+        :return: tuples of (offset, value) of the cells that don't hold the fill value
+        """
+        if self.cells is None:
+            return []
+        if isinstance(self.cells, dict):
+            return sorted(self.cells.items())
+        return [(offset, cell) for offset, cell in enumerate(self.cells) if cell is not self.fill]
+
+    def count(self, predicate, area):
+        """
+        Count the cells of the chunk a predicate is true for.
+        :param predicate: a function of a cell's value
+        :param area: the number of cells of the chunk that are on the grid
+        :return: the number of cells
+        """
+        things = self.things()
+        total = sum(predicate(thing) for _, thing in things)
+        if predicate(self.fill):
+            total += area - len(things)
+        return total
+
+    def compact(self):
+        """
+        Turn a chunk whose cells all hold the same value back into a uniform one.
+        :return: True if the chunk is uniform
+        """
+        if isinstance(self.cells, dict) and not self.cells:
+            self.cells = None
+        elif isinstance(self.cells, list):
+            first = self.cells[0]
+            if all(cell is first for cell in self.cells):
+                self.fill, self.cells = first, None
+        return self.cells is None
+
+
+class ChunkedRow:
+    """
+    A view of one row of a ChunkedGrid that behaves like a row of a list grid.
+    """
+
+    __slots__ = ("grid", "index")
+
+    def __init__(self, grid, index):
+        self.grid = grid
+        self.index = index
+
+    def __len__(self):
+        return self.grid.width
+
+    def __getitem__(self, column):
+        return self.grid.get(self.index, column)
+
+    def __setitem__(self, column, value):
+        self.grid.set(self.index, column, value)
+
+    def __iter__(self):
+        for column in range(self.grid.width):
+            yield self.grid.get(self.index, column)
+
+
+class EmptyMask:
+    """
+    A boolean array-like of the empty cells of a ChunkedGrid, that can be indexed with arrays
+    of rows and columns without building the whole array.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.shape = (grid.height, grid.width)
+
+    def __getitem__(self, cells):
+        xs, ys = np.broadcast_arrays(*cells)
+        return np.fromiter(
+            (self.grid.get(x, y) is None for x, y in zip(xs.ravel().tolist(), ys.ravel().tolist())),
+            dtype=bool,
+            count=xs.size,
+        ).reshape(xs.shape)
+
+
+class ChunkedGrid:
+    """
+    A grid of height x width cells stored in chunks that are allocated on demand.
+    """
+
+    def __init__(self, height, width, fill=None, chunk_size=CHUNK_SIZE, on_change=None):
+        """
+        This method is called when the grid is created.
+        :param height: the number of rows
+        :param width: the number of columns
+        :param fill: the value of every cell that was never set, e.g. None for bare ground
+        :param chunk_size: the number of rows and columns of a chunk
+        :param on_change: called with (x, y, old, new) after a cell changes
+        """
+        self.height = height
+        self.width = width
+        self.fill = fill
+        self.chunk_size = chunk_size
+        self.on_change = on_change
+        self.chunks = {}
+
+    @classmethod
+    def from_rows(cls, rows, fill=None, chunk_size=CHUNK_SIZE):
+        """
+        Build a chunked grid from a list of rows.
+        :param rows: the rows of cells
+        :return: the grid
+        """
+        rows = list(rows)
+        grid = cls(len(rows), len(rows[0]) if rows else 0, fill=fill, chunk_size=chunk_size)
+        for x, row in enumerate(rows):
+            for y, cell in enumerate(row):
+                if cell is not fill:
+                    grid.set(x, y, cell)
+        return grid
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += self.height
+        if not 0 <= row < self.height:
+            raise IndexError("grid row out of range")
+        return ChunkedRow(self, row)
+
+    def __iter__(self):
+        for row in range(self.height):
+            yield ChunkedRow(self, row)
+
+    def _locate(self, x, y):
+        """
+        :return: the key of the chunk a cell is in and the cell's place within it
+        """
+        if x < 0:
+            x += self.height
+        if y < 0:
+            y += self.width
+        if not (0 <= x < self.height and 0 <= y < self.width):
+            raise IndexError("grid cell out of range")
+        size = self.chunk_size
+        return (x // size, y // size), (x % size) * size + y % size
+
+    def get(self, x, y):
+        """
+        :return: the value of the cell at (x, y)
+        """
+        key, offset = self._locate(x, y)
+        chunk = self._chunk(key)
+        return self.fill if chunk is None else chunk.get(offset)
+
+    def set(self, x, y, value):
+        """
+        Set the cell at (x, y), allocating its chunk if it doesn't exist yet.
+        :return:
+        """
+        key, offset = self._locate(x, y)
+        chunk = self._chunk(key)
+        if chunk is None:
+            if value is self.fill:
+                return
+            chunk = self._allocate(key)
+        old = chunk.get(offset)
+        chunk.set(offset, value)
+        self._changed(key)
+        if old is not value and self.on_change is not None:
+            self.on_change(x % self.height, y % self.width, old, value)
+
+    def _chunk(self, key):
+        """
+        :return: the chunk with the given key, or None if it was never allocated
+        """
+        return self.chunks.get(key)
+
+    def _allocate(self, key):
+        """
+        :return: a new chunk for the given key
+        """
+        chunk = self.chunks[key] = Chunk(self.chunk_size, self.fill)
+        return chunk
+
+    def _changed(self, key):
+        """
+        This method is called after a cell of a chunk was set.
+        :return:
+        """
+
+    def keys(self):
+        """
+        :return: the keys of the allocated chunks in order
+        """
+        return sorted(self.chunks)
+
+    def chunk_bounds(self, key):
+        """
+        :return: the first row, last row + 1, first column and last column + 1 of a chunk
+        """
+        size = self.chunk_size
+        x0, y0 = key[0] * size, key[1] * size
+        return x0, min(x0 + size, self.height), y0, min(y0 + size, self.width)
+
+    def chunk_area(self, key):
+        """
+        :return: the number of cells of a chunk that are on the grid
+        """
+        x0, x1, y0, y1 = self.chunk_bounds(key)
+        return (x1 - x0) * (y1 - y0)
+
+    def items(self):
+        """
+        Walk the cells that hold something other than the fill of the grid.
+        :return: tuples of (row, column, thing)
+        """
+        return self._walk(self.keys())
+
+    def resident_items(self):
+        """
+        Walk the cells of the chunks in memory that hold something other than the fill.
+        :return: tuples of (row, column, thing)
+        """
+        return self._walk(sorted(self.chunks))
+
+    def items_in_rows(self, start, end):
+        """
+        Walk the cells of the rows start to end that hold something other than the fill of
+        the grid, only the chunks those rows cross are looked at.
+        :return: tuples of (row, column, thing)
+        """
+        first, last = start // self.chunk_size, (end - 1) // self.chunk_size
+        for x, y, thing in self._walk([key for key in self.keys() if first <= key[0] <= last]):
+            if start <= x < end:
+                yield x, y, thing
+
+    def resident_at(self, x, y):
+        """
+        :return: True if the chunk of the cell at (x, y) is in memory or was never allocated
+        """
+        return True
+
+    def _walk(self, keys):
+        """
+        Walk the cells of some chunks that hold something other than the fill of the grid.
+        :param keys: the keys of the chunks
+        :return: tuples of (row, column, thing)
+        """
+        for key in keys:
+            yield from self.chunk_items(key, self._chunk(key))
+
+    def chunk_items(self, key, chunk):
+        """
+        Walk the cells of a chunk that hold something other than the fill of the grid.
+        :param key: the key of the chunk
+        :param chunk: the chunk
+        :return: tuples of (row, column, thing)
+        """
+        size = self.chunk_size
+        x0, x1, y0, y1 = self.chunk_bounds(key)
+        if chunk.uniform:
+            if chunk.fill is not self.fill:
+                for x in range(x0, x1):
+                    for y in range(y0, y1):
+                        yield x, y, chunk.fill
+            return
+        for offset, thing in chunk.things():
+            yield x0 + offset // size, y0 + offset % size, thing
+
+    def count(self, predicate):
+        """
+        Count the cells a predicate is true for, uniform chunks and the never set cells are
+        checked once each.
+        :param predicate: a function of a cell's value
+        :return: the number of cells
+        """
+        total = 0
+        allocated = 0
+        for key in self.keys():
+            area = self.chunk_area(key)
+            allocated += area
+            total += self._chunk(key).count(predicate, area)
+        if predicate(self.fill):
+            total += self.height * self.width - allocated
+        return total
+
+    def compact(self):
+        """
+        Turn chunks that have become uniform back into a single value, and drop the chunks
+        that only hold the fill of the grid.
+        :return: the number of chunks freed
+        """
+        freed = 0
+        for key, chunk in list(self.chunks.items()):
+            if chunk.compact() and chunk.fill is self.fill:
+                self._free(key)
+                freed += 1
+        return freed
+
+    def _free(self, key):
+        """
+        Forget a chunk that only holds the fill of the grid.
+        :return:
+        """
+        del self.chunks[key]
+
+    def empty_mask(self):
+        """
+        :return: an EmptyMask of the cells that hold nothing
+        """
+        return EmptyMask(self)
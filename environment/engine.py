@@ -0,0 +1,241 @@
+"""
+An optional array-backed engine for the zoo grid.
+The grid of objects stays the public API, the engine packs every cell in typed
+NumPy arrays so that whole-grid questions (how many cells are empty, where is
+all the water, which animals are starving) can be answered with vector
+operations instead of walking the grid cell by cell.
+An organism or corpse put in a cell is bound to it: its packed stats are read
+from and written to the arrays (see organisms.species.PackedStat), so the
+arrays are never out of date and are only packed again for the cells that
+change.
+"""
+import numpy as np
+
+import organisms
+from environment.base_elements import Dirt
+from environment.grid import Tile
+from environment.liquids import Water
+from organisms.dead_things import Corpse
+from organisms.species import unbind
+
+# cell kinds
+EMPTY = 0
+DIRT = 1
+WATER = 2
+PLANT = 3
+ANIMAL = 4
+CORPSE = 5
+OTHER = 6
+
+# the numeric attributes that are packed for every cell and their dtypes
+FIELDS = {
+    "size": np.int32,
+    "strength": np.int32,
+    "speed": np.int32,
+    "hunger": np.int32,
+    "thirst": np.int32,
+    "energy": np.int32,
+    "virility": np.int32,
+    "age": np.int32,
+}
+
+# species codes are handed out the first time a class is seen, 0 means no species
+SPECIES_CODES = {}
+
+
+def species_code(thing):
+    """
+    Return the integer code for the species (class) of a thing.
+    :param thing: the thing in the cell
+    :return: an integer code, 0 for an empty cell
+    """
+    if thing is None:
+        return 0
+    return class_code(thing.__class__)
+
+
+def class_code(cls):
+    """
+    Return the integer code for a species (class), e.g. to compare against engine.species.
+    :param cls: the class
+    :return: an integer code
+    """
+    return SPECIES_CODES.setdefault(cls.__name__, len(SPECIES_CODES) + 1)
+
+
+def kind_of(thing):
+    """
+    Classify the contents of a cell.
+    :param thing: the thing in the cell
+    :return: one of the cell kind constants
+    """
+    if isinstance(thing, Tile):
+        thing = thing.type
+    if thing is None:
+        return EMPTY
+    if isinstance(thing, Dirt):
+        return DIRT
+    if isinstance(thing, Water):
+        return WATER
+    if isinstance(thing, Corpse):
+        return CORPSE
+    if isinstance(thing, organisms.plants.Plant):
+        return PLANT
+    if isinstance(thing, organisms.animals.Animal):
+        return ANIMAL
+    return OTHER
+
+
+class GridEngine:
+    """
+    Struct-of-arrays copy of the zoo grid.
+    """
+
+    def __init__(self, height, width):
+        """
+        This method is called when the engine is created.
+        :param height: the number of rows in the grid
+        :param width: the number of columns in the grid
+        """
+        self.height = height
+        self.width = width
+        shape = (height, width)
+        self.kind = np.zeros(shape, dtype=np.uint8)
+        self.species = np.zeros(shape, dtype=np.uint16)
+        self.alive = np.zeros(shape, dtype=bool)
+        self.fields = {name: np.zeros(shape, dtype=dtype) for name, dtype in FIELDS.items()}
+
+    def __getattr__(self, name):
+        """
+        Expose the packed fields as attributes, e.g. engine.hunger.
+        """
+        fields = self.__dict__.get("fields", {})
+        if name in fields:
+            return fields[name]
+        raise AttributeError(name)
+
+    @classmethod
+    def from_grid(cls, grid):
+        """
+        Build an engine from a grid of objects.
+        :param grid: the zoo grid
+        :return: the engine
+        """
+        engine = cls(len(grid), len(grid[0]) if grid else 0)
+        engine.load(grid)
+        return engine
+
+    def load(self, grid):
+        """
+        Pack every cell of the grid into the arrays.
+        :param grid: the zoo grid
+        :return:
+        """
+        for x, row in enumerate(grid):
+            for y, thing in enumerate(row):
+                self.pack_cell(x, y, thing)
+
+    def pack_cell(self, x, y, thing):
+        """
+        Pack a single cell into the arrays and bind the thing in it to the cell.
+        :param x: the row of the cell
+        :param y: the column of the cell
+        :param thing: the thing in the cell
+        :return:
+        """
+        if isinstance(thing, Tile):
+            thing = thing.type
+        # only the things with packed stats are bound
+        bindable = hasattr(thing, "engine_cell")
+        cell = (self, int(x), int(y))
+        if bindable and thing.engine_cell not in (None, cell):
+            # it was bound to another cell, or another engine
+            unbind(thing)
+        self.kind[x, y] = kind_of(thing)
+        self.species[x, y] = species_code(thing)
+        self.alive[x, y] = bool(getattr(thing, "is_alive", False))
+        for name, values in self.fields.items():
+            value = getattr(thing, name, 0)
+            values[x, y] = value if isinstance(value, (int, float)) else 0
+        if bindable:
+            thing.engine_cell = cell
+
+    def release_cell(self, x, y, thing):
+        """
+        Unbind the thing that left a cell, if it is still bound to that cell.
+        :param x: the row of the cell
+        :param y: the column of the cell
+        :param thing: the thing that left the cell
+        :return:
+        """
+        if isinstance(thing, Tile):
+            thing = thing.type
+        if getattr(thing, "engine_cell", None) == (self, x, y):
+            unbind(thing)
+
+    def pack_dirt(self, x, y, size):
+        """
+        Pack dirt into empty cells, the dirt of the zoo is in its terrain layer and not on
+        the grid.
+        :param x: the row of the cell, or an array of rows
+        :param y: the column of the cell, or an array of columns
+        :param size: the size of the dirt, or an array of sizes
+        :return:
+        """
+        self.kind[x, y] = DIRT
+        self.species[x, y] = class_code(Dirt)
+        self.fields["size"][x, y] = size
+
+    def pack_terrain(self, terrain):
+        """
+        Pack the dirt of a terrain layer into the cells that have nothing on them.
+        :param terrain: the TerrainLayer of the zoo
+        :return:
+        """
+        xs, ys = terrain.cells(DIRT)
+        bare = self.kind[xs, ys] == EMPTY
+        xs, ys = xs[bare], ys[bare]
+        self.pack_dirt(xs, ys, terrain.sizes(xs, ys))
+
+    def unpack_cell(self, x, y, thing):
+        """
+        Write the packed values of a cell back onto the object in it.
+        :param x: the row of the cell
+        :param y: the column of the cell
+        :param thing: the thing in the cell
+        :return:
+        """
+        if isinstance(thing, Tile):
+            thing = thing.type
+        if thing is None:
+            return
+        for name, values in self.fields.items():
+            if hasattr(thing, name):
+                setattr(thing, name, int(values[x, y]))
+
+    def store(self, grid):
+        """
+        Write the packed values of every cell back onto the grid's objects.
+        :param grid: the zoo grid
+        :return:
+        """
+        for x, y in zip(*np.nonzero(self.kind != EMPTY)):
+            self.unpack_cell(x, y, grid[x][y])
+
+    def mask(self, *kinds):
+        """
+        :return: a boolean array that is True where the cell is one of the kinds
+        """
+        return np.isin(self.kind, kinds)
+
+    def count(self, *kinds):
+        """
+        :return: the number of cells that are one of the kinds
+        """
+        return int(np.count_nonzero(self.mask(*kinds)))
+
+    def positions(self, *kinds):
+        """
+        :return: a list of (x, y) positions of the cells that are one of the kinds
+        """
+        return [(int(x), int(y)) for x, y in zip(*np.nonzero(self.mask(*kinds)))]
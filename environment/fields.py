@@ -0,0 +1,300 @@
+"""
+Distance fields over the zoo grid.
+A distance field is built once from a set of source cells (e.g. every water tile) with a
+multi-source breadth first search. Afterwards the distance to the nearest source, the
+position of that source and the first step towards it are plain array reads for every cell.
+Distances are in moves, an animal can step to any of its eight neighbours.
+A field can be limited to the passable cells, then it is a flow field: following the steps
+goes around whatever is in the way, and the distance is the length of that path.
+The flow fields of a zoo are kept while the grid changes, a change only sends the part of a
+field it can reach back to be worked out again. A dense zoo has CachedFields over the whole
+grid. The grid of a sparse zoo is too big for arrays as big as the grid, its fields are
+LocalFields worked out a block of cells at a time over a window around the block.
+"""
+import numpy as np
+
+# the eight neighbours of a cell, in the order ties are broken
+OFFSETS = ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1))
+# a LocalField is worked out for blocks of this many rows and columns, each seeing the
+# sources up to this many cells beyond the block
+BLOCK_SIZE = 16
+REACH = 16
+
+
+def distance_transform(sources, passable=None):
+    """
+    Multi-source breadth first search from every True cell of sources.
+    Only the cells of the frontier are looked at in every step, so the search costs the same
+    whether the sources are many and close together or few and far apart. The search runs on
+    the grid with a border of closed cells around it, so a neighbour is always a fixed offset
+    away and never off the grid.
+    :param sources: a boolean array of the source cells
+    :param passable: a boolean array of the cells the search can go through, every cell if None
+    :return: the distance to the nearest source (-1 where there is none), the row and column
+        of that source and the row and column step from every cell towards it
+    """
+    height, width = sources.shape
+    padded_width = width + 2
+    shape = (height + 2, padded_width)
+    inner = (slice(1, height + 1), slice(1, width + 1))
+    # -1 for the cells not reached yet, -2 for the border and the closed cells
+    distance = np.full(shape, -2, dtype=np.int32)
+    distance[inner] = -1 if passable is None else np.where(passable, -1, -2)
+    distance[inner][np.asarray(sources, dtype=bool)] = 0
+    distance = distance.ravel()
+    nearest = np.full(distance.size, -1, dtype=np.int64)
+    step_x = np.zeros(distance.size, dtype=np.int8)
+    step_y = np.zeros(distance.size, dtype=np.int8)
+    frontier = np.flatnonzero(distance == 0)
+    nearest[frontier] = frontier
+    offsets = [(dx, dy, dx * padded_width + dy) for dx, dy in OFFSETS]
+
+    step = 0
+    while frontier.size:
+        step += 1
+        reached = []
+        for dx, dy, offset in offsets:
+            cells = frontier + offset
+            new_cells = distance[cells] == -1
+            cells, parents = cells[new_cells], frontier[new_cells]
+            distance[cells] = step
+            nearest[cells] = nearest[parents]
+            step_x[cells], step_y[cells] = -dx, -dy
+            reached.append(cells)
+        frontier = np.concatenate(reached)
+    distance = distance.reshape(shape)[inner]
+    distance[distance < 0] = -1
+    nearest_x, nearest_y = np.divmod(nearest.reshape(shape)[inner], padded_width)
+    nearest_x, nearest_y = nearest_x - 1, nearest_y - 1
+    nearest_x[distance < 0] = nearest_y[distance < 0] = -1
+    return (
+        np.ascontiguousarray(distance),
+        nearest_x.astype(np.int32),
+        nearest_y.astype(np.int32),
+        np.ascontiguousarray(step_x.reshape(shape)[inner]),
+        np.ascontiguousarray(step_y.reshape(shape)[inner]),
+    )
+
+
+class DistanceField:
+    """
+    The distance from every cell to the nearest source cell.
+    The arrays can cover a window of the grid, the cells are still addressed by their
+    position on the whole grid.
+    """
+
+    def __init__(self, sources, passable=None, origin=(0, 0)):
+        """
+        This method is called when the field is created.
+        :param sources: a boolean array of the source cells
+        :param passable: a boolean array of the cells that can be walked through, every
+            cell if None
+        :param origin: the row and column of the grid the first cell of the arrays is at
+        """
+        (
+            self.distance,
+            self.nearest_x,
+            self.nearest_y,
+            self.step_x,
+            self.step_y,
+        ) = distance_transform(sources, passable)
+        self.origin = origin
+
+    def distance_at(self, x, y):
+        """
+        :return: the number of moves from (x, y) to the nearest source, or None if there is none
+        """
+        distance = int(self.distance[x - self.origin[0], y - self.origin[1]])
+        return None if distance < 0 else distance
+
+    def nearest(self, x, y):
+        """
+        :return: the position of the nearest source to (x, y), or None if there is none
+        """
+        x, y = x - self.origin[0], y - self.origin[1]
+        if self.distance[x, y] < 0:
+            return None
+        return (
+            int(self.nearest_x[x, y]) + self.origin[0],
+            int(self.nearest_y[x, y]) + self.origin[1],
+        )
+
+    def step_towards(self, x, y):
+        """
+        :return: the (dx, dy) step from (x, y) towards the nearest source, (0, 0) if there is
+            none or (x, y) is a source
+        """
+        x, y = x - self.origin[0], y - self.origin[1]
+        return int(self.step_x[x, y]), int(self.step_y[x, y])
+
+
+class CachedField:
+    """
+    A flow field over the whole grid that outlives the changes to the grid. The changes are
+    only noted, the field is worked out again when it is asked about a cell one of them could
+    have reached: a path that starts or stops going through a changed cell is at least as
+    long as the number of moves to that cell, so a cell nearer its source than to every
+    change has the same distance, source and step as before.
+    """
+
+    def __init__(self, sources, passable=None):
+        """
+        This method is called when the field is created.
+        :param sources: a function that returns the boolean array of the source cells
+        :param passable: a function that returns the boolean array of the cells that can be
+            walked through, every cell if None
+        """
+        self.sources = sources
+        self.passable = passable
+        self.field = None
+        # the cells that changed since the field was worked out, and them as an array
+        self.changes = []
+        self._changed = None
+
+    def forget(self, x, y):
+        """
+        This method is called when something the field depends on changed in a cell.
+        :return:
+        """
+        if self.field is None:
+            return
+        self.changes.append((x, y))
+        self._changed = None
+        if len(self.changes) >= self.field.distance.size:
+            # checking that many changes costs as much as working the field out again
+            self.field = None
+            self.changes = []
+
+    def reached(self, x, y):
+        """
+        :return: True if a change since the field was worked out could have moved the
+            distance, source or step of (x, y)
+        """
+        if not self.changes:
+            return False
+        distance = self.field.distance[x, y]
+        if distance < 0:
+            # a change anywhere could have opened a way to a source
+            return True
+        if self._changed is None:
+            self._changed = np.array(self.changes)
+        moves = np.maximum(abs(self._changed[:, 0] - x), abs(self._changed[:, 1] - y))
+        return bool((moves <= distance).any())
+
+    def _field(self, x, y):
+        """
+        :return: the DistanceField, worked out again if a change reached (x, y)
+        """
+        if self.field is None or self.reached(x, y):
+            passable = None if self.passable is None else self.passable()
+            self.field = DistanceField(self.sources(), passable)
+            self.changes = []
+            self._changed = None
+        return self.field
+
+    def distance_at(self, x, y):
+        """
+        :return: the number of moves from (x, y) to the nearest source, or None if there is none
+        """
+        return self._field(x, y).distance_at(x, y)
+
+    def nearest(self, x, y):
+        """
+        :return: the position of the nearest source to (x, y), or None if there is none
+        """
+        return self._field(x, y).nearest(x, y)
+
+    def step_towards(self, x, y):
+        """
+        :return: the (dx, dy) step from (x, y) towards the nearest source, (0, 0) if there is
+            none or (x, y) is a source
+        """
+        return self._field(x, y).step_towards(x, y)
+
+
+class LocalField:
+    """
+    A flow field for a grid too big for arrays as big as itself, worked out one block of
+    cells at a time when a cell of the block is first asked about. The field of a block is a
+    DistanceField over a window reaching REACH cells beyond the block on every side, so it
+    only knows the sources that close. A block field is kept until something changes in its
+    window, and a window without sources costs nothing.
+    """
+
+    def __init__(
+        self, height, width, sources, passable=None, block_size=BLOCK_SIZE, reach=REACH
+    ):
+        """
+        This method is called when the field is created.
+        :param height: the number of rows in the grid
+        :param width: the number of columns in the grid
+        :param sources: a function that returns the boolean array of the source cells of a
+            window, given as (first row, last row + 1, first column, last column + 1)
+        :param passable: a function that returns the boolean array of the cells of a window
+            that can be walked through, every cell if None
+        :param block_size: the number of rows and columns of a block
+        :param reach: how far beyond its block the field of a block sees
+        """
+        self.height = height
+        self.width = width
+        self.sources = sources
+        self.passable = passable
+        self.block_size = block_size
+        self.reach = reach
+        # block key -> the DistanceField of its window, None if the window has no sources
+        self.blocks = {}
+
+    def _field(self, x, y):
+        """
+        :return: the DistanceField of the block of a cell, or None if there is no source in
+            its reach
+        """
+        key = x // self.block_size, y // self.block_size
+        if key not in self.blocks:
+            window = (
+                max(key[0] * self.block_size - self.reach, 0),
+                min((key[0] + 1) * self.block_size + self.reach, self.height),
+                max(key[1] * self.block_size - self.reach, 0),
+                min((key[1] + 1) * self.block_size + self.reach, self.width),
+            )
+            sources = self.sources(window)
+            field = None
+            if sources.any():
+                passable = None if self.passable is None else self.passable(window)
+                field = DistanceField(sources, passable, origin=(window[0], window[2]))
+            self.blocks[key] = field
+        return self.blocks[key]
+
+    def forget(self, x, y):
+        """
+        This method is called when something the field depends on changed in a cell, only
+        the blocks whose window holds the cell are worked out again.
+        :return:
+        """
+        size, reach = self.block_size, self.reach
+        for i in range((x - reach) // size, (x + reach) // size + 1):
+            for j in range((y - reach) // size, (y + reach) // size + 1):
+                self.blocks.pop((i, j), None)
+
+    def distance_at(self, x, y):
+        """
+        :return: the number of moves from (x, y) to the nearest source in reach, or None if
+            there is none
+        """
+        field = self._field(x, y)
+        return None if field is None else field.distance_at(x, y)
+
+    def nearest(self, x, y):
+        """
+        :return: the position of the nearest source in reach of (x, y), or None if there is none
+        """
+        field = self._field(x, y)
+        return None if field is None else field.nearest(x, y)
+
+    def step_towards(self, x, y):
+        """
+        :return: the (dx, dy) step from (x, y) towards the nearest source in reach, (0, 0)
+            if there is none or (x, y) is a source
+        """
+        field = self._field(x, y)
+        return (0, 0) if field is None else field.step_towards(x, y)
@@ -8,10 +8,44 @@ Each tile has a type, which is one of the following:
     - None
 Each tile has a position, which is a list of two integers.
 Each tile has a home_id, which is a string uuid4.
+Each tile has an integer id handed out by the zoo, see database.ids.
 """
-import uuid
-
 from database import DatabaseConnection
+from database.ids import next_id
+
+
+class GridRow(list):
+    """
+    A row of the grid that tells its owner whenever one of its cells changes.
+    """
+
+    def __init__(self, cells, index, on_change):
+        """
+        This method is called when a row is created.
+        :param cells: the contents of the row
+        :param index: the row number in the grid
+        :param on_change: called with (x, y, old, new) after a cell changes
+        """
+        super().__init__(cells)
+        self.index = index
+        self.on_change = on_change
+
+    def __setitem__(self, column, value):
+        """
+        This method is called when a cell in the row is assigned to.
+        """
+        if isinstance(column, slice):
+            columns = range(len(self))[column]
+            old_values = [self[i] for i in columns]
+            super().__setitem__(column, value)
+            for i, old in zip(columns, old_values):
+                if old is not self[i]:
+                    self.on_change(self.index, i, old, self[i])
+            return
+        old = self[column]
+        super().__setitem__(column, value)
+        if old is not value:
+            self.on_change(self.index, column % len(self), old, value)
 
 
 class TileError(Exception):
@@ -29,7 +63,7 @@ def create_tiles_table(conn):
     try:
         sql = """
         CREATE TABLE IF NOT EXISTS tiles (
-            id TEXT PRIMARY KEY NOT NULL,
+            id INTEGER PRIMARY KEY NOT NULL,
             x_position INTEGER NOT NULL,
             y_position INTEGER NOT NULL,
             home_id TEXT NOT NULL,
@@ -55,7 +89,7 @@ class Tile:
         self.position = position
         self.home_id = home_id
         self.type = _type
-        self.id = str(uuid.uuid4())
+        self.id = next_id(home_id)
         self.db = DatabaseConnection()
 
     def __str__(self):
@@ -0,0 +1,516 @@
+"""
+The intent/resolve turn model.
+Instead of changing the grid while they take their turn, every entity first decides what it
+wants to do against a read-only snapshot of the grid and emits an Intent. A resolver then
+settles conflicting intents (two animals after the same cell, two eaters after the same
+plant) in a fixed order that does not depend on the order the entities were asked in, and
+the accepted intents are applied to the zoo in one pass.
+"""
+import functools
+import random
+from dataclasses import dataclass, replace
+
+import organisms
+from environment.base_elements import Dirt
+from environment.chunks import ChunkedGrid
+from environment.fields import DistanceField, LocalField
+from environment.grid import Tile
+from environment.liquids import Water
+from environment.occupancy import OccupancyIndex
+from organisms.dead_things import Corpse
+
+# the order the resolver settles intents in, ties are broken by the position of the actor
+PRIORITY = {
+    "die": 0,
+    "eat": 1,
+    "drink": 2,
+    "mate": 3,
+    "move": 4,
+    "sleep": 5,
+    "rest": 6,
+    "spawn": 7,
+    "grow": 8,
+    "decay": 9,
+}
+
+
+@dataclass(frozen=True)
+class Intent:
+    """
+    What an entity wants to do this turn.
+    The actor and its targets are given by position, so intents can be made without access
+    to the zoo and matched back to the snapshot they were made against.
+    """
+
+    kind: str
+    source: tuple
+    target: tuple = None
+    spawn_at: tuple = None
+    motive: str = None
+    amount: int = 0
+
+    @property
+    def order(self):
+        """
+        :return: the sort key the resolver uses
+        """
+        return PRIORITY[self.kind], self.source
+
+
+def entity_rng(seed, cell, turn_number, *salt):
+    """
+    Make the random number generator of an entity for one turn.
+    The rolls are tied to the cell the entity starts the turn in rather than to its id, since
+    only one thing starts a turn in each cell and ids are handed out in a different order by
+    every process. The same seed, cell and turn always give the same rolls, whichever order the
+    entities are asked in and whichever process asks them.
+    :param seed: the entropy of the random service of the zoo
+    :param cell: the position of the entity at the start of the turn
+    :param turn_number: the current turn
+    :param salt: tells apart the rolls an entity makes for different things in one turn
+    :return: a random.Random instance
+    """
+    x, y = cell
+    return random.Random(":".join(str(part) for part in (seed, x, y, turn_number, *salt)))
+
+
+def turn_seed(zoo):
+    """
+    :return: the seed the rolls of the entities of a zoo are made from
+    """
+    return zoo.rng.root.entropy
+
+
+class GridSnapshot:
+    """
+    The grid as it was at the start of the turn.
+    The grid isn't copied: the snapshot reads the cells of the live grid, and while the
+    accepted intents are applied the zoo hands it what was in each cell before the cell first
+    changed (see keep), so it keeps answering with the start of the turn. Taking a snapshot
+    costs nothing however big the grid is, only the cells that change are ever copied.
+    """
+
+    def __init__(self, grid, fields=None):
+        """
+        This method is called when the snapshot is taken.
+        :param grid: the grid of the zoo
+        :param fields: a function that returns the flow field to a class of thing, e.g.
+            Zoo.get_flow_field, the fields are worked out from the grid if not given
+        """
+        self.grid = grid
+        self.height = len(grid)
+        self.width = len(grid[0]) if len(grid) else 0
+        # what was in the cells that changed since the snapshot was taken
+        self.before = {}
+        self.fields = fields
+        # the flow fields by the class of thing they lead to
+        self._fields = {}
+
+    def keep(self, x, y, old):
+        """
+        Remember what was in a cell before it changed, only the first change counts.
+        :param x: the row of the cell
+        :param y: the column of the cell
+        :param old: what was in the cell
+        :return:
+        """
+        if (x, y) not in self.before:
+            self.before[x, y] = old.type if isinstance(old, Tile) else old
+
+    def inside(self, x, y):
+        """
+        :return: True if (x, y) is on the grid
+        """
+        return 0 <= x < self.height and 0 <= y < self.width
+
+    def at(self, x, y):
+        """
+        :return: the thing in the cell at (x, y)
+        """
+        if self.before and (x, y) in self.before:
+            return self.before[x, y]
+        cell = self.grid[x][y]
+        return cell.type if isinstance(cell, Tile) else cell
+
+    def within(self, x, y, radius):
+        """
+        Walk the cells in reach of (x, y), row by row, leaving out (x, y) itself.
+        :return: tuples of (row, column, thing in the cell)
+        """
+        for i in range(max(x - radius, 0), min(x + radius + 1, self.height)):
+            row = self.grid[i]
+            for j in range(max(y - radius, 0), min(y + radius + 1, self.width)):
+                if (i, j) == (x, y):
+                    continue
+                if self.before and (i, j) in self.before:
+                    yield i, j, self.before[i, j]
+                    continue
+                cell = row[j]
+                yield i, j, cell.type if isinstance(cell, Tile) else cell
+
+    def flow_field(self, kind):
+        """
+        :param kind: the class of thing to head for
+        :return: the flow field to the nearest thing of the kind at the start of the turn, it
+            goes around the water
+        """
+        if kind not in self._fields:
+            if self.fields is not None:
+                self._fields[kind] = self.fields(kind)
+            elif isinstance(self.grid, ChunkedGrid):
+                # a sparse grid is too big for whole grid arrays
+                occupancy = OccupancyIndex.from_grid(self.grid)
+                self._fields[kind] = LocalField(
+                    self.height,
+                    self.width,
+                    functools.partial(occupancy.bitmap, kind),
+                    passable=lambda window: ~occupancy.bitmap(Water, window),
+                )
+            else:
+                occupancy = OccupancyIndex.from_grid(self.grid)
+                water = occupancy.bitmap(Water)
+                sources = water if kind is Water else occupancy.bitmap(kind)
+                self._fields[kind] = DistanceField(sources, passable=~water)
+        return self._fields[kind]
+
+    def water_field(self):
+        """
+        :return: the flow field to the nearest water at the start of the turn
+        """
+        return self.flow_field(Water)
+
+
+def can_enter(animal, cell):
+    """
+    :return: True if the animal can step into a cell holding this thing
+    """
+    return (
+        cell is None
+        or isinstance(cell, Dirt)
+        or (isinstance(cell, organisms.plants.Plant) and cell.size <= animal.size)
+    )
+
+
+def choose_motive(animal, rng):
+    """
+    Pick the most urgent need of an animal without changing the animal.
+    :return: "drink", "eat", "sleep" or "mate"
+    """
+    if animal.sleep_counter > 0:
+        return "sleep"
+    needs = {
+        "drink": animal.thirst,
+        "eat": animal.hunger,
+        "sleep": animal.energy,
+        "mate": animal.virility,
+    }
+    if unsatisfied_needs := {k: v for k, v in needs.items() if v > 0}:
+        return min(unsatisfied_needs, key=unsatisfied_needs.get)
+    return rng.choice(list(needs))
+
+
+def find_in_reach(snapshot, x, y, radius, kind):
+    """
+    :return: the position of the smallest thing of a kind in reach of (x, y), or None
+    """
+    found = [
+        (cell.size, (i, j))
+        for i, j, cell in snapshot.within(x, y, radius)
+        if isinstance(cell, kind)
+    ]
+    return min(found)[1] if found else None
+
+
+def find_partner(animal, snapshot):
+    """
+    :return: the position of an adjacent animal that is willing and able to mate, or None
+    """
+    if animal.energy < animal.max_energy * 0.8:
+        return None
+    for i, j, cell in snapshot.within(animal.position[0], animal.position[1], 1):
+        if (
+            type(cell) is type(animal)
+            and cell.gender != animal.gender
+            and cell.motive == "mate"
+            and cell.energy >= cell.max_energy * 0.8
+        ):
+            return i, j
+    return None
+
+
+def empty_cells(snapshot, x, y):
+    """
+    :return: the positions of the empty cells next to (x, y)
+    """
+    return [(i, j) for i, j, cell in snapshot.within(x, y, 1) if cell is None]
+
+
+def sleep_quality(snapshot, x, y):
+    """
+    Sleep is better with empty cells around, worse with neighbours.
+    :return: the quality of sleep at (x, y)
+    """
+    quality = 0
+    for i, j, cell in snapshot.within(x, y, 1):
+        if cell is not None:
+            quality -= 1
+            continue
+        quality += 1
+        if not any(
+            isinstance(neighbour, organisms.animals.Animal)
+            for _, _, neighbour in snapshot.within(i, j, 1)
+        ):
+            # nothing can creep up on an animal here
+            quality += 1
+    return quality
+
+
+def decide_animal(animal, snapshot, rng):
+    """
+    :return: the intent of an animal
+    """
+    x, y = animal.position
+    source = (x, y)
+    motive = choose_motive(animal, rng)
+    if motive == "sleep":
+        return Intent("sleep", source, motive=motive, amount=sleep_quality(snapshot, x, y))
+    if motive == "drink" and (water := find_in_reach(snapshot, x, y, animal.speed, Water)):
+        return Intent("drink", source, target=water, motive=motive)
+    if (
+        motive == "eat"
+        and animal.favorite_food is not None
+        and (food := find_in_reach(snapshot, x, y, animal.speed, animal.favorite_food))
+    ):
+        # predators roll their attack now, the prey rolls its defense when it is settled
+        attack = rng.randint(1, 20) + animal.strength
+        return Intent("eat", source, target=food, motive=motive, amount=attack)
+    if motive == "mate" and (partner := find_partner(animal, snapshot)):
+        if cradles := empty_cells(snapshot, x, y):
+            return Intent(
+                "mate", source, target=partner, spawn_at=rng.choice(cradles), motive=motive
+            )
+
+    dx, dy = 0, 0
+    target_kind = {"drink": Water, "eat": animal.favorite_food}.get(motive)
+    if target_kind is not None and (field := snapshot.flow_field(target_kind)) is not None:
+        dx, dy = field.step_towards(x, y)
+    if dx == dy == 0:
+        dx, dy = rng.randint(-1, 1), rng.randint(-1, 1)
+    target = (x + dx, y + dy)
+    if (
+        target != source
+        and snapshot.inside(*target)
+        and can_enter(animal, snapshot.at(*target))
+    ):
+        return Intent("move", source, target=target, motive=motive)
+    return Intent("rest", source, motive=motive)
+
+
+def decide_plant(plant, snapshot, rng):
+    """
+    :return: the intent of a plant
+    """
+    source = tuple(plant.position)
+    if plant.max_age <= plant.age:
+        return Intent("die", source)
+    # roll a d100, on a 1 the plant grows
+    growth = int(rng.randint(1, 100) == 1)
+    if cells := empty_cells(snapshot, *source):
+        return Intent("spawn", source, spawn_at=rng.choice(cells), amount=growth)
+    return Intent("grow", source, amount=growth)
+
+
+def decide(entity, snapshot, rng):
+    """
+    Work out what an entity wants to do this turn, reading the snapshot only.
+    :param entity: the animal, plant or corpse
+    :param snapshot: the grid at the start of the turn
+    :param rng: the random number generator of the entity for this turn
+    :return: an Intent, or None if the entity does nothing
+    """
+    if isinstance(entity, organisms.animals.Animal):
+        return decide_animal(entity, snapshot, rng)
+    if isinstance(entity, organisms.plants.Plant):
+        return decide_plant(entity, snapshot, rng)
+    if isinstance(entity, Corpse):
+        return Intent("decay", tuple(entity.position))
+    return None
+
+
+def decide_all(entities, snapshot, seed, turn_number):
+    """
+    The decide phase: ask every entity for its intent.
+    :param entities: the entities that act this turn
+    :param snapshot: the grid at the start of the turn
+    :param seed: the seed of the zoo, see turn_seed
+    :param turn_number: the current turn
+    :return: the intents
+    """
+    intents = []
+    for entity in entities:
+        rng = entity_rng(seed, entity.position, turn_number)
+        if (intent := decide(entity, snapshot, rng)) is not None:
+            intents.append(intent)
+    return intents
+
+
+def resolve(intents, snapshot, seed, turn_number):
+    """
+    Settle conflicting intents. Intents are taken in priority order and the first claim on
+    a cell wins; intents that lost a conflict are dropped or, for seeds, reduced to growing.
+    :param intents: the intents of every entity
+    :param snapshot: the grid the intents were made against
+    :param seed: the seed of the zoo, used to roll defenses
+    :param turn_number: the current turn
+    :return: the accepted intents in the order they are applied
+    """
+    claimed = set()  # cells something moves or is born into
+    taken = set()  # cells whose occupant is eaten, drunk dry, trampled or dies
+    mated = set()
+    drawn = {}
+    accepted = []
+    for intent in sorted(intents, key=lambda intent: intent.order):
+        if intent.source in taken:
+            # the actor is gone before it could act
+            continue
+        if intent.kind == "die":
+            taken.add(intent.source)
+        elif intent.kind == "eat":
+            if intent.target in taken or intent.target in claimed:
+                continue
+            food = snapshot.at(*intent.target)
+            if isinstance(food, organisms.animals.Animal):
+                rng = entity_rng(seed, intent.target, turn_number, "defend")
+                if intent.amount <= rng.randint(1, 20) + food.speed:
+                    continue
+            else:
+                # the eater steps into the cell of its food
+                claimed.add(intent.target)
+            taken.add(intent.target)
+        elif intent.kind == "drink":
+            if intent.target in taken:
+                continue
+            drawn[intent.target] = drawn.get(intent.target, 0) + 1
+            if drawn[intent.target] >= snapshot.at(*intent.target).size:
+                taken.add(intent.target)
+        elif intent.kind == "mate":
+            if (
+                {intent.source, intent.target} & mated
+                or intent.target in taken
+                or intent.spawn_at in claimed
+            ):
+                continue
+            mated.update((intent.source, intent.target))
+            claimed.add(intent.spawn_at)
+        elif intent.kind == "move":
+            if intent.target in claimed or intent.target in taken:
+                continue
+            claimed.add(intent.target)
+            if snapshot.at(*intent.target) is not None:
+                taken.add(intent.target)
+        elif intent.kind == "spawn" and intent.spawn_at in claimed:
+            intent = replace(intent, kind="grow", spawn_at=None)
+        elif intent.kind == "spawn":
+            claimed.add(intent.spawn_at)
+        accepted.append(intent)
+    return accepted
+
+
+def relocate(zoo, actor, target):
+    """
+    Move an actor to a new cell of the zoo.
+    """
+    zoo.clear_cell(actor.position[0], actor.position[1])
+    actor.position = list(target)
+    zoo.set_cell(target[0], target[1], actor)
+
+
+def apply(zoo, snapshot, accepted, turn_number):
+    """
+    Apply the accepted intents to the zoo, in order.
+    :param zoo: the zoo
+    :param snapshot: the grid the intents were made against
+    :param accepted: the intents returned by resolve
+    :param turn_number: the current turn
+    :return: the things that were born
+    """
+    born = []
+    for intent in accepted:
+        actor = snapshot.at(*intent.source)
+        if intent.motive is not None:
+            actor.motive = intent.motive
+        if intent.kind == "die":
+            actor.is_alive = False
+            zoo.clear_cell(*intent.source)
+        elif intent.kind == "eat":
+            food = snapshot.at(*intent.target)
+            if isinstance(food, organisms.animals.Animal):
+                actor.hunger += food.size
+                food.die("predation")
+                continue
+            actor.hunger += food.nutrition
+            food.is_alive = False
+            zoo.clear_cell(*intent.target)
+            relocate(zoo, actor, intent.target)
+        elif intent.kind == "drink":
+            water = snapshot.at(*intent.target)
+            water.size -= 1
+            actor.thirst += 1
+            actor.energy += 1
+            if water.size <= 0 and zoo.grid[intent.target[0]][intent.target[1]] is water:
+                zoo.clear_cell(*intent.target)
+        elif intent.kind == "mate":
+            partner = snapshot.at(*intent.target)
+            baby = actor.conceive(partner, list(intent.spawn_at), turn_number)
+            rng = entity_rng(turn_seed(zoo), intent.source, turn_number, "birth")
+            baby.gender = rng.choice(["male", "female"])
+            actor.virility -= 1
+            actor.energy += 1
+            zoo.set_cell(intent.spawn_at[0], intent.spawn_at[1], baby)
+            born.append(baby)
+        elif intent.kind == "move":
+            relocate(zoo, actor, intent.target)
+        elif intent.kind == "sleep":
+            if actor.sleep_counter > 0:
+                actor.sleep_counter -= 1
+            else:
+                actor.sleep_counter = intent.amount // 2
+                actor.energy += intent.amount
+        elif intent.kind in ("spawn", "grow"):
+            actor.size += intent.amount
+            actor.age = turn_number - actor.birth_turn
+            if intent.spawn_at is not None:
+                seedling = actor.__class__(home_id=actor.home_id)
+                seedling.position = list(intent.spawn_at)
+                seedling.birth_turn = turn_number
+                zoo.set_cell(intent.spawn_at[0], intent.spawn_at[1], seedling)
+                born.append(seedling)
+        elif intent.kind == "decay":
+            actor.die(zoo)
+    return born
+
+
+def run_turn(zoo, entities, turn_number):
+    """
+    Take one turn with the intent/resolve model.
+    :param zoo: the zoo
+    :param entities: the entities that act this turn, all on the grid
+    :param turn_number: the current turn
+    :return: the accepted intents
+    """
+    # the fields are read before anything changes, so the zoo's own are the snapshot's
+    snapshot = GridSnapshot(zoo.grid, fields=zoo.get_flow_field)
+    seed = turn_seed(zoo)
+    intents = decide_all(entities, snapshot, seed, turn_number)
+    accepted = resolve(intents, snapshot, seed, turn_number)
+    zoo.snapshots.append(snapshot)
+    try:
+        apply(zoo, snapshot, accepted, turn_number)
+    finally:
+        zoo.snapshots.remove(snapshot)
+    # the resolver decided what is on these cells now, not the tiles that used to be there
+    zoo.forget_tiles(
+        {intent.target for intent in accepted if intent.kind in ("move", "eat")}
+        | {intent.spawn_at for intent in accepted if intent.spawn_at is not None}
+    )
+    return accepted
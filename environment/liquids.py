@@ -1,26 +1,65 @@
-import random
-import uuid
-
+import environment.rng
 from assets import GameAsset
 
 
 class Water(GameAsset):
     """
     This is the class for water on the map.
+    Water on the grid of a zoo is bound to the zoo's terrain layer, which holds its size, so
+    the water isn't stored on its own.
     """
 
-    def __init__(self, position=None, home_id=None, id=str(uuid.uuid4())):
+    __slots__ = ("position", "home_id", "terrain")
+
+    emoji = "🌊"
+
+    def __init__(self, position=None, home_id=None, size=None):
         """
         This method is called when the water is created.
+        :param size: the size of the water, random if not given
         """
+        # the terrain layer the water is bound to, None until it is put on the grid of a zoo
+        self.terrain = None
         super().__init__()
         if position is None:
             position = [0, 0]
         self.position = position
-        self.size = random.randint(1, 5)
-        self.emoji = "🌊"
         self.home_id = home_id
-        self.id = id
+        self.size = environment.rng.stream(home_id, "water").randint(1, 5) if size is None else size
+
+    @property
+    def size(self):
+        """
+        The size of the water, read from the terrain of its cell while it is bound and from
+        the size slot of the asset otherwise.
+        """
+        if self.terrain is None:
+            return GameAsset.size.__get__(self)
+        return self.terrain.size_at(self.position[0], self.position[1])
+
+    @size.setter
+    def size(self, size):
+        if self.terrain is None:
+            GameAsset.size.__set__(self, size)
+        else:
+            self.terrain.set_size(self.position[0], self.position[1], size)
+
+    def __getstate__(self):
+        """
+        This method is called when the water is pickled, the terrain stays behind and the
+        size is kept in the water.
+        """
+        _, state = super().__getstate__()
+        state.pop("terrain", None)
+        return None, state
+
+    def __setstate__(self, state):
+        """
+        This method is called when pickled water is loaded, it is unbound until it is put on
+        a grid again.
+        """
+        self.terrain = None
+        super().__setstate__(state)
 
     def __str__(self):
         return "Water"
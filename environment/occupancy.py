@@ -0,0 +1,237 @@
+"""
+Per-type occupancy bitmaps for the zoo grid.
+Every class of thing on the grid (water, each plant, each animal, corpses) gets a boolean
+bitmap, and a summed-area table is built from it on demand. With the table, the number of
+things of a class inside any rectangle is four array reads, so "is there any X within r"
+and "how many X within r" are constant time and only the hits need a full scan.
+The bitmaps and tables are kept per chunk of the grid, only for the chunks that hold a thing
+of the class, so a sparse zoo only pays for its occupied chunks and a change only throws away
+the table of its own chunk.
+"""
+import numpy as np
+
+from environment.base_elements import Dirt
+from environment.chunks import CHUNK_SIZE, ChunkedGrid
+from environment.grid import Tile
+
+
+class OccupancyIndex:
+    """
+    Bitmaps and summed-area tables of where each class of thing is on the grid, by chunk.
+    """
+
+    def __init__(self, height, width, chunk_size=CHUNK_SIZE):
+        """
+        This method is called when the index is created.
+        :param height: the number of rows in the grid
+        :param width: the number of columns in the grid
+        :param chunk_size: the number of rows and columns of a chunk
+        """
+        self.height = height
+        self.width = width
+        self.chunk_size = chunk_size
+        # class -> chunk key -> bitmap of the chunk, for the chunks holding the class
+        self.bitmaps = {}
+        # class asked for -> chunk key -> summed-area table of the chunk
+        self.tables = {}
+
+    @classmethod
+    def from_grid(cls, grid):
+        """
+        Build an index from a grid of objects.
+        :param grid: the zoo grid
+        :return: the index
+        """
+        index = cls(len(grid), len(grid[0]) if grid else 0)
+        if isinstance(grid, ChunkedGrid):
+            # only the allocated chunks of a sparse grid can hold anything, and only the ones
+            # in memory of a paged grid are indexed
+            for x, y, thing in grid.resident_items():
+                index.add(x, y, thing)
+            return index
+        for x, row in enumerate(grid):
+            for y, thing in enumerate(row):
+                index.add(x, y, thing)
+        return index
+
+    @staticmethod
+    def _indexed_class(thing):
+        """
+        :return: the class a thing is indexed under, or None if it isn't indexed
+        """
+        if isinstance(thing, Tile):
+            thing = thing.type
+        if thing is None or isinstance(thing, Dirt):
+            return None
+        return thing.__class__
+
+    def _invalidate(self, thing_class, key):
+        """
+        Drop the cached tables of a chunk that include the given class.
+        """
+        for query_class, tables in self.tables.items():
+            if issubclass(thing_class, query_class):
+                tables.pop(key, None)
+
+    def _chunk_bounds(self, key):
+        """
+        :return: the first row, last row + 1, first column and last column + 1 of a chunk
+        """
+        size = self.chunk_size
+        x0, y0 = key[0] * size, key[1] * size
+        return x0, min(x0 + size, self.height), y0, min(y0 + size, self.width)
+
+    def _keys(self, x_min, x_max, y_min, y_max):
+        """
+        :return: the keys of the chunks that overlap the rectangle [x_min, x_max) x
+            [y_min, y_max), which is already clipped to the grid
+        """
+        size = self.chunk_size
+        return (
+            (i, j)
+            for i in range(x_min // size, (x_max - 1) // size + 1)
+            for j in range(y_min // size, (y_max - 1) // size + 1)
+        )
+
+    def add(self, x, y, thing):
+        """
+        Mark a cell as occupied by a thing.
+        :param x: the row of the cell
+        :param y: the column of the cell
+        :param thing: the thing in the cell
+        :return:
+        """
+        thing_class = self._indexed_class(thing)
+        if thing_class is None:
+            return
+        size = self.chunk_size
+        key = x // size, y // size
+        chunks = self.bitmaps.setdefault(thing_class, {})
+        if key not in chunks:
+            x0, x1, y0, y1 = self._chunk_bounds(key)
+            chunks[key] = np.zeros((x1 - x0, y1 - y0), dtype=bool)
+        chunks[key][x % size, y % size] = True
+        self._invalidate(thing_class, key)
+
+    def remove(self, x, y, thing):
+        """
+        Mark a cell as no longer occupied by a thing, the bitmap of a chunk that has none of
+        the class left is freed.
+        :param x: the row of the cell
+        :param y: the column of the cell
+        :param thing: the thing that left the cell
+        :return:
+        """
+        thing_class = self._indexed_class(thing)
+        size = self.chunk_size
+        key = x // size, y // size
+        chunks = self.bitmaps.get(thing_class, {})
+        if key not in chunks:
+            return
+        chunks[key][x % size, y % size] = False
+        if not chunks[key].any():
+            del chunks[key]
+        self._invalidate(thing_class, key)
+
+    def chunk_bitmap(self, thing_class, key):
+        """
+        :return: a bitmap of the cells of a chunk holding an instance of the class or its
+            subclasses, or None if there are none
+        """
+        combined = None
+        for bitmap_class, chunks in self.bitmaps.items():
+            if issubclass(bitmap_class, thing_class) and key in chunks:
+                combined = chunks[key].copy() if combined is None else combined | chunks[key]
+        return combined
+
+    def bitmap(self, thing_class, window=None):
+        """
+        :param thing_class: the class of thing
+        :param window: the first row, last row + 1, first column and last column + 1 of
+            the cells to cover, the whole grid if None
+        :return: a bitmap of every cell of the window holding an instance of the class or its
+            subclasses
+        """
+        x_min, x_max, y_min, y_max = window or (0, self.height, 0, self.width)
+        combined = np.zeros((x_max - x_min, y_max - y_min), dtype=bool)
+        if x_min >= x_max or y_min >= y_max:
+            return combined
+        for key in self._keys(x_min, x_max, y_min, y_max):
+            if (chunk := self.chunk_bitmap(thing_class, key)) is None:
+                continue
+            x0, x1, y0, y1 = self._chunk_bounds(key)
+            rows = slice(max(x0, x_min), min(x1, x_max))
+            columns = slice(max(y0, y_min), min(y1, y_max))
+            combined[
+                rows.start - x_min : rows.stop - x_min,
+                columns.start - y_min : columns.stop - y_min,
+            ] = chunk[rows.start - x0 : rows.stop - x0, columns.start - y0 : columns.stop - y0]
+        return combined
+
+    def table(self, thing_class, key):
+        """
+        :return: the summed-area table of a chunk for the class, built on first use, or None
+            if the chunk holds none of the class
+        """
+        tables = self.tables.setdefault(thing_class, {})
+        if key not in tables:
+            if (chunk := self.chunk_bitmap(thing_class, key)) is None:
+                return None
+            table = np.zeros((chunk.shape[0] + 1, chunk.shape[1] + 1), dtype=np.int32)
+            table[1:, 1:] = chunk.cumsum(axis=0).cumsum(axis=1)
+            tables[key] = table
+        return tables[key]
+
+    def area_in_rect(self, x_min, x_max, y_min, y_max):
+        """
+        :return: the number of cells in the rectangle [x_min, x_max) x [y_min, y_max) after clipping
+        """
+        rows = min(x_max, self.height) - max(x_min, 0)
+        columns = min(y_max, self.width) - max(y_min, 0)
+        return max(rows, 0) * max(columns, 0)
+
+    def count_in_rect(self, thing_class, x_min, x_max, y_min, y_max):
+        """
+        Count the instances of a class in the rectangle [x_min, x_max) x [y_min, y_max).
+        The rectangle is clipped to the grid, and the counts of the chunks it overlaps are
+        added up.
+        :return: the number of cells holding an instance of the class
+        """
+        if thing_class is None:
+            return 0
+        x_min, y_min = max(x_min, 0), max(y_min, 0)
+        x_max, y_max = min(x_max, self.height), min(y_max, self.width)
+        if x_min >= x_max or y_min >= y_max:
+            return 0
+        total = 0
+        for key in self._keys(x_min, x_max, y_min, y_max):
+            if (table := self.table(thing_class, key)) is None:
+                continue
+            x0, x1, y0, y1 = self._chunk_bounds(key)
+            top, bottom = max(x_min, x0) - x0, min(x_max, x1) - x0
+            left, right = max(y_min, y0) - y0, min(y_max, y1) - y0
+            total += int(
+                table[bottom, right] - table[top, right] - table[bottom, left] + table[top, left]
+            )
+        return total
+
+    def count_within(self, thing_class, x, y, radius):
+        """
+        :return: the number of instances of a class within radius cells of (x, y)
+        """
+        return self.count_in_rect(
+            thing_class, x - radius, x + radius + 1, y - radius, y + radius + 1
+        )
+
+    def any_within(self, thing_class, x, y, radius):
+        """
+        :return: True if there is an instance of a class within radius cells of (x, y)
+        """
+        return self.count_within(thing_class, x, y, radius) > 0
+
+    def all_within(self, thing_class, x, y, radius):
+        """
+        :return: True if every cell within radius cells of (x, y) holds an instance of a class
+        """
+        area = self.area_in_rect(x - radius, x + radius + 1, y - radius, y + radius + 1)
+        return area > 0 and self.count_within(thing_class, x, y, radius) == area
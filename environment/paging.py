@@ -0,0 +1,300 @@
+"""
+Paging the chunks of a sparse grid between memory and the database.
+A PagedChunkGrid keeps at most a budget of chunks in memory, the least recently used ones are
+written back to the chunks table (if they changed) and dropped. A chunk that isn't in memory is
+read from the table the first time one of its cells is looked at, so a zoo can be bigger than
+the memory it runs in and opening it doesn't read the whole zoo.
+While a chunk is out of memory its occupants are frozen, like the parts of a world that are
+off screen: they leave the scheduler when their chunk is evicted and come back when it is
+paged in again.
+"""
+import pickle
+import sqlite3
+from collections import OrderedDict
+
+import arrow
+
+import database
+from environment.chunks import CHUNK_SIZE, Chunk, ChunkedGrid
+
+# the number of chunks kept in memory unless told otherwise
+PAGE_BUDGET = 1024
+
+
+def chunk_schema():
+    """
+    :return: a dictionary of the schema of the chunks table
+    """
+    return {
+        "id": "TEXT PRIMARY KEY",
+        "home_id": "TEXT REFERENCES zoos(id)",
+        "chunk_x": "INTEGER",
+        "chunk_y": "INTEGER",
+        "area": "INTEGER",
+        "vacant": "INTEGER",
+        "active": "INTEGER",
+        "pickled_chunk": "BLOB",
+        "created_dt": "TEXT",
+        "updated_dt": "TEXT",
+    }
+
+
+class ChunkStore:
+    """
+    The chunks of one zoo in the chunks table.
+    Every row also keeps how many of the chunk's cells are vacant and how many of its
+    occupants take turns, so the zoo can be summed up without reading the chunks.
+    """
+
+    def __init__(self, zoo_id, is_vacant, is_active):
+        """
+        This method is called when the store is created.
+        :param zoo_id: the id of the zoo
+        :param is_vacant: a function that tells if a cell is vacant
+        :param is_active: a function that tells if a thing takes turns
+        """
+        self.zoo_id = zoo_id
+        self.is_vacant = is_vacant
+        self.is_active = is_active
+        self.db = database.DatabaseConnection()
+        database.Table(table_name="chunks", columns_and_types=chunk_schema()).create_table()
+
+    @staticmethod
+    def has_chunks(zoo_id):
+        """
+        :return: True if the zoo keeps its grid in the chunks table
+        """
+        db = database.DatabaseConnection()
+        try:
+            row = db.conn.execute(
+                "SELECT 1 FROM chunks WHERE home_id = ? LIMIT 1", (zoo_id,)
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return False
+        return row is not None
+
+    def chunk_id(self, key):
+        """
+        :return: the id of the row of a chunk
+        """
+        return f"{self.zoo_id}:{key[0]}:{key[1]}"
+
+    def load(self, key):
+        """
+        :return: the chunk with the given key, or None if it isn't stored
+        """
+        row = self.db.conn.execute(
+            "SELECT pickled_chunk FROM chunks WHERE id = ?", (self.chunk_id(key),)
+        ).fetchone()
+        return None if row is None else pickle.loads(row[0])
+
+    def save(self, chunks):
+        """
+        Write chunks to the table.
+        :param chunks: a dictionary of chunk key to (chunk, the number of its cells on the grid)
+        :return:
+        """
+        now = arrow.now().isoformat()
+        rows = [
+            (
+                self.chunk_id(key),
+                self.zoo_id,
+                key[0],
+                key[1],
+                area,
+                chunk.count(self.is_vacant, area),
+                chunk.count(self.is_active, area),
+                pickle.dumps(chunk),
+                now,
+                now,
+            )
+            for key, (chunk, area) in chunks.items()
+        ]
+        if rows:
+            self.db.upsert_many("chunks", tuple(chunk_schema()), rows)
+
+    def delete(self, keys):
+        """
+        Delete chunks from the table.
+        :param keys: the keys of the chunks
+        :return:
+        """
+        self.db.delete_many("chunks", [self.chunk_id(key) for key in keys])
+
+    def keys(self):
+        """
+        :return: the keys of every stored chunk
+        """
+        rows = self.db.conn.execute(
+            "SELECT chunk_x, chunk_y FROM chunks WHERE home_id = ?", (self.zoo_id,)
+        ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def totals(self):
+        """
+        :return: the number of cells and the number of vacant cells of the stored chunks
+        """
+        area, vacant = self.db.conn.execute(
+            "SELECT COALESCE(SUM(area), 0), COALESCE(SUM(vacant), 0) FROM chunks "
+            "WHERE home_id = ?",
+            (self.zoo_id,),
+        ).fetchone()
+        return area, vacant
+
+    def busiest(self, limit):
+        """
+        :param limit: the most keys to return
+        :return: the keys of the chunks with the most occupants that take turns
+        """
+        rows = self.db.conn.execute(
+            "SELECT chunk_x, chunk_y FROM chunks WHERE home_id = ? AND active > 0 "
+            "ORDER BY active DESC, updated_dt DESC LIMIT ?",
+            (self.zoo_id, limit),
+        ).fetchall()
+        return [tuple(row) for row in rows]
+
+
+class PagedChunkGrid(ChunkedGrid):
+    """
+    A ChunkedGrid that keeps the recently used chunks in memory and the rest in a ChunkStore.
+    """
+
+    def __init__(
+        self,
+        height,
+        width,
+        store,
+        budget=PAGE_BUDGET,
+        fill=None,
+        chunk_size=CHUNK_SIZE,
+        on_change=None,
+        on_load=None,
+        on_evict=None,
+    ):
+        """
+        This method is called when the grid is created.
+        :param store: the ChunkStore the chunks are paged to
+        :param budget: the most chunks kept in memory
+        :param on_load: called with the (row, column, thing) of the occupants of a chunk after
+            it is paged in
+        :param on_evict: called with the (row, column, thing) of the occupants of a chunk
+            after it is paged out
+        """
+        super().__init__(height, width, fill=fill, chunk_size=chunk_size, on_change=on_change)
+        # in order of use, the least recently used chunk first
+        self.chunks = OrderedDict()
+        self.store = store
+        self.budget = max(budget, 1)
+        self.on_load = on_load
+        self.on_evict = on_evict
+        self.dirty = set()
+        # the keys known not to be stored, so empty regions aren't looked up again and again
+        self.missing = set()
+
+    def _chunk(self, key):
+        """
+        :return: the chunk with the given key, paged in if needed, or None if it doesn't exist
+        """
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+        if key in self.missing:
+            return None
+        chunk = self.store.load(key)
+        if chunk is None:
+            self.missing.add(key)
+            return None
+        self._make_resident(key, chunk)
+        if self.on_load is not None:
+            self.on_load(list(self.chunk_items(key, chunk)))
+        return chunk
+
+    def _allocate(self, key):
+        """
+        :return: a new chunk for the given key
+        """
+        self.missing.discard(key)
+        chunk = Chunk(self.chunk_size, self.fill)
+        self._make_resident(key, chunk)
+        return chunk
+
+    def _make_resident(self, key, chunk):
+        """
+        Keep a chunk in memory, evicting the least recently used ones over the budget.
+        :return:
+        """
+        self.chunks[key] = chunk
+        while len(self.chunks) > self.budget:
+            self.evict()
+
+    def _changed(self, key):
+        self.dirty.add(key)
+
+    def _free(self, key):
+        super()._free(key)
+        self.dirty.discard(key)
+        self.store.delete([key])
+        self.missing.add(key)
+
+    def evict(self):
+        """
+        Page out the least recently used chunk, writing it back if it changed.
+        :return: the key of the chunk
+        """
+        key, chunk = self.chunks.popitem(last=False)
+        if key in self.dirty:
+            self.dirty.discard(key)
+            self.store.save({key: (chunk, self.chunk_area(key))})
+        if self.on_evict is not None:
+            self.on_evict(list(self.chunk_items(key, chunk)))
+        return key
+
+    def flush(self):
+        """
+        Write every changed chunk in memory back to the store, they stay in memory.
+        :return: the number of chunks written
+        """
+        written = {key: (self.chunks[key], self.chunk_area(key)) for key in self.dirty}
+        self.store.save(written)
+        self.dirty.clear()
+        return len(written)
+
+    def warm(self, limit=None):
+        """
+        Page in the chunks with the most occupants that take turns, up to the budget.
+        :param limit: the most chunks to page in, defaults to the budget
+        :return: the number of chunks paged in
+        """
+        keys = self.store.busiest(self.budget if limit is None else min(limit, self.budget))
+        for key in keys:
+            self._chunk(key)
+        return len(keys)
+
+    def keys(self):
+        """
+        :return: the keys of every chunk, in memory or stored, in order
+        """
+        return sorted(set(self.chunks) | set(self.store.keys()))
+
+    def resident_at(self, x, y):
+        """
+        :return: True if the chunk of the cell at (x, y) is in memory or was never allocated
+        """
+        key, _ = self._locate(x, y)
+        return key in self.chunks or key in self.missing
+
+    def count(self, predicate):
+        """
+        Count the cells a predicate is true for.
+        Vacant cells are counted from the totals of the store, anything else pages every
+        chunk in.
+        :param predicate: a function of a cell's value
+        :return: the number of cells
+        """
+        if predicate is not self.store.is_vacant:
+            return super().count(predicate)
+        # after a flush every chunk in memory is stored as well
+        self.flush()
+        area, vacant = self.store.totals()
+        return vacant + (self.height * self.width - area) * predicate(self.fill)
@@ -0,0 +1,86 @@
+"""
+The zoos that are live in this process, by id.
+Zoo.load_instance hands out the live zoo of an id from the registry without touching the
+database, and only reads a zoo from the database the first time it is asked for or after it
+was invalidated. At most a limit of zoos are kept live: adding one more evicts the least
+recently used, which is saved first since the live zoo is newer than its rows.
+"""
+from collections import OrderedDict
+
+# the number of zoos kept live unless told otherwise
+REGISTRY_LIMIT = 8
+
+
+class ZooRegistry:
+    """
+    The live zoos by id, in the order they were last used.
+    """
+
+    def __init__(self, limit=REGISTRY_LIMIT, on_evict=None):
+        """
+        This method is called when the registry is created.
+        :param limit: the most zoos kept live
+        :param on_evict: called with a zoo before it is evicted
+        """
+        self.limit = limit
+        self.on_evict = on_evict
+        self.zoos = OrderedDict()
+
+    def __len__(self):
+        return len(self.zoos)
+
+    def __contains__(self, zoo_id):
+        return zoo_id in self.zoos
+
+    def get(self, zoo_id):
+        """
+        :return: the live zoo of an id, or None if it isn't live
+        """
+        zoo = self.zoos.get(zoo_id)
+        if zoo is not None:
+            self.zoos.move_to_end(zoo_id)
+        return zoo
+
+    def most_recent(self):
+        """
+        :return: the zoo that was used last, or None if there are none
+        """
+        return next(reversed(self.zoos.values()), None)
+
+    def add(self, zoo):
+        """
+        Make a zoo the live zoo of its id, evicting the least recently used zoos over the limit.
+        :param zoo: the zoo
+        :return: the zoo
+        """
+        self.zoos[zoo.id] = zoo
+        self.zoos.move_to_end(zoo.id)
+        self.evict()
+        return zoo
+
+    def evict(self):
+        """
+        Evict the least recently used zoos until there are no more than the limit.
+        :return: the evicted zoos
+        """
+        evicted = []
+        while len(self.zoos) > max(self.limit, 1):
+            _, zoo = self.zoos.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(zoo)
+            evicted.append(zoo)
+        return evicted
+
+    def discard(self, zoo_id):
+        """
+        Forget the live zoo of an id without saving it, the next load reads it from the database.
+        :return: the zoo, or None if it wasn't live
+        """
+        return self.zoos.pop(zoo_id, None)
+
+    def clear(self):
+        """
+        Forget every live zoo without saving them.
+        :return:
+        """
+        self.zoos.clear()
@@ -0,0 +1,199 @@
+"""
+Seedable random number streams for the simulation.
+Every zoo has a RandomService. Each subsystem (weather, combat, growth, ...) draws from a
+substream of its own, so adding rolls to one subsystem doesn't shift the rolls of the others,
+and a zoo built from the same seed plays out the same way. Substreams draw their numbers from a
+NumPy Generator in blocks, which is much cheaper than one call into the generator per roll.
+The subsystems that roll for many cells at once (rain, filling the blanks) use CellRolls
+instead, whose roll for a cell doesn't depend on which other cells were rolled for, so a grid
+split into stripes rolls the same as the whole one.
+"""
+import zlib
+
+import numpy as np
+
+# how many numbers a stream draws from its generator at a time
+BLOCK_SIZE = 1024
+
+# the random services of every zoo in this process, by zoo id
+SERVICES = {}
+
+
+class RollStream:
+    """
+    One substream of random numbers, handed out from pre-drawn blocks.
+    """
+
+    def __init__(self, seed_sequence, block_size=BLOCK_SIZE):
+        """
+        This method is called when the stream is created.
+        :param seed_sequence: a numpy SeedSequence for the stream
+        :param block_size: how many numbers to draw at a time
+        """
+        self.generator = np.random.Generator(np.random.PCG64(seed_sequence))
+        self.block_size = block_size
+        self._block = []
+        self._index = 0
+
+    def random(self):
+        """
+        :return: a float in [0, 1)
+        """
+        if self._index >= len(self._block):
+            # lists are quicker to index one number at a time than arrays
+            self._block = self.generator.random(self.block_size).tolist()
+            self._index = 0
+        value = self._block[self._index]
+        self._index += 1
+        return value
+
+    def randint(self, low, high):
+        """
+        :return: an integer between low and high, both included
+        """
+        return low + int(self.random() * (high - low + 1))
+
+    def choice(self, options):
+        """
+        :return: one of the options
+        """
+        return options[int(self.random() * len(options))]
+
+    def weighted_choice(self, options, weights):
+        """
+        :return: one of the options, picked in proportion to its weight
+        """
+        roll = self.random() * sum(weights)
+        for option, weight in zip(options, weights):
+            roll -= weight
+            if roll < 0:
+                return option
+        return options[-1]
+
+    def coin(self):
+        """
+        :return: True or False, even odds
+        """
+        return self.random() < 0.5
+
+    def rolls(self, low, high, size):
+        """
+        Roll many dice at once, for the subsystems that work on whole arrays.
+        :return: an array of integers between low and high, both included
+        """
+        return self.generator.integers(low, high, size=size, endpoint=True)
+
+    def uniform(self, size):
+        """
+        :return: an array of floats in [0, 1)
+        """
+        return self.generator.random(size)
+
+
+def _mix(values):
+    """
+    Scramble the bits of 64-bit unsigned integers (the splitmix64 finalizer).
+    :param values: a numpy array of uint64
+    :return: the scrambled array
+    """
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+class CellRolls:
+    """
+    The rolls of one subsystem for the cells of the grid on one turn.
+    The roll of a cell is worked out from the key, the cell and the salt alone, so it is the
+    same however many cells are rolled for and in whichever order or process.
+    """
+
+    def __init__(self, key):
+        """
+        This method is called when the rolls are made.
+        :param key: an integer, see RandomService.cell_rolls
+        """
+        self.key = key
+
+    def _bits(self, xs, ys, salt):
+        """
+        :return: 64 random bits for every cell, as a uint64 array
+        """
+        xs = np.asarray(xs, dtype=np.uint64)
+        ys = np.asarray(ys, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            bits = _mix(np.uint64(self.key) ^ _mix(np.asarray(salt, dtype=np.uint64)))
+            return _mix(_mix(bits ^ xs) ^ ys)
+
+    def uniform(self, xs, ys, salt=0):
+        """
+        :param xs: the rows of the cells
+        :param ys: the columns of the cells
+        :param salt: tells apart the rolls made for different things on the same cell
+        :return: an array of floats in [0, 1), one per cell
+        """
+        return (self._bits(xs, ys, salt) >> np.uint64(11)) * 2.0**-53
+
+    def rolls(self, low, high, xs, ys, salt=0):
+        """
+        :return: an array of integers between low and high, both included, one per cell
+        """
+        return low + (self.uniform(xs, ys, salt) * (high - low + 1)).astype(np.int64)
+
+
+class RandomService:
+    """
+    The random numbers of one zoo, split into independent substreams by subsystem.
+    """
+
+    def __init__(self, seed=None):
+        """
+        This method is called when the service is created.
+        :param seed: the seed of the zoo, None for a fresh one
+        """
+        self.seed = seed
+        self.root = np.random.SeedSequence(seed)
+        self.streams = {}
+
+    def stream(self, subsystem):
+        """
+        :param subsystem: the name of the subsystem, e.g. "weather"
+        :return: the RollStream of the subsystem
+        """
+        if subsystem not in self.streams:
+            # a stream only depends on the seed and its own name, not on when it was asked for
+            key = zlib.crc32(subsystem.encode())
+            self.streams[subsystem] = RollStream(
+                np.random.SeedSequence(self.root.entropy, spawn_key=(key,))
+            )
+        return self.streams[subsystem]
+
+    def cell_rolls(self, subsystem):
+        """
+        Make the rolls of a subsystem for the cells of the grid, keyed from its stream, so
+        each call (e.g. each turn) rolls differently.
+        :param subsystem: the name of the subsystem, e.g. "rain"
+        :return: a CellRolls
+        """
+        return CellRolls(self.stream(subsystem).randint(0, 2**53 - 1))
+
+
+def service_for(zoo_id, seed=None):
+    """
+    Get the random service of a zoo, making it the first time the zoo is seen.
+    :param zoo_id: the id of the zoo
+    :param seed: the seed used if the service is made now
+    :return: the RandomService
+    """
+    if zoo_id not in SERVICES:
+        SERVICES[zoo_id] = RandomService(seed)
+    return SERVICES[zoo_id]
+
+
+def stream(zoo_id, subsystem):
+    """
+    :return: the RollStream of a subsystem of a zoo
+    """
+    return service_for(zoo_id).stream(subsystem)
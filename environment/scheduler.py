@@ -0,0 +1,156 @@
+"""
+The scheduler keeps track of the entities that take turns (animals, plants, corpses),
+so a turn costs time in proportion to the number of living things rather than the area
+of the grid.
+Entities with nothing to do for a while (a sleeping animal) are parked in a priority queue
+keyed by the turn they wake up on, and cost nothing until then.
+"""
+import heapq
+import itertools
+
+
+def takes_turns(thing):
+    """
+    :return: True if the thing takes a turn each turn
+    """
+    return callable(getattr(thing, "turn", None))
+
+
+class Scheduler:
+    """
+    An ordered registry of active entities.
+    Entities take their turns in the order they were registered. Adding an entity, marking
+    it dead and checking if it is dead are O(1); dead entities and entities that left the
+    grid are dropped in one sweep at the end of the turn.
+    Parked entities still count as registered but are left out of the snapshot until they
+    wake, when they go back to the end of the turn order.
+    """
+
+    def __init__(self, entities=()):
+        """
+        This method is called when the scheduler is created.
+        :param entities: the entities to register, in turn order
+        """
+        # dictionaries keep insertion order, which gives a stable turn order
+        self.active = {}
+        self.dead = set()
+        # parked entity to (the turn it was parked on, its place in the wake queue),
+        # and the wake queue as a heap of (wake turn, place, entity)
+        self.parked = {}
+        self.wake_queue = []
+        self.order = itertools.count()
+        for entity in entities:
+            self.add(entity)
+
+    def __len__(self):
+        return len(self.active) + len(self.parked)
+
+    def __contains__(self, entity):
+        return entity in self.active or entity in self.parked
+
+    def __iter__(self):
+        return itertools.chain(self.active, self.parked)
+
+    def add(self, entity):
+        """
+        Register an entity, entities that are already registered keep their place.
+        :param entity: the entity
+        :return:
+        """
+        if entity not in self and takes_turns(entity):
+            self.active[entity] = None
+
+    def discard(self, entity):
+        """
+        Unregister an entity straight away.
+        :param entity: the entity
+        :return:
+        """
+        self.active.pop(entity, None)
+        self.parked.pop(entity, None)
+        self.dead.discard(entity)
+
+    def park(self, entity, turn, wake_turn):
+        """
+        Take an active entity out of the turn order until it is due to wake.
+        :param entity: the entity
+        :param turn: the current turn
+        :param wake_turn: the first turn the entity takes again
+        :return:
+        """
+        if self.active.pop(entity, False) is None:
+            place = next(self.order)
+            self.parked[entity] = (turn, place)
+            heapq.heappush(self.wake_queue, (wake_turn, place, entity))
+
+    def wake(self, turn):
+        """
+        Put the parked entities that are due by this turn back in the turn order.
+        Entities that died while they were parked are dropped.
+        :param turn: the current turn
+        :return: a dictionary of the woken entities to the number of turns they skipped
+        """
+        woken = {}
+        while self.wake_queue and self.wake_queue[0][0] <= turn:
+            _, place, entity = heapq.heappop(self.wake_queue)
+            # left over from an entity that was discarded or parked again since
+            if self.parked.get(entity, (None, None))[1] != place:
+                continue
+            parked_on, _ = self.parked.pop(entity)
+            if entity in self.dead or not getattr(entity, "is_alive", True):
+                self.dead.discard(entity)
+                continue
+            self.active[entity] = None
+            woken[entity] = turn - parked_on - 1
+        return woken
+
+    def sleepers(self):
+        """
+        :return: tuples of (entity, the turn it was parked on, the turn it wakes on) of the
+            parked entities
+        """
+        wake_turns = {place: wake_turn for wake_turn, place, _ in self.wake_queue}
+        return [
+            (entity, parked_on, wake_turns[place])
+            for entity, (parked_on, place) in self.parked.items()
+        ]
+
+    def mark_dead(self, entity):
+        """
+        Mark an entity as dead, it is skipped from now on and dropped at the next sweep.
+        :param entity: the entity
+        :return:
+        """
+        self.dead.add(entity)
+
+    def is_dead(self, entity):
+        """
+        :return: True if the entity has been marked dead
+        """
+        return entity in self.dead
+
+    def snapshot(self):
+        """
+        :return: the registered entities in turn order, safe to iterate while entities
+            are added or removed
+        """
+        return list(self.active)
+
+    def sweep(self, is_present):
+        """
+        Drop the entities that are dead or no longer on the grid.
+        :param is_present: a function that tells if an entity is still on the grid
+        :return: the number of entities dropped
+        """
+        # is_present may register entities, e.g. by paging in a chunk of the grid
+        gone = [
+            entity
+            for entity in list(self.active)
+            if entity in self.dead
+            or not getattr(entity, "is_alive", True)
+            or not is_present(entity)
+        ]
+        for entity in gone:
+            del self.active[entity]
+        self.dead.clear()
+        return len(gone)
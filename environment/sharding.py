@@ -0,0 +1,720 @@
+"""
+Sharded turns for the intent/resolve turn model.
+The grid is split into stripes of rows and each stripe lives in a worker process for the
+whole run, in a zoo of its own that holds the rows of the stripe and a halo of the rows
+around it, wide enough for every entity of the stripe to see all it can reach. Every turn the
+workers first wake, drain and age their animals and hand their edge rows to their neighbours
+as the halo, with where the water and the things the flow fields head for are, so the flow
+fields of a stripe are those of the whole grid. Then a worker decides, resolves and applies
+the intents of its own entities by itself. Only the intents that come near a border between
+stripes (a border intent), and those that share a cell with them, are sent back, and the zoo
+settles them against each other in one small serial pass before the workers apply the
+accepted ones. Every roll is tied to a cell rather than drawn in turn, so a sharded run plays
+out like the run of the whole zoo in one process. After the turn the animals that walked over
+a border move to the stripe they are in now.
+The zoo's own grid is only brought up to date when the stripes are collected, e.g. to save it.
+"""
+import bisect
+import functools
+import itertools
+import multiprocessing
+import os
+
+import numpy as np
+
+import database
+import environment.rng
+from database.ids import ALLOCATORS, BLOCK_SIZE, IdAllocator, allocator_for
+from environment.buildings import Zoo
+from environment.chunks import ChunkedGrid
+from environment.fields import BLOCK_SIZE as FIELD_BLOCK_SIZE
+from environment.fields import REACH, DistanceField, LocalField
+from environment.grid import Tile
+from environment.intents import GridSnapshot, apply, decide_all, resolve, turn_seed
+from environment.liquids import Water
+from environment.terrain import DIRT
+from organisms.animals import Animal
+from organisms.metabolism import metabolize
+
+# sleeping animals look at the neighbours of their neighbours
+MIN_HALO = 2
+
+# how many rows beyond its own the flow fields of a stripe of a sparse zoo see, the rows of the
+# blocks of its cells and the reach of the blocks
+FIELD_ROWS = FIELD_BLOCK_SIZE + REACH
+
+
+def stripes(height, shards):
+    """
+    Split the rows of the grid into stripes of (nearly) the same height.
+    :param height: the number of rows
+    :param shards: the number of stripes
+    :return: a list of (first row, row after the last) tuples, empty stripes left out
+    """
+    bounds = [round(shard * height / shards) for shard in range(shards + 1)]
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def halo_width(entities):
+    """
+    :return: how many rows beyond its stripe a worker needs to see
+    """
+    return max([MIN_HALO] + [getattr(entity, "speed", 0) for entity in entities])
+
+
+def cells_in_rows(grid, start, end):
+    """
+    Walk the occupied cells of some rows of a grid, a list of rows or a ChunkedGrid.
+    :param grid: the grid
+    :param start: the first row
+    :param end: the row after the last one
+    :return: tuples of (row, column, thing), with the things of tiles
+    """
+    if isinstance(grid, ChunkedGrid):
+        cells = grid.items_in_rows(start, end)
+    else:
+        cells = (
+            (x, y, cell)
+            for x in range(start, end)
+            for y, cell in enumerate(grid[x])
+            if cell is not None
+        )
+    for x, y, thing in cells:
+        yield x, y, thing.type if isinstance(thing, Tile) else thing
+
+
+def rows_of(intent):
+    """
+    :return: the rows of the cells an intent is about: its actor, its target and the cell
+        something is born in
+    """
+    return [cell[0] for cell in (intent.source, intent.target, intent.spawn_at) if cell]
+
+
+def border_intents(intents, on_border):
+    """
+    Split intents into those that have to be settled with the neighbours' and those a stripe
+    can settle by itself. Intents only change each other's fate through the cells they are
+    about, so an intent that shares a cell with a border intent, or with an intent that does,
+    is settled with the border intents.
+    :param intents: the intents of the stripe
+    :param on_border: a function that tells if an intent comes near a border
+    :return: the intents to settle with the neighbours' and the rest
+    """
+    groups = list(range(len(intents)))
+
+    def group_of(index):
+        while groups[index] != index:
+            groups[index] = groups[groups[index]]
+            index = groups[index]
+        return index
+
+    first_on = {}
+    for index, intent in enumerate(intents):
+        for cell in (intent.source, intent.target, intent.spawn_at):
+            if cell is None:
+                continue
+            if cell in first_on:
+                groups[group_of(index)] = group_of(first_on[cell])
+            else:
+                first_on[cell] = index
+    near = {group_of(index) for index, intent in enumerate(intents) if on_border(intent)}
+    border, local = [], []
+    for index, intent in enumerate(intents):
+        (border if group_of(index) in near else local).append(intent)
+    return border, local
+
+
+class Landmarks(dict):
+    """
+    The cells of the things in some rows of the grid, as arrays of rows and columns by the
+    class of the things. The stripes put theirs together every turn for the flow fields.
+    """
+
+    @classmethod
+    def in_rows(cls, grid, start, end):
+        """
+        :return: the Landmarks of some rows of a grid
+        """
+        cells = {}
+        for x, y, thing in cells_in_rows(grid, start, end):
+            cells.setdefault(thing.__class__, []).append((x, y))
+        return cls(
+            (kind, tuple(np.array(found, dtype=np.int64).T)) for kind, found in cells.items()
+        )
+
+    @classmethod
+    def merge(cls, parts):
+        """
+        :return: the Landmarks of all the rows of some Landmarks
+        """
+        cells = {}
+        for part in parts:
+            for kind, (xs, ys) in part.items():
+                cells.setdefault(kind, []).append((xs, ys))
+        return cls(
+            (kind, tuple(np.concatenate(values) for values in zip(*found)))
+            for kind, found in cells.items()
+        )
+
+    def rows(self, start, end):
+        """
+        :return: the Landmarks of the rows from start to end, end not included
+        """
+        landmarks = Landmarks()
+        for kind, (xs, ys) in self.items():
+            inside = (start <= xs) & (xs < end)
+            if inside.any():
+                landmarks[kind] = xs[inside], ys[inside]
+        return landmarks
+
+    def bitmap(self, thing_class, window):
+        """
+        :param thing_class: the class of thing
+        :param window: the first row, last row + 1, first column and last column + 1 of the
+            cells to cover
+        :return: a bitmap of every cell of the window holding an instance of the class or its
+            subclasses, like OccupancyIndex.bitmap
+        """
+        x_min, x_max, y_min, y_max = window
+        bitmap = np.zeros((x_max - x_min, y_max - y_min), dtype=bool)
+        for kind, (xs, ys) in self.items():
+            if not issubclass(kind, thing_class):
+                continue
+            inside = (x_min <= xs) & (xs < x_max) & (y_min <= ys) & (ys < y_max)
+            bitmap[xs[inside] - x_min, ys[inside] - y_min] = True
+        return bitmap
+
+    def passable(self, window):
+        """
+        :return: a bitmap of the cells of a window the flow fields go through, every cell
+            but water
+        """
+        return ~self.bitmap(Water, window)
+
+
+class BorderCells(dict):
+    """
+    The cells the border intents of a turn are about, by position, as the workers saw them
+    at the start of the turn. The border intents are resolved against it.
+    """
+
+    def at(self, x, y):
+        """
+        :return: the thing in the cell at (x, y)
+        """
+        return self.get((x, y))
+
+
+class BlockAllocator(IdAllocator):
+    """
+    Hands out the ids of a zoo in a worker process, only from the blocks the zoo reserved
+    for it, as the worker has no access to the database of the zoo.
+    """
+
+    def reserve(self):
+        """
+        A worker can't reserve ids, the zoo tops its block up between turns.
+        :return:
+        """
+        raise ValueError(f"a stripe of zoo {self.zoo_id} has run out of ids")
+
+
+class Stripe:
+    """
+    The rows of the zoo a worker process looks after, in a zoo as big as the whole one that
+    only holds the stripe and its halo.
+    """
+
+    def __init__(
+        self, zoo_id, height, width, seed, bounds, halo, sparse, cells, dirt, sleepers, ids
+    ):
+        """
+        This method is called when the worker takes over its stripe.
+        :param zoo_id: the id of the zoo
+        :param height: the number of rows of the zoo
+        :param width: the number of columns of the zoo
+        :param seed: the seed of the zoo, see turn_seed
+        :param bounds: the first row of the stripe and the row after the last
+        :param halo: the number of rows of the halo on either side
+        :param sparse: if the zoo is sparse, a dense one fills the blanks of the stripe
+        :param cells: the (row, column, thing) of the occupied cells of the stripe
+        :param dirt: the (row, column, size) of the dirt of the stripe
+        :param sleepers: the (row, column, turn parked on, wake turn) of the parked sleepers
+        :param ids: the block of ids the stripe hands out, see IdAllocator.hand_out
+        """
+        # the stripe is a zoo of its own with the seed, its rolls are tied to the cells
+        environment.rng.SERVICES.pop(zoo_id, None)
+        self.zoo = Zoo(height=height, width=width, id=zoo_id, seed=seed, sparse=sparse)
+        self.zoo.autosave = False
+        Zoo.registry.add(self.zoo)
+        self.ids = ALLOCATORS[zoo_id] = BlockAllocator(zoo_id)
+        self.ids.adopt(*ids)
+        self.start, self.end = bounds
+        self.halo = halo
+        # the borders with other stripes, and the rows of the halo on either side
+        self.edges = [edge for edge in bounds if 0 < edge < height]
+        self.halo_rows = [
+            (first, last)
+            for first, last in (
+                (max(self.start - halo, 0), self.start),
+                (self.end, min(self.end + halo, height)),
+            )
+            if first < last
+        ]
+        for x, y, thing in cells:
+            self.zoo.set_cell(x, y, thing)
+        if dirt:
+            self.zoo.lay_dirt(*zip(*dirt))
+        for x, y, parked_on, wake_turn in sleepers:
+            self.zoo.scheduler.park(self.zoo.grid[x][y], parked_on, wake_turn)
+        self.discard_strangers()
+        self.snapshot = None
+        self.landmarks = None
+        self.animals = []
+        self.acting = []
+
+    def owns(self, row):
+        """
+        :return: True if a row belongs to the stripe rather than its halo
+        """
+        return self.start <= row < self.end
+
+    def on_border(self, intent):
+        """
+        :return: True if an intent comes within a halo of a border, where the intents of
+            the stripe on the other side can reach
+        """
+        return any(
+            edge - self.halo <= row < edge + self.halo
+            for row in rows_of(intent)
+            for edge in self.edges
+        )
+
+    def discard_strangers(self):
+        """
+        Only the entities of the stripe take turns here, the things of the halo belong to
+        the neighbours.
+        :return:
+        """
+        scheduler = self.zoo.scheduler
+        for entity in list(scheduler):
+            position = getattr(entity, "position", None)
+            if position is None or not self.owns(position[0]):
+                scheduler.discard(entity)
+
+    def prepare(self, turn, arrivals, ids):
+        """
+        The start of a turn: take in the animals that crossed over, then wake, drain and age
+        the animals of the stripe.
+        :param turn: the current turn
+        :param arrivals: the animals that walked into the stripe last turn
+        :param ids: another block of ids to hand out, or None
+        :return: a dictionary of the edge rows for the neighbours ("up" and "down") and the
+            Landmarks of the stripe, as they are when the stripe decides
+        """
+        zoo = self.zoo
+        scheduler = zoo.scheduler
+        for animal in arrivals:
+            x, y = animal.position
+            # the arrival replaces the copy the halo moved in last turn
+            scheduler.discard(zoo.grid[x][y])
+            zoo.set_cell(x, y, animal)
+            if animal.sleep_counter > 0:
+                scheduler.park(animal, turn - 1, wake_turn=turn + animal.sleep_counter)
+        self.discard_strangers()
+        if ids is not None:
+            self.ids.adopt(*ids)
+
+        woken = scheduler.wake(turn)
+        for animal in woken:
+            animal.sleep_counter = 0
+        entities = scheduler.snapshot()
+        self.animals = [thing for thing in entities if isinstance(thing, Animal)]
+        for thing in metabolize(self.animals, turn_number=turn, skipped=woken):
+            scheduler.mark_dead(thing)
+        self.acting = [
+            thing
+            for thing in entities
+            if not scheduler.is_dead(thing) and thing.is_alive and zoo.holds(thing)
+        ]
+        return {
+            "up": list(cells_in_rows(zoo.grid, self.start, self.start + self.halo))
+            if self.start > 0
+            else [],
+            "down": list(cells_in_rows(zoo.grid, self.end - self.halo, self.end))
+            if self.end < zoo.height
+            else [],
+            "landmarks": Landmarks.in_rows(zoo.grid, self.start, self.end),
+        }
+
+    def flow_field(self, kind):
+        """
+        :param kind: the class of thing to head for
+        :return: the flow field to the nearest thing of the kind, worked out from the
+            Landmarks like Zoo.get_flow_field works it out from the grid
+        """
+        height, width = len(self.zoo.grid), len(self.zoo.grid[0])
+        sources = functools.partial(self.landmarks.bitmap, kind)
+        if self.zoo.sparse:
+            return LocalField(height, width, sources, passable=self.landmarks.passable)
+        window = (0, height, 0, width)
+        return DistanceField(sources(window), passable=self.landmarks.passable(window))
+
+    def begin(self, turn, halo_cells, landmarks):
+        """
+        The middle of a turn: take in the halo, then decide, resolve and apply the intents of
+        the stripe that stay clear of its borders.
+        :param turn: the current turn
+        :param halo_cells: the (row, column, thing) of the occupied cells of the halo
+        :param landmarks: the Landmarks of the rows the flow fields of the stripe see
+        :return: the border intents, and the cells they and the neighbours' border intents
+            can be about by position, as they are at the start of the turn
+        """
+        zoo = self.zoo
+        scheduler = zoo.scheduler
+        for first, last in self.halo_rows:
+            for x, y, thing in list(cells_in_rows(zoo.grid, first, last)):
+                zoo.clear_cell(x, y)
+                scheduler.discard(thing)
+        for x, y, thing in halo_cells:
+            zoo.set_cell(x, y, thing)
+        self.discard_strangers()
+        self.landmarks = landmarks
+
+        self.snapshot = GridSnapshot(zoo.grid, fields=self.flow_field)
+        seed = turn_seed(zoo)
+        border, local = border_intents(
+            decide_all(self.acting, self.snapshot, seed, turn), self.on_border
+        )
+        # the neighbours' border intents reach as far into the stripe as a halo
+        cells = BorderCells()
+        for edge in self.edges:
+            first, last = max(edge - self.halo, self.start), min(edge + self.halo, self.end)
+            cells.update(
+                ((x, y), thing) for x, y, thing in cells_in_rows(zoo.grid, first, last)
+            )
+        for intent in border:
+            for cell in (intent.source, intent.target, intent.spawn_at):
+                if cell and self.owns(cell[0]):
+                    cells[cell] = self.snapshot.at(*cell)
+        zoo.snapshots.append(self.snapshot)
+        apply(zoo, self.snapshot, resolve(local, self.snapshot, seed, turn), turn)
+        return border, cells
+
+    def finish(self, turn, accepted, intensity, rain, fill):
+        """
+        The end of a turn: apply the border intents the zoo accepted, put the sleepers away
+        and let the weather fall on the stripe.
+        :param turn: the current turn
+        :param accepted: the accepted border intents that touch the rows of the stripe, or
+            catch prey that went into them
+        :param intensity: the intensity of the rain, None if it is dry
+        :param rain: the CellRolls of the rain, None if it is dry
+        :param fill: the CellRolls for filling the blanks, None for a sparse zoo
+        :return: a dictionary of the animals that walked out of the stripe, the number of
+            living animals and entities, and the number of ids left
+        """
+        zoo = self.zoo
+        try:
+            for intent in accepted:
+                if self.snapshot.at(*intent.source) is not None:
+                    apply(zoo, self.snapshot, [intent], turn)
+                elif intent.kind == "eat" and isinstance(
+                    prey := self.snapshot.at(*intent.target), Animal
+                ):
+                    # a predator out of sight caught its prey after the prey came this way
+                    prey.die("predation")
+        finally:
+            zoo.snapshots.remove(self.snapshot)
+            self.snapshot = None
+        emigrants = [
+            thing
+            for thing in self.acting
+            if zoo.holds(thing) and not self.owns(thing.position[0])
+        ]
+        self.discard_strangers()
+        zoo.scheduler.sweep(zoo.holds)
+        for animal in self.animals:
+            if animal.sleep_counter > 0 and animal.is_alive:
+                zoo.scheduler.park(animal, turn, wake_turn=turn + animal.sleep_counter + 1)
+        rows = (self.start, self.end)
+        if intensity is not None:
+            zoo.apply_rain(intensity, rolls=rain, rows=rows)
+        if fill is not None:
+            zoo.fill_blanks(intensity, rolls=fill, rows=rows)
+        zoo.elapsed_turns += 1
+        return {
+            "emigrants": emigrants,
+            "animals": zoo.count_animals(),
+            "entities": len(zoo.scheduler),
+            "ids": self.ids.remaining(),
+        }
+
+    def collect(self):
+        """
+        :return: what the zoo needs to take the stripe back: the (row, column, thing) of its
+            occupied cells, the (row, column, size) of its dirt and the (row, column, turn
+            parked on, wake turn) of its parked sleepers
+        """
+        zoo = self.zoo
+        cells = list(cells_in_rows(zoo.grid, self.start, self.end))
+        xs, ys = zoo.terrain.cells(DIRT)
+        dirt = [
+            (x, y, size)
+            for x, y, size in zip(
+                xs.tolist(), ys.tolist(), zoo.terrain.sizes(xs, ys).tolist()
+            )
+            if self.owns(x)
+        ]
+        sleepers = [
+            (thing.position[0], thing.position[1], parked_on, wake_turn)
+            for thing, parked_on, wake_turn in zoo.scheduler.sleepers()
+        ]
+        return cells, dirt, sleepers
+
+
+def serve(connection):
+    """
+    The loop of a worker process: take a stripe over, then run the methods of the stripe
+    the zoo asks for until it sends None.
+    :param connection: the worker's end of the pipe to the zoo
+    :return:
+    """
+    # the worker never touches the database or the zoos of the process it came from
+    database.use_database(":memory:")
+    Zoo.clear_instance()
+    stripe = None
+    while (message := connection.recv()) is not None:
+        method, args = message
+        try:
+            if method == "load":
+                stripe = Stripe(*args)
+                connection.send(("ok", None))
+            else:
+                connection.send(("ok", getattr(stripe, method)(*args)))
+        except Exception as error:
+            connection.send(("error", error))
+    connection.close()
+
+
+class ShardedZoo:
+    """
+    Runs the turns of a zoo over worker processes that keep one stripe of the grid each.
+    Collect the stripes before the zoo is read or saved, and close it when the run is over.
+    """
+
+    def __init__(self, zoo, shards=None):
+        """
+        This method is called when the zoo is handed to the workers.
+        :param zoo: the zoo
+        :param shards: the number of stripes and worker processes, defaults to one per core,
+            and to fewer if the stripes would be narrower than their halo
+        """
+        self.zoo = zoo
+        scheduler = zoo.scheduler
+        # the rows and columns of the grid itself, like the snapshot
+        self.height, self.width = len(zoo.grid), len(zoo.grid[0])
+        self.halo = halo_width(list(scheduler))
+        shards = shards or os.cpu_count() or 1
+        self.bounds = stripes(self.height, max(1, min(shards, self.height // self.halo)))
+        self.starts = [start for start, _ in self.bounds]
+        allocator = allocator_for(zoo.id)
+        sleepers = {
+            entity: (parked_on, wake_turn)
+            for entity, parked_on, wake_turn in scheduler.sleepers()
+        }
+        xs, ys = zoo.terrain.cells(DIRT)
+        dirt = list(zip(xs.tolist(), ys.tolist(), zoo.terrain.sizes(xs, ys).tolist()))
+        self.workers = []
+        for start, end in self.bounds:
+            here, there = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=serve, args=(there,), daemon=True)
+            process.start()
+            there.close()
+            self.workers.append((process, here))
+            cells = list(cells_in_rows(zoo.grid, start, end))
+            parked = [(x, y, *sleepers[thing]) for x, y, thing in cells if thing in sleepers]
+            here.send(
+                (
+                    "load",
+                    (
+                        zoo.id,
+                        self.height,
+                        self.width,
+                        turn_seed(zoo),
+                        (start, end),
+                        self.halo,
+                        zoo.sparse,
+                        cells,
+                        [(x, y, size) for x, y, size in dirt if start <= x < end],
+                        parked,
+                        allocator.hand_out(max(BLOCK_SIZE, 2 * len(cells))),
+                    ),
+                )
+            )
+        self._gather()
+        self.animals = zoo.count_animals()
+        # what each worker is handed at the start of the next turn
+        self.arrivals = [[] for _ in self.bounds]
+        self.ids = [None for _ in self.bounds]
+
+    def _ask(self, method, args):
+        """
+        Ask every worker to run a method of its stripe.
+        :param method: the name of the method
+        :param args: the arguments of the method for each worker
+        :return: the results, by worker
+        """
+        for (_, connection), worker_args in zip(self.workers, args):
+            connection.send((method, worker_args))
+        return self._gather()
+
+    def _gather(self):
+        """
+        Wait for every worker to answer, and raise the first error any of them ran into.
+        :return: the answers, by worker
+        """
+        replies = [connection.recv() for _, connection in self.workers]
+        for status, reply in replies:
+            if status == "error":
+                raise reply
+        return [reply for _, reply in replies]
+
+    def take_turn(self, turn):
+        """
+        Every stripe takes its turn, then the border intents are settled and the stripes
+        hand over the animals that crossed their borders.
+        :param turn: the turn number
+        :return: False if there are no animals left, otherwise True
+        """
+        if not self.animals:
+            return False
+        zoo = self.zoo
+        prepared = self._ask(
+            "prepare",
+            [(turn, arrivals, ids) for arrivals, ids in zip(self.arrivals, self.ids)],
+        )
+        halos = [[] for _ in self.bounds]
+        for index, report in enumerate(prepared):
+            if index > 0:
+                halos[index - 1].extend(report["up"])
+            if index + 1 < len(prepared):
+                halos[index + 1].extend(report["down"])
+        landmarks = Landmarks.merge(report["landmarks"] for report in prepared)
+        halves = self._ask(
+            "begin",
+            [
+                (
+                    turn,
+                    halo,
+                    landmarks.rows(start - FIELD_ROWS, end + FIELD_ROWS)
+                    if zoo.sparse
+                    else landmarks,
+                )
+                for halo, (start, end) in zip(halos, self.bounds)
+            ],
+        )
+        intents = []
+        cells = BorderCells()
+        for border, seen in halves:
+            intents.extend(border)
+            cells.update(seen)
+        accepted = resolve(intents, cells, turn_seed(zoo), turn)
+        # a predator catches its prey where the prey went, which can be in another stripe
+        went = {
+            intent.source: intent.target[0]
+            for intent in accepted
+            if intent.kind in ("eat", "move")
+        }
+        reach = [
+            rows_of(intent)
+            + ([went[intent.target]] if intent.kind == "eat" and intent.target in went else [])
+            for intent in accepted
+        ]
+        # the same rolls in the same order as Zoo.advance_environment
+        intensity, _ = zoo.weather(verbose=False)
+        rain = zoo.rng.cell_rolls("rain") if intensity is not None else None
+        fill = None if zoo.sparse else zoo.rng.cell_rolls("fill")
+        reports = self._ask(
+            "finish",
+            [
+                (
+                    turn,
+                    [
+                        intent
+                        for intent, rows in zip(accepted, reach)
+                        if any(start <= row < end for row in rows)
+                    ],
+                    intensity,
+                    rain,
+                    fill,
+                )
+                for start, end in self.bounds
+            ],
+        )
+
+        self.arrivals = [[] for _ in self.bounds]
+        for report in reports:
+            for animal in report["emigrants"]:
+                shard = bisect.bisect_right(self.starts, animal.position[0]) - 1
+                self.arrivals[shard].append(animal)
+        # every intent makes at most one thing, the stripe's or a neighbour's in the halo
+        allocator = allocator_for(zoo.id)
+        self.ids = []
+        for report, halo, arrivals in zip(reports, halos, self.arrivals):
+            needed = 2 * (report["entities"] + len(arrivals) + len(halo))
+            self.ids.append(
+                allocator.hand_out(max(BLOCK_SIZE, 2 * needed))
+                if report["ids"] < needed
+                else None
+            )
+        self.animals = sum(report["animals"] for report in reports)
+        zoo.elapsed_turns += 1
+        return True
+
+    def collect(self):
+        """
+        Bring the grid, dirt and sleepers of the zoo up to date with the stripes, e.g. to
+        save it. The workers carry on with their stripes.
+        :return:
+        """
+        zoo = self.zoo
+        parked = []
+        stripes_back = self._ask("collect", [() for _ in self.workers])
+        for (start, end), (cells, dirt, sleepers) in zip(self.bounds, stripes_back):
+            occupied = {(x, y) for x, y, _ in cells}
+            for x, y, _ in list(cells_in_rows(zoo.grid, start, end)):
+                if (x, y) not in occupied:
+                    zoo.clear_cell(x, y)
+            for x, y, thing in cells:
+                zoo.set_cell(x, y, thing)
+            if dirt:
+                zoo.lay_dirt(*zip(*dirt))
+            parked.extend(sleepers)
+        # a stripe only holds a copy of the animals that walked into it until they arrive
+        for animal in itertools.chain.from_iterable(self.arrivals):
+            zoo.set_cell(animal.position[0], animal.position[1], animal)
+        scheduler = zoo.scheduler
+        for entity in list(scheduler):
+            if not zoo.holds(entity):
+                scheduler.discard(entity)
+        for x, y, parked_on, wake_turn in parked:
+            scheduler.park(zoo.grid[x][y], parked_on, wake_turn)
+
+    def close(self):
+        """
+        Shut down the worker processes.
+        :return:
+        """
+        for process, connection in self.workers:
+            connection.send(None)
+            process.join()
+            connection.close()
+        self.workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,186 @@
+"""
+A spatial hash of the animals and corpses on the zoo grid.
+The grid is cut into square buckets and every animal and corpse is kept in the bucket of its
+cell, per class. Finding the nearest things of a class only looks at the buckets in rings
+around the cell, nearest ring first, and stops as soon as no further ring can hold anything
+closer, so hunting, fleeing and scavenging cost the same however many animals live in the
+rest of the zoo. Distances are Chebyshev by default, the number of moves between two cells,
+or Euclidean.
+"""
+import math
+
+import organisms
+from environment.chunks import ChunkedGrid
+from environment.grid import Tile
+from organisms.dead_things import Corpse
+
+# the number of rows and columns of cells in a bucket
+BUCKET_SIZE = 8
+
+
+def chebyshev(dx, dy):
+    """
+    :return: the number of moves between two cells dx rows and dy columns apart
+    """
+    return max(abs(dx), abs(dy))
+
+
+def euclidean(dx, dy):
+    """
+    :return: the straight line distance between two cells dx rows and dy columns apart
+    """
+    return math.hypot(dx, dy)
+
+
+METRICS = {"chebyshev": chebyshev, "euclidean": euclidean}
+
+
+class SpatialHash:
+    """
+    The animals and corpses of the grid in buckets by class.
+    """
+
+    def __init__(self, height, width, bucket_size=BUCKET_SIZE):
+        """
+        This method is called when the index is created.
+        :param height: the number of rows in the grid
+        :param width: the number of columns in the grid
+        :param bucket_size: the number of rows and columns of cells in a bucket
+        """
+        self.height = height
+        self.width = width
+        self.bucket_size = bucket_size
+        # class -> (bucket row, bucket column) -> (x, y) -> thing
+        self.buckets = {}
+
+    @classmethod
+    def from_grid(cls, grid, bucket_size=BUCKET_SIZE):
+        """
+        Build an index from a grid of objects.
+        :param grid: the zoo grid
+        :return: the index
+        """
+        index = cls(len(grid), len(grid[0]) if grid else 0, bucket_size)
+        if isinstance(grid, ChunkedGrid):
+            for x, y, thing in grid.resident_items():
+                index.add(x, y, thing)
+            return index
+        for x, row in enumerate(grid):
+            for y, thing in enumerate(row):
+                index.add(x, y, thing)
+        return index
+
+    @staticmethod
+    def _indexed(thing):
+        """
+        :return: the thing if it is indexed (an animal or a corpse), otherwise None
+        """
+        if isinstance(thing, Tile):
+            thing = thing.type
+        if isinstance(thing, (organisms.animals.Animal, Corpse)):
+            return thing
+        return None
+
+    def _bucket(self, x, y):
+        """
+        :return: the bucket of a cell
+        """
+        return x // self.bucket_size, y // self.bucket_size
+
+    def add(self, x, y, thing):
+        """
+        Put a thing in the bucket of its cell.
+        :param x: the row of the cell
+        :param y: the column of the cell
+        :param thing: the thing in the cell
+        :return:
+        """
+        if (thing := self._indexed(thing)) is None:
+            return
+        buckets = self.buckets.setdefault(thing.__class__, {})
+        buckets.setdefault(self._bucket(x, y), {})[x, y] = thing
+
+    def remove(self, x, y, thing):
+        """
+        Take a thing out of the bucket of the cell it left.
+        :param x: the row of the cell
+        :param y: the column of the cell
+        :param thing: the thing that left the cell
+        :return:
+        """
+        if (thing := self._indexed(thing)) is None:
+            return
+        buckets = self.buckets.get(thing.__class__, {})
+        bucket = buckets.get(self._bucket(x, y))
+        if bucket is not None and bucket.get((x, y)) is thing:
+            del bucket[x, y]
+            if not bucket:
+                del buckets[self._bucket(x, y)]
+
+    def _in_bucket(self, thing_class, bucket):
+        """
+        :return: tuples of (row, column, thing) of the instances of a class in a bucket
+        """
+        for key, buckets in self.buckets.items():
+            if issubclass(key, thing_class) and bucket in buckets:
+                for (x, y), thing in buckets[bucket].items():
+                    yield x, y, thing
+
+    def _ring(self, bucket_x, bucket_y, ring):
+        """
+        :return: the buckets ring buckets away from a bucket, left out where off the grid
+        """
+        rows = range(
+            max(bucket_x - ring, 0), min(bucket_x + ring, (self.height - 1) // self.bucket_size) + 1
+        )
+        columns = range(
+            max(bucket_y - ring, 0), min(bucket_y + ring, (self.width - 1) // self.bucket_size) + 1
+        )
+        for i in rows:
+            for j in columns:
+                if max(abs(i - bucket_x), abs(j - bucket_y)) == ring:
+                    yield i, j
+
+    def nearest(self, thing_class, x, y, k=1, radius=None, metric="chebyshev", exclude=None):
+        """
+        Find the things of a class nearest to a cell, the cell itself left out.
+        :param thing_class: the class of thing to look for, its subclasses count too
+        :param x: the row of the cell
+        :param y: the column of the cell
+        :param k: the most things to return, every one if None
+        :param radius: only look this far, no limit if None
+        :param metric: "chebyshev" or "euclidean"
+        :param exclude: a function that returns True for things that don't count
+        :return: a list of (distance, row, column, thing), nearest first
+        """
+        distance_to = METRICS[metric]
+        bucket_x, bucket_y = self._bucket(x, y)
+        rings = max(self.height, self.width) // self.bucket_size + 1
+        found = []
+        for ring in range(rings):
+            # nothing in this ring or further out is closer than this
+            closest = (ring - 1) * self.bucket_size + 1 if ring else 0
+            if radius is not None and closest > radius:
+                break
+            if k is not None and len(found) >= k and closest > found[k - 1][0]:
+                break
+            for bucket in self._ring(bucket_x, bucket_y, ring):
+                for i, j, thing in self._in_bucket(thing_class, bucket):
+                    distance = distance_to(i - x, j - y)
+                    if (
+                        (i, j) != (x, y)
+                        and (radius is None or distance <= radius)
+                        and not (exclude is not None and exclude(thing))
+                    ):
+                        found.append((distance, i, j, thing))
+            found.sort(key=lambda hit: hit[:3])
+        return found if k is None else found[:k]
+
+    def within(self, thing_class, x, y, radius, metric="chebyshev", exclude=None):
+        """
+        Find every thing of a class within radius of a cell, the cell itself left out.
+        :return: a list of (distance, row, column, thing), nearest first
+        """
+        return self.nearest(
+            thing_class, x, y, k=None, radius=radius, metric=metric, exclude=exclude
+        )
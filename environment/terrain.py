@@ -0,0 +1,378 @@
+"""
+The terrain layer of the zoo, the ground under the occupants of the grid.
+Every cell has a terrain kind (bare, dirt or water) packed in a uint8 and a size packed in a
+uint16, so dirt and water are not objects of their own and are stored as one row per zoo
+instead of one row per cell. The grid only holds the occupants: animals, plants, corpses and a
+Water for every water cell, since water blocks the cell and is drunk from. A Water on the grid
+of a zoo is bound to the terrain and reads and writes its size there.
+A dense zoo keeps its terrain in arrays, a sparse zoo in a dictionary of the cells that aren't
+bare.
+"""
+import io
+import sqlite3
+
+import arrow
+import numpy as np
+
+import database
+from environment.chunks import CHUNK_SIZE
+
+# the terrain kinds, the same codes as the cell kinds of the engine
+BARE = 0
+DIRT = 1
+WATER = 2
+
+# the largest size a cell of terrain can hold
+MAX_SIZE = np.iinfo(np.uint16).max
+
+
+def terrain_schema():
+    """
+    :return: a dictionary of the schema of the terrain table
+    """
+    return {
+        "home_id": "TEXT PRIMARY KEY REFERENCES zoos(id)",
+        "height": "INTEGER",
+        "width": "INTEGER",
+        "layer": "BLOB",
+        "created_dt": "TEXT",
+        "updated_dt": "TEXT",
+    }
+
+
+def make_terrain(height, width, sparse=False):
+    """
+    :param sparse: make a SparseTerrainLayer, which allocates nothing for bare cells
+    :return: a terrain layer of the given size with every cell bare
+    """
+    return SparseTerrainLayer(height, width) if sparse else TerrainLayer(height, width)
+
+
+class TerrainLayer:
+    """
+    The terrain of a dense zoo, a kind and a size array as big as the grid.
+    """
+
+    def __init__(self, height, width):
+        """
+        This method is called when the layer is created.
+        :param height: the number of rows in the grid
+        :param width: the number of columns in the grid
+        """
+        self.height = height
+        self.width = width
+        self.kind = np.zeros((height, width), dtype=np.uint8)
+        self.size = np.zeros((height, width), dtype=np.uint16)
+        # True when the layer changed since it was last saved
+        self.dirty = False
+        # called with the row, column and size when the size of a cell is changed on its own
+        self.on_resize = None
+
+    def kind_at(self, x, y):
+        """
+        :return: the terrain kind of a cell
+        """
+        return int(self.kind[x, y])
+
+    def size_at(self, x, y):
+        """
+        :return: the size of the terrain of a cell
+        """
+        return int(self.size[x, y])
+
+    def set(self, x, y, kind, size=0):
+        """
+        Set the terrain of a cell.
+        :param kind: one of the terrain kinds
+        :param size: the size of the dirt or water, clamped to what a cell can hold
+        :return:
+        """
+        self.kind[x, y] = kind
+        self.size[x, y] = min(max(size, 0), MAX_SIZE) if kind != BARE else 0
+        self.dirty = True
+
+    def set_size(self, x, y, size):
+        """
+        Change the size of the terrain of a cell, keeping its kind.
+        :return:
+        """
+        self.size[x, y] = min(max(size, 0), MAX_SIZE)
+        self.dirty = True
+        if self.on_resize is not None:
+            self.on_resize(x, y, self.size_at(x, y))
+
+    def clear(self, x, y):
+        """
+        Make a cell bare.
+        :return:
+        """
+        self.set(x, y, BARE)
+
+    def fill(self, xs, ys, kind, sizes):
+        """
+        Set the terrain of many cells at once.
+        :param xs: an array of the rows of the cells
+        :param ys: an array of the columns of the cells
+        :param kind: one of the terrain kinds
+        :param sizes: an array of their sizes
+        :return:
+        """
+        self.kind[xs, ys] = kind
+        self.size[xs, ys] = np.clip(sizes, 0, MAX_SIZE)
+        self.dirty = True
+
+    def cells(self, kind):
+        """
+        :return: the arrays of the rows and columns of the cells of a kind
+        """
+        return np.nonzero(self.kind == kind)
+
+    def sizes(self, xs, ys):
+        """
+        :return: an array of the sizes of the terrain of the given cells
+        """
+        return self.size[xs, ys]
+
+    def mask(self, kind, window=None):
+        """
+        :param kind: one of the terrain kinds
+        :param window: the first row, last row + 1, first column and last column + 1 of the
+            cells to cover, the whole grid if None
+        :return: a boolean array that is True where the terrain is of a kind
+        """
+        if window is None:
+            return self.kind == kind
+        x_min, x_max, y_min, y_max = window
+        return self.kind[x_min:x_max, y_min:y_max] == kind
+
+    def bind(self, x, y, water):
+        """
+        Bind a Water to the cell it is put in, the terrain of the cell becomes water of its size
+        unless it already is water.
+        :param water: the Water
+        :return:
+        """
+        if self.kind_at(x, y) != WATER:
+            self.set(x, y, WATER, water.size)
+        water.position = [x, y]
+        water.terrain = self
+
+    def unbind(self, x, y, water):
+        """
+        Unbind a Water from the cell it is taken out of, it keeps its size and the cell
+        becomes bare.
+        :param water: the Water
+        :return:
+        """
+        if water.terrain is not self:
+            return
+        size = water.size
+        water.terrain = None
+        water.size = size
+        if self.kind_at(x, y) == WATER:
+            self.clear(x, y)
+
+    def restore(self, other):
+        """
+        Copy the terrain of another layer of the same size into this one.
+        :param other: the layer
+        :return:
+        """
+        for kind in (DIRT, WATER):
+            xs, ys = other.cells(kind)
+            self.fill(xs, ys, kind, other.sizes(xs, ys))
+
+    def dumps(self):
+        """
+        :return: the layer as compressed bytes, the cells that aren't bare and their terrain
+        """
+        xs, ys = np.nonzero(self.kind != BARE)
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            shape=np.array([self.height, self.width]),
+            xs=np.asarray(xs, dtype=np.uint32),
+            ys=np.asarray(ys, dtype=np.uint32),
+            kind=self.kind[xs, ys],
+            size=self.size[xs, ys],
+        )
+        return buffer.getvalue()
+
+    @staticmethod
+    def loads(data, sparse=False):
+        """
+        :param data: bytes from dumps
+        :param sparse: load them into a SparseTerrainLayer
+        :return: the layer
+        """
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            height, width = arrays["shape"].tolist()
+            layer = make_terrain(height, width, sparse=sparse)
+            xs, ys = arrays["xs"].astype(np.intp), arrays["ys"].astype(np.intp)
+            for kind in (DIRT, WATER):
+                picked = arrays["kind"] == kind
+                layer.fill(xs[picked], ys[picked], kind, arrays["size"][picked])
+        layer.dirty = False
+        return layer
+
+    def save(self, zoo_id, db=None):
+        """
+        Write the layer to the terrain table.
+        :param zoo_id: the id of the zoo
+        :return:
+        """
+        db = db or database.DatabaseConnection()
+        now = arrow.now().isoformat()
+        schema = terrain_schema()
+        database.Table(table_name="terrain", columns_and_types=schema).create_table()
+        db.upsert_many(
+            "terrain",
+            tuple(schema),
+            [(zoo_id, self.height, self.width, self.dumps(), now, now)],
+        )
+        self.dirty = False
+
+    @staticmethod
+    def load(zoo_id, sparse=False):
+        """
+        :param zoo_id: the id of the zoo
+        :param sparse: load it into a SparseTerrainLayer
+        :return: the layer of the zoo, or None if it has none stored
+        """
+        db = database.DatabaseConnection()
+        try:
+            row = db.conn.execute(
+                "SELECT layer FROM terrain WHERE home_id = ?", (zoo_id,)
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return None if row is None else TerrainLayer.loads(row[0], sparse=sparse)
+
+
+class SparseTerrainLayer(TerrainLayer):
+    """
+    The terrain of a sparse zoo, a dictionary of (kind, size) by cell for the cells that
+    aren't bare. The cells are also kept by chunk, so a window of the terrain is found
+    without looking at the rest.
+    """
+
+    def __init__(self, height, width):
+        """
+        This method is called when the layer is created.
+        :param height: the number of rows in the grid
+        :param width: the number of columns in the grid
+        """
+        self.height = height
+        self.width = width
+        self.terrain = {}
+        # chunk key -> the cells of the chunk that aren't bare
+        self.chunks = {}
+        self.dirty = False
+        self.on_resize = None
+
+    def kind_at(self, x, y):
+        """
+        :return: the terrain kind of a cell
+        """
+        return self.terrain.get((x, y), (BARE, 0))[0]
+
+    def size_at(self, x, y):
+        """
+        :return: the size of the terrain of a cell
+        """
+        return self.terrain.get((x, y), (BARE, 0))[1]
+
+    def set(self, x, y, kind, size=0):
+        """
+        Set the terrain of a cell.
+        :param kind: one of the terrain kinds
+        :param size: the size of the dirt or water, clamped to what a cell can hold
+        :return:
+        """
+        key = x // CHUNK_SIZE, y // CHUNK_SIZE
+        if kind == BARE:
+            if self.terrain.pop((x, y), None) is not None:
+                self.chunks[key].discard((x, y))
+                if not self.chunks[key]:
+                    del self.chunks[key]
+        else:
+            self.terrain[x, y] = kind, min(max(int(size), 0), MAX_SIZE)
+            self.chunks.setdefault(key, set()).add((x, y))
+        self.dirty = True
+
+    def set_size(self, x, y, size):
+        """
+        Change the size of the terrain of a cell, keeping its kind.
+        :return:
+        """
+        if (x, y) in self.terrain:
+            self.set(x, y, self.kind_at(x, y), size)
+            if self.on_resize is not None:
+                self.on_resize(x, y, self.size_at(x, y))
+
+    def fill(self, xs, ys, kind, sizes):
+        """
+        Set the terrain of many cells at once.
+        :return:
+        """
+        cells = zip(np.asarray(xs).tolist(), np.asarray(ys).tolist(), np.asarray(sizes).tolist())
+        for x, y, size in cells:
+            self.set(x, y, kind, size)
+
+    def cells(self, kind):
+        """
+        :return: the arrays of the rows and columns of the cells of a kind
+        """
+        picked = [cell for cell, (cell_kind, _) in self.terrain.items() if cell_kind == kind]
+        xs = np.array([x for x, _ in picked], dtype=np.intp)
+        ys = np.array([y for _, y in picked], dtype=np.intp)
+        return xs, ys
+
+    def sizes(self, xs, ys):
+        """
+        :return: an array of the sizes of the terrain of the given cells
+        """
+        return np.array(
+            [self.size_at(x, y) for x, y in zip(np.asarray(xs).tolist(), np.asarray(ys).tolist())],
+            dtype=np.uint16,
+        )
+
+    def mask(self, kind, window=None):
+        """
+        :param kind: one of the terrain kinds
+        :param window: the first row, last row + 1, first column and last column + 1 of the
+            cells to cover, the whole grid if None
+        :return: a boolean array that is True where the terrain is of a kind
+        """
+        if window is None:
+            mask = np.zeros((self.height, self.width), dtype=bool)
+            mask[self.cells(kind)] = True
+            return mask
+        x_min, x_max, y_min, y_max = window
+        mask = np.zeros((max(x_max - x_min, 0), max(y_max - y_min, 0)), dtype=bool)
+        for i in range(x_min // CHUNK_SIZE, (x_max - 1) // CHUNK_SIZE + 1):
+            for j in range(y_min // CHUNK_SIZE, (y_max - 1) // CHUNK_SIZE + 1):
+                for x, y in self.chunks.get((i, j), ()):
+                    if (
+                        x_min <= x < x_max
+                        and y_min <= y < y_max
+                        and self.terrain[x, y][0] == kind
+                    ):
+                        mask[x - x_min, y - y_min] = True
+        return mask
+
+    def dumps(self):
+        """
+        :return: the layer as compressed bytes, the cells that aren't bare and their terrain
+        """
+        cells = list(self.terrain.items())
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            shape=np.array([self.height, self.width]),
+            xs=np.array([x for (x, _), _ in cells], dtype=np.uint32),
+            ys=np.array([y for (_, y), _ in cells], dtype=np.uint32),
+            kind=np.array([kind for _, (kind, _) in cells], dtype=np.uint8),
+            size=np.array([size for _, (_, size) in cells], dtype=np.uint16),
+        )
+        return buffer.getvalue()
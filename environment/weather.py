@@ -0,0 +1,61 @@
+"""
+The weather engine.
+Rain is worked out for the whole grid at once from the packed arrays of the GridEngine: a
+mask of the cells each effect can fall on, one roll per cell for the chance it does, and one
+roll per hit cell for how much. The rolls are tied to the cells (see CellRolls), so a stripe
+of the grid gets the same rain as the whole grid. Only the cells that change are touched as
+objects afterwards.
+"""
+import numpy as np
+
+from environment.base_elements import Dirt
+from environment.engine import class_code
+from environment.liquids import Water
+from organisms.plants import Grass
+
+# how likely each intensity of rain is
+INTENSITIES = {
+    "torrential": 0.01,
+    "heavy": 0.05,
+    "moderate": 0.9,
+    "mist": 0.1,
+}
+
+# what rain of each intensity does, as
+# (the class of thing it falls on, the chance per cell, the effect, smallest and largest amount)
+# a puddle replaces the thing with water of that size, deepen adds to the size of the water
+RAIN_EFFECTS = {
+    "mist": ((Water, 0.5, "deepen", 1, 10),),
+    "moderate": ((Dirt, 0.5, "puddle", 1, 10),),
+    "heavy": ((Dirt, 0.5, "puddle", 50, 50),),
+    "torrential": (
+        (Dirt, 1.0, "puddle", 75, 75),
+        (Grass, 0.5, "puddle", 20, 20),
+        (Water, 0.5, "deepen", 1, 20),
+    ),
+}
+
+
+def rain_changes(engine, intensity, rolls, rows=None):
+    """
+    Work out what rain does to the grid, without changing anything.
+    Every effect is worked out from the grid as it was before the rain, so a new puddle is not
+    deepened by the same shower.
+    :param engine: the GridEngine of the zoo
+    :param intensity: one of the INTENSITIES
+    :param rolls: the CellRolls to roll with
+    :param rows: the first row and the row after the last to rain on, every row if None
+    :return: a list of (effect, rows, columns, amounts) tuples, one per effect
+    """
+    first, last = rows or (0, engine.height)
+    effects = RAIN_EFFECTS.get(intensity, ())
+    masks = [engine.species[first:last] == class_code(target) for target, *_ in effects]
+    changes = []
+    for index, (mask, (_, chance, effect, low, high)) in enumerate(zip(masks, effects)):
+        xs, ys = np.nonzero(mask)
+        xs += first
+        if chance < 1:
+            hit = rolls.uniform(xs, ys, 2 * index) < chance
+            xs, ys = xs[hit], ys[hit]
+        changes.append((effect, xs, ys, rolls.rolls(low, high, xs, ys, 2 * index + 1)))
+    return changes
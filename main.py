@@ -8,18 +8,21 @@ predator or prey since it's random what animal the player is.
 """
 from organisms.animals import Animal, Elephant, Giraffe, Hyena, Lion, Rhino, Zebra
 
+import argparse
 import logging
 import sqlite3
+import time
 
 import pygame
 
 import database
-from environment.base_elements import Dirt
 from environment.buildings import Zoo, create_zoo
-from environment.grid import Tile
-from environment.liquids import Water
+from environment.intents import run_turn
+from environment.sharding import ShardedZoo
+from organisms.metabolism import metabolize
 from organisms.organisms import LifeException
 from organisms.plants import Bush, Grass, Plant, Tree
+from organisms.vegetation import grow_plants
 
 # pylint: disable=line-too-long
 
@@ -35,18 +38,78 @@ BLUE = (0, 0, 255)
 CELL_SIZE = 50
 MARGIN = 5
 
+# in_place: every entity changes the grid during its turn, in scheduler order
+# intents: every entity decides against a snapshot, then all intents are resolved at once
+TURN_MODELS = ("in_place", "intents")
 
-def main():
+# what a new zoo is stocked with
+ANIMALS = [Elephant, Giraffe, Hyena, Lion, Rhino, Zebra]
+PLANTS = [Bush, Grass, Tree]
+
+
+def parse_args(argv=None):
+    """
+    Parse the command line arguments.
+    :param argv: the arguments, defaults to sys.argv
+    :return: the parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Simulate a zoo.")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="run without rendering or per turn output",
+    )
+    parser.add_argument(
+        "--turns", type=int, default=None, help="stop after this many turns"
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=None,
+        help="save the zoo every this many turns in headless mode (default: only at the end)",
+    )
+    parser.add_argument(
+        "--model",
+        choices=TURN_MODELS,
+        default="in_place",
+        help="how entities take their turns: in place, or intents resolved in one pass",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=None,
+        help="run the turns in this many worker processes, each keeping a stripe of the grid "
+        "(needs --model intents)",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None, help="seed the random numbers of the zoo"
+    )
+    args = parser.parse_args(argv)
+    if args.shards and args.model != "intents":
+        parser.error("--shards needs --model intents")
+    return args
+
+
+def main(argv=None):
     """
     This function is the main function of the game.
     """
-    # Initialize pygame
-    pygame.init()
+    args = parse_args(argv)
+    if not args.headless:
+        # Initialize pygame
+        pygame.init()
 
     db_connection = database.DatabaseConnection()
     # create the zoo
     try:
-        simulate()
+        simulate(
+            headless=args.headless,
+            turns=args.turns,
+            checkpoint_every=args.checkpoint_every,
+            model=args.model,
+            shards=args.shards,
+            seed=args.seed,
+        )
     except Exception as e:
         print(e)
         # print the stack trace
@@ -61,22 +124,40 @@ def main():
     db_connection.close()
 
 
-def simulate():
+def simulate(
+    headless=False,
+    turns=None,
+    checkpoint_every=None,
+    model="in_place",
+    shards=None,
+    seed=None,
+):
     """
     Simulate the zoo.
+    :param headless: run without rendering or per turn output
+    :param turns: stop after this many turns
+    :param checkpoint_every: in headless mode, save the zoo every this many turns
+    :param model: the turn model used in headless mode, one of TURN_MODELS
+    :param shards: the number of worker processes for the intents model in headless mode
+    :param seed: seeds the random numbers of the zoo
     :return:
     """
     zoo = create_zoo(
-        animals=[Elephant, Giraffe, Hyena, Lion, Rhino, Zebra],
-        plants=[Bush, Grass, Tree],
+        animals=ANIMALS, plants=PLANTS, process_images=not headless, seed=seed
     )
     zoo = Zoo.load_instance(zoo.id)
-    flat_list = [element for sublist in zoo.grid for element in sublist]
-    living_animals = [item for item in flat_list if isinstance(item, Animal)]
-    living_animals = len(living_animals)
+    if headless:
+        return simulate_headless(
+            zoo,
+            turns=turns,
+            checkpoint_every=checkpoint_every,
+            model=model,
+            shards=shards,
+        )
+    living_animals = zoo.count_animals()
     turn = 0
     print(f"Starting with {living_animals} animals")
-    while living_animals:
+    while living_animals and (turns is None or turn < turns):
 
         zoo.refresh_grid(visualise=False)
         # print the zoo
@@ -85,41 +166,170 @@ def simulate():
 
 
 
-def take_turn(turn, zoo):
+def simulate_headless(
+    zoo, turns=None, checkpoint_every=None, model="in_place", shards=None
+):
+    """
+    Run the turn loop without rendering, per turn output or per move saves.
+    The zoo is only persisted at checkpoints and when the run ends.
+    :param zoo: the zoo to simulate
+    :param turns: stop after this many turns, otherwise run until every animal is dead
+    :param checkpoint_every: save the zoo every this many turns
+    :param model: the turn model, one of TURN_MODELS
+    :param shards: run the turns in this many worker processes, see ShardedZoo
+    :return: a dictionary with the number of turns run and the turns per second
+    """
+    zoo.autosave = False
+    # start tracking changes from the state create_zoo already saved
+    zoo.pop_dirty_cells("persistence")
+    zoo.advance_environment(verbose=False)
+
+    sharded = ShardedZoo(zoo, shards) if shards else None
+    turn = 0
+    start = time.perf_counter()
+    try:
+        while turns is None or turn < turns:
+            if sharded is not None:
+                if not sharded.take_turn(turn):
+                    break
+            elif not take_turn(turn, zoo, headless=True, model=model):
+                break
+            turn += 1
+            if checkpoint_every and turn % checkpoint_every == 0:
+                if sharded is not None:
+                    sharded.collect()
+                zoo.checkpoint()
+        if sharded is not None:
+            sharded.collect()
+    finally:
+        if sharded is not None:
+            sharded.close()
+    elapsed = time.perf_counter() - start
+    zoo.checkpoint()
+
+    turns_per_second = turn / elapsed if elapsed else float("inf")
+    print(
+        f"Ran {turn} turns in {elapsed:.2f}s ({turns_per_second:.2f} turns per second), "
+        f"{zoo.count_animals()} animals left"
+    )
+    return {"turns": turn, "elapsed": elapsed, "turns_per_second": turns_per_second}
+
+
+def take_turns_in_place(zoo, entities, turn):
+    """
+    Every entity takes its turn in order, changing the grid as it goes.
+    :param zoo: the zoo
+    :param entities: the entities in turn order
+    :param turn: the turn number
+    :return:
+    """
+    scheduler = zoo.scheduler
+    for thing in entities:
+        if scheduler.is_dead(thing):
+            continue
+        if not thing.is_alive:
+            scheduler.mark_dead(thing)
+            continue
+        # eaten or trampled earlier this turn
+        if not zoo.holds(thing):
+            continue
+        try:
+            action = thing.turn(turn_number=turn)
+            if action == "died":
+                scheduler.mark_dead(thing)
+        except LifeException:
+            scheduler.mark_dead(thing)
+            # remove the animal from the grid
+            zoo.clear_cell(thing.position[0], thing.position[1])
+
+
+def park_sleepers(zoo, animals, turn):
+    """
+    Park the animals that have fallen asleep, they skip their turns until they wake up.
+    :param zoo: the zoo
+    :param animals: the animals that took a turn
+    :param turn: the turn number
+    :return:
+    """
+    scheduler = zoo.scheduler
+    for animal in animals:
+        # animals that died or left the grid are no longer active and stay unparked
+        if animal.sleep_counter > 0 and animal.is_alive:
+            scheduler.park(animal, turn, wake_turn=turn + animal.sleep_counter + 1)
+
+
+def wake_sleepers(zoo, turn):
+    """
+    Wake the parked animals that are due this turn.
+    :param zoo: the zoo
+    :param turn: the turn number
+    :return: a dictionary of the woken animals to the number of turns they slept through
+    """
+    woken = zoo.scheduler.wake(turn)
+    for animal in woken:
+        animal.sleep_counter = 0
+    return woken
+
+
+def take_turn(turn, zoo, headless=False, model="in_place"):
+    """
+    Every living thing in the zoo takes its turn, then the environment moves on.
+    :param turn: the turn number
+    :param zoo: the zoo
+    :param headless: skip the per turn output and rendering
+    :param model: the turn model, one of TURN_MODELS
+    :return: False if there are no animals left, otherwise the rendered grid
+        (True in headless mode)
+    """
     zoo = Zoo.load_instance(zoo.id)
-    flat_list = [element for sublist in zoo.grid for element in sublist]
-    living_animals = [item for item in flat_list if isinstance(item, Animal)]
-    living_animals = len(living_animals)
+    living_animals = zoo.count_animals()
     if not living_animals:
         return False
 
-    dead_things = []
-    for row in zoo.grid:
-        for thing in row:
-            if isinstance(thing, Tile):
-                thing = thing.type
-            if not thing:
-                continue
-            if isinstance(thing, (Water, Dirt)):
-                continue
-            try:
-                if thing in dead_things:
-                    continue
-                if not thing.is_alive:
-                    dead_things.append(thing)
-                    continue
-                zoo = Zoo.load_instance(thing.home_id)
-                action = thing.turn(turn_number=turn)
-                if action == "died":
-                    dead_things.append(thing)
-            except LifeException:
-                dead_things.append(thing)
-                # remove the animal from the grid
-                zoo.grid[thing.position[0]][thing.position[1]] = None
+    # only the registered entities take turns, the rest of the grid is never visited,
+    # and sleeping animals are parked until they wake
+    scheduler = zoo.scheduler
+    slept = wake_sleepers(zoo, turn)
+    entities = scheduler.snapshot()
+    # drain, age and check the pulse of every animal in one batched pass,
+    # catching up on the turns the animals that just woke slept through,
+    # the in place model drains the animals as they move instead
+    animals = [thing for thing in entities if isinstance(thing, Animal)]
+    drains = None if model == "intents" else {}
+    for thing in metabolize(animals, turn_number=turn, drains=drains, skipped=slept):
+        scheduler.mark_dead(thing)
+    if model == "intents":
+        run_turn(
+            zoo,
+            [
+                thing
+                for thing in entities
+                if not scheduler.is_dead(thing) and thing.is_alive and zoo.holds(thing)
+            ],
+            turn,
+        )
+    else:
+        # every plant grows, seeds and ages in one batched pass, the rest take their turns
+        plants = [
+            thing
+            for thing in entities
+            if isinstance(thing, Plant) and thing.is_alive and zoo.holds(thing)
+        ]
+        died, _ = grow_plants(zoo, plants, turn_number=turn)
+        for thing in died:
+            scheduler.mark_dead(thing)
+        take_turns_in_place(
+            zoo, [thing for thing in entities if not isinstance(thing, Plant)], turn
+        )
+    scheduler.sweep(zoo.holds)
+    park_sleepers(zoo, animals, turn)
     turn += 1
     zoo.elapsed_turns += 1
 
     zoo.check_full()
+    if headless:
+        zoo.advance_environment(verbose=False)
+        return True
     print(f"Turn {turn}")
     return zoo.refresh_grid(visualise=False)
 def simulate_with_pygame(zoo, turn=1, living_animals=1):
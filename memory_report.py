@@ -0,0 +1,131 @@
+"""
+Report how many bytes every kind of entity takes, before and after the assets moved to slots.
+An entity used to keep every attribute in its own __dict__, including the asset metadata that
+is now on the class (emoji, image_directory, base_url, query), the stats now read from the
+template of its species and a fresh empty list for each neighbourhood it hadn't looked at yet.
+The "before" column rebuilds that layout from a real entity, the "after" column copies the
+entity as it is. Both are measured with tracemalloc over many copies; the copies share
+immutable values like names, so the columns differ by the layout and the lists an entity owns.
+"""
+import argparse
+import json
+import tracemalloc
+
+from assets import ASSET_METADATA
+from environment.base_elements import Dirt
+from environment.liquids import Water
+from organisms.animals import Elephant, Giraffe, Hyena, Lion, Rhino, Zebra
+from organisms.dead_things import Corpse
+from organisms.plants import Bush, Grass, Tree
+
+ANIMALS = [Lion, Zebra, Elephant, Hyena, Giraffe, Rhino]
+PLANTS = [Tree, Bush, Grass]
+
+
+def sample_entities():
+    """
+    :return: one entity of every kind found in a zoo
+    """
+    entities = [kind(home_id=None) for kind in ANIMALS + PLANTS]
+    entities += [Water(position=[0, 0]), Dirt(position=[0, 0]), Corpse(former_animal=entities[0])]
+    return entities
+
+
+def slot_state(entity):
+    """
+    :return: a dictionary of the attributes an entity keeps in its slots
+    """
+    _, state = entity.__getstate__()
+    return state
+
+
+def fresh(value):
+    """
+    :return: a copy of a value if every entity would hold its own, else the value itself
+    """
+    return list(value) if isinstance(value, list) else value
+
+
+def measure(build, count):
+    """
+    :param build: a function that makes one object
+    :param count: the number of objects to make
+    :return: the bytes allocated per object
+    """
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        objects = [build() for _ in range(count)]
+        end, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # the list holding the objects is not part of them
+    return (end - start) / count - 8 if objects else 0
+
+
+def slotted_bytes(entity, count=1000):
+    """
+    :return: the bytes per copy of an entity as it is laid out now
+    """
+    kind, state = type(entity), slot_state(entity)
+
+    def build():
+        copy = kind.__new__(kind)
+        copy.__setstate__({name: fresh(value) for name, value in state.items()})
+        return copy
+
+    return measure(build, count)
+
+
+def legacy_bytes(entity, count=1000):
+    """
+    :return: the bytes per copy of an entity laid out in a __dict__, as it was before slots
+    """
+    kind = type(f"Legacy{type(entity).__name__}", (), {})
+    state = slot_state(entity)
+    state.pop("_overrides", None)
+    state.update({name: getattr(entity, name) for name in getattr(entity, "species", {})})
+
+    def build():
+        copy = kind()
+        for name, value in state.items():
+            # the neighbourhoods were empty lists of their own, not a shared empty tuple
+            setattr(copy, name, [] if value == () else fresh(value))
+        for name in sorted(ASSET_METADATA):
+            value = getattr(entity, name)
+            setattr(copy, name, value.lower() if name == "query" else value)
+        return copy
+
+    return measure(build, count)
+
+
+def report(count=1000):
+    """
+    :param count: the number of copies every entity is measured over
+    :return: a dictionary of kind of entity to its bytes before and after, and the saving
+    """
+    results = {}
+    for entity in sample_entities():
+        before, after = legacy_bytes(entity, count), slotted_bytes(entity, count)
+        results[type(entity).__name__] = {
+            "before": round(before),
+            "after": round(after),
+            "saved": round(1 - after / before, 3) if before else 0,
+        }
+    return results
+
+
+def main(argv=None):
+    """
+    Print the memory report from the command line.
+    """
+    parser = argparse.ArgumentParser(description="Report the bytes per entity.")
+    parser.add_argument(
+        "--copies", type=int, default=1000, help="measure every entity over this many copies"
+    )
+    args = parser.parse_args(argv)
+    print(json.dumps(report(args.copies), indent=2))
+
+
+if __name__ == "__main__":
+    main()
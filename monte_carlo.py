@@ -0,0 +1,170 @@
+"""
+Run many independent, seeded zoos across a pool of processes to study how long they survive.
+Every run gets its own database (in memory unless a directory is given) and its own zoo, and
+a summary of every run is written to a JSON lines file as soon as the run is done.
+"""
+import argparse
+import collections
+import contextlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import database
+from environment.buildings import Zoo, create_zoo
+from main import ANIMALS, PLANTS, TURN_MODELS, simulate_headless
+from organisms.animals import Animal
+
+
+def parse_args(argv=None):
+    """
+    Parse the command line arguments.
+    :param argv: the arguments, defaults to sys.argv
+    :return: the parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Simulate many seeded zoos.")
+    parser.add_argument("--runs", type=int, default=100, help="the number of zoos")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the first zoo")
+    parser.add_argument(
+        "--turns", type=int, default=100, help="stop every zoo after this many turns"
+    )
+    parser.add_argument("--height", type=int, default=20)
+    parser.add_argument("--width", type=int, default=20)
+    parser.add_argument("--model", choices=TURN_MODELS, default="in_place")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="defaults to one per core"
+    )
+    parser.add_argument(
+        "--output", default="monte_carlo.jsonl", help="where the run summaries go"
+    )
+    parser.add_argument(
+        "--database-dir",
+        default=None,
+        help="keep a database file per run in this directory instead of in memory",
+    )
+    return parser.parse_args(argv)
+
+
+def population(zoo):
+    """
+    :return: the number of living animals of every species on the grid
+    """
+    return dict(
+        collections.Counter(
+            entity.__class__.__name__
+            for entity in zoo.scheduler
+            if isinstance(entity, Animal) and entity.is_alive and zoo.holds(entity)
+        )
+    )
+
+
+def run_one(seed, turns=100, height=20, width=20, model="in_place", database_dir=None):
+    """
+    Build and run one seeded zoo with a database of its own.
+    :param seed: seeds every random roll of the run
+    :param turns: stop after this many turns
+    :param height: the height of the zoo
+    :param width: the width of the zoo
+    :param model: the turn model, one of TURN_MODELS
+    :param database_dir: keep the database of the run in this directory, otherwise in memory
+    :return: a summary of the run
+    """
+    database_name = ":memory:"
+    if database_dir:
+        database_name = os.path.join(database_dir, f"zoo-{seed}.db")
+        try:
+            os.close(os.open(database_name, os.O_CREAT | os.O_EXCL))
+        except FileExistsError:
+            # another run of the seed has the file, it may still be writing to it
+            database_name = os.path.join(database_dir, f"zoo-{seed}-{os.getpid()}.db")
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(database_name)
+    database.use_database(database_name)
+    Zoo.clear_instance()
+
+    start = time.perf_counter()
+    # the zoo code prints as it goes, that is noise when hundreds of zoos run at once
+    with contextlib.redirect_stdout(io.StringIO()):
+        zoo = create_zoo(
+            height=height,
+            width=width,
+            animals=ANIMALS,
+            plants=PLANTS,
+            process_images=False,
+            seed=seed,
+        )
+        result = simulate_headless(zoo, turns=turns, model=model)
+    summary = {
+        "seed": seed,
+        "turns_survived": result["turns"],
+        "population": population(zoo),
+        "wall_time": time.perf_counter() - start,
+    }
+    # the run is over, its zoo doesn't need to stay live in the worker
+    Zoo.invalidate(zoo.id)
+    return summary
+
+
+def run(seeds, output, workers=None, **kwargs):
+    """
+    Fan the seeds out over a process pool and stream the summaries into a JSON lines file.
+    :param seeds: the seeds of the runs
+    :param output: the path of the results file
+    :param workers: the number of processes, defaults to one per core
+    :param kwargs: passed on to run_one
+    :return: the aggregated results
+    """
+    summaries = []
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(output, "w") as results:
+        futures = [pool.submit(run_one, seed, **kwargs) for seed in seeds]
+        for future in as_completed(futures):
+            summary = future.result()
+            results.write(json.dumps(summary) + "\n")
+            results.flush()
+            summaries.append(summary)
+    return aggregate(summaries)
+
+
+def aggregate(summaries):
+    """
+    :return: survival statistics over a list of run summaries
+    """
+    runs = len(summaries)
+    species = collections.Counter()
+    for summary in summaries:
+        species.update(summary["population"])
+    return {
+        "runs": runs,
+        "survival_rate": sum(bool(s["population"]) for s in summaries) / runs if runs else 0,
+        "mean_turns_survived": (
+            sum(s["turns_survived"] for s in summaries) / runs if runs else 0
+        ),
+        "mean_population": {
+            name: count / runs for name, count in sorted(species.items())
+        },
+        "wall_time": sum(s["wall_time"] for s in summaries),
+    }
+
+
+def main(argv=None):
+    """
+    Run the Monte Carlo study from the command line.
+    """
+    args = parse_args(argv)
+    results = run(
+        range(args.seed, args.seed + args.runs),
+        args.output,
+        workers=args.workers,
+        turns=args.turns,
+        height=args.height,
+        width=args.width,
+        model=args.model,
+        database_dir=args.database_dir,
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,15 @@
 import contextlib
 import itertools
 import logging
-import random
 
 import environment.base_elements
 from environment.grid import Tile
 from environment.liquids import Water
+from environment.spatial import chebyshev
 from organisms.dead_things import Corpse
 from organisms.organisms import LifeException, Organism
 from organisms.plants import Bush, Grass, Plant, Tree
+from organisms.species import PackedStat, SpeciesStat, register
 
 
 class Animal(Organism):  # pylint: disable=too-many-public-methods
@@ -16,35 +17,65 @@ class Animal(Organism):  # pylint: disable=too-many-public-methods
     This is the base class for all animals.
     """
 
+    __slots__ = (
+        "sleep_counter",
+        "_hunger",
+        "_thirst",
+        "_energy",
+        "_virility",
+        "_age",
+        "motive",
+        "nutrients",
+        "gender",
+        "safe_spot",
+        "animals_nearby",
+        "nearby_unoccupied_tiles",
+        "nearby_occupied_tiles",
+        "birth_turn",
+        "metabolised_turn",
+    )
+
+    emoji = "🐶"
+    # the stats that change every turn, kept in the arrays of the engine while it is switched on
+    hunger = PackedStat()
+    thirst = PackedStat()
+    energy = PackedStat()
+    virility = PackedStat()
+    age = PackedStat()
+    # the stats every animal of a species starts with, registered at the end of the module
+    strength = SpeciesStat()
+    speed = SpeciesStat()
+    favorite_food = SpeciesStat()
+    max_age = SpeciesStat()
+    max_energy = SpeciesStat()
+    max_hunger = SpeciesStat()
+    max_thirst = SpeciesStat()
+
     def __init__(self, home_id):
         """
         This method is called when the animal is created.
         """
         super().__init__(home_id)
         self.sleep_counter = 0
-        self.strength = 1
-        self.speed = 1
-        self.size = 1
+        # animals grow, so the size of the species is only where they start
+        self.size = self.species["size"]
         self.hunger = 50
         self.thirst = 50
         self.energy = 50
         self.virility = 50
         self.age = 1
-        self.favorite_food = None
         self.position: list = [0, 0]
         self.motive = "mate"
         self.nutrients = 1
-        self.gender = random.choice(["male", "female"])
-        self.safe_spot = []
-        self.animals_nearby = []
-        self.nearby_unoccupied_tiles = []
-        self.nearby_occupied_tiles = []
-        self.max_age = 365 * 10
-        self.max_energy = 100
+        self.gender = self.rolls("birth").choice(["male", "female"])
+        # the neighbourhood is looked at before it is used, until then the animals share an
+        # empty tuple rather than holding four empty lists each
+        self.safe_spot = ()
+        self.animals_nearby = ()
+        self.nearby_unoccupied_tiles = ()
+        self.nearby_occupied_tiles = ()
         self.birth_turn = 1
-        self.emoji = "🐶"
-        self.max_hunger = 100
-        self.max_thirst = 100
+        self.metabolised_turn = None
 
     def check_nearby_tiles(self):
         self.nearby_unoccupied_tiles = []
@@ -104,8 +135,7 @@ class Animal(Organism):  # pylint: disable=too-many-public-methods
             self.thirst -= 1
             self.energy -= 1
             home = environment.buildings.Zoo.load_instance(self.home_id)
-            home.grid[water.position[0]][water.position[1]] = None
-            home.reprocess_tiles()
+            home.clear_cell(water.position[0], water.position[1])
 
     def sleep(self):
         """
@@ -145,11 +175,12 @@ class Animal(Organism):  # pylint: disable=too-many-public-methods
         This method is called when the animal grows.
         """
 
-        self.strength += random.randint(0, 1)
-        self.speed += random.randint(0, 1)
-        self.size += random.randint(0, 1)
-        self.energy += random.randint(0, 1)
-        self.virility += random.randint(0, 1)
+        rolls = self.rolls("growth")
+        self.strength += rolls.randint(0, 1)
+        self.speed += rolls.randint(0, 1)
+        self.size += rolls.randint(0, 1)
+        self.energy += rolls.randint(0, 1)
+        self.virility += rolls.randint(0, 1)
         self.age += 1
 
     def die(self, reason):
@@ -166,15 +197,16 @@ class Animal(Organism):  # pylint: disable=too-many-public-methods
         self.energy = 0
         self.virility = 0
         self.is_alive = False  # pylint: disable=attribute-defined-outside-init
+        home = environment.buildings.Zoo.load_instance(self.home_id)
         # remove the animal from the home.grid
-        home.grid[self.position[0]][self.position[1]] = None
+        home.clear_cell(self.position[0], self.position[1])
         # remove the animal from the home
-        with contextlib.suppress(ValueError):
+        with contextlib.suppress(ValueError, AttributeError):
             home.animals.remove(self)
         # replace the animal with a corpse if the position is not occupied
         if home.grid[self.position[0]][self.position[1]] is None:
             corpse = Corpse(self)
-            home.grid[self.position[0]][self.position[1]] = corpse
+            home.set_cell(self.position[0], self.position[1], corpse)
         return reason
 
     def __str__(self):
@@ -192,7 +224,7 @@ class Animal(Organism):  # pylint: disable=too-many-public-methods
         if isinstance(opponent, self.favorite_food):
             attack_modifier += special_attack
 
-        return random.randint(1, 20) + attack_modifier
+        return self.rolls("combat").randint(1, 20) + attack_modifier
 
     def defend(self, opponent, modifier=0, special_defense=1):
         """
@@ -201,7 +233,15 @@ class Animal(Organism):  # pylint: disable=too-many-public-methods
         defense_modifier = self.speed + modifier
         if isinstance(opponent, self.favorite_food):
             defense_modifier += special_defense
-        return random.randint(1, 20) + defense_modifier
+        return self.rolls("combat").randint(1, 20) + defense_modifier
+
+    def random_direction(self):
+        """
+        This method picks a step to a random neighbouring cell, or staying put.
+        :return: a list of two numbers between -1 and 1
+        """
+        rolls = self.rolls("movement")
+        return [rolls.randint(-1, 1), rolls.randint(-1, 1)]
 
     def move(self, direction):
         """
@@ -250,9 +290,9 @@ class Animal(Organism):  # pylint: disable=too-many-public-methods
             and 0 <= direction[1] < len(home.grid[1])
         ):
             # new position is within the home.grid, so update the position
-            home.grid[self.position[0]][self.position[1]] = None
+            home.clear_cell(self.position[0], self.position[1])
             self.position = direction
-            home.grid[direction[0]][direction[1]] = self
+            home.set_cell(direction[0], direction[1], self)
             self.process_after_move(current_occupant)
             moved = True
 
@@ -272,17 +312,22 @@ class Animal(Organism):  # pylint: disable=too-many-public-methods
         self.energy -= 1
         self.hunger -= 1
         self.thirst -= 1
-        home.tiles_to_refresh.append(current_occupant)
-        home._instance = None
-        home.grid[self.position[0]][self.position[1]] = self
-        home.reprocess_tiles()
-        home.save_instance()
+        cell = home.refresh_tile(current_occupant)
+        home.set_cell(self.position[0], self.position[1], self)
+        if cell is not None:
+            home.reprocess_tiles([cell])
+        if home.autosave:
+            home.save_instance()
 
     def motivation(self, turn_number):
         """
         Determines the animal's most urgent need (drink, eat, sleep, or mate).
         """
-        if not self.liveness_check():
+        metabolised = self.metabolised_turn == turn_number
+        if metabolised:
+            # the metabolism phase checked the pulse, drowning is still checked here
+            self.look_for_water()
+        elif not self.liveness_check():
             self.die("natural causes")
             raise LifeException(f"{self.__class__.__name__} died of natural causes.")
 
@@ -291,7 +336,8 @@ class Animal(Organism):  # pylint: disable=too-many-public-methods
             self.motive = "sleep"
             return
 
-        self.age = turn_number - self.birth_turn
+        if not metabolised:
+            self.age = turn_number - self.birth_turn
 
         needs = {
             "drink": self.thirst,
@@ -305,7 +351,7 @@ class Animal(Organism):  # pylint: disable=too-many-public-methods
 
         # If all needs are being satisfied, choose a need at random
         if not unsatisfied_needs:
-            self.motive = random.choice(list(needs.keys()))
+            self.motive = self.rolls("motive").choice(list(needs.keys()))
         else:
             # Choose the need with the lowest value
             self.motive = min(unsatisfied_needs, key=unsatisfied_needs.get)
@@ -355,7 +401,7 @@ class Animal(Organism):  # pylint: disable=too-many-public-methods
 
         else:
             # move towards random direction
-            self.move([random.randint(-1, 1), random.randint(-1, 1)])
+            self.move(self.random_direction())
 
     def check_for_mating_partner(self):
         # check for adjacent animals of the opposite sex
@@ -390,10 +436,22 @@ class Animal(Organism):  # pylint: disable=too-many-public-methods
             return None
         # create baby
         if self.nearby_unoccupied_tiles:
-            baby_position = random.choice(self.nearby_unoccupied_tiles)
+            baby_position = self.rolls("birth").choice(self.nearby_unoccupied_tiles)
         else:
             return None
-        baby = self.__class__()
+        baby = self.conceive(partner, baby_position, turn_number)
+        home.set_cell(baby_position[0], baby_position[1], baby)
+        return baby
+
+    def conceive(self, partner, position, turn_number):
+        """
+        This method makes a baby that takes after both parents, without placing it on the grid.
+        :param partner: the other parent
+        :param position: where the baby will be born
+        :param turn_number: the turn the baby is born on
+        :return: the baby
+        """
+        baby = self.__class__(home_id=self.home_id)
         baby.size = int((self.size + partner.size) / 2)
 
         baby.strength = int((self.strength + partner.strength) / 2)
@@ -402,8 +460,7 @@ class Animal(Organism):  # pylint: disable=too-many-public-methods
         baby.energy = int(self.max_energy * 0.4 + partner.max_energy * 0.4)
         baby.hunger = int(baby.max_hunger * 0.5)
         baby.thirst = int(baby.max_thirst * 0.5)
-        baby.position = baby_position
-        home.grid[baby_position[0]][baby_position[1]] = baby
+        baby.position = position
         baby.birth_turn = turn_number
         baby.age = 0
         return baby
@@ -427,9 +484,11 @@ class Animal(Organism):  # pylint: disable=too-many-public-methods
             if found_water := self.look_for_water():
                 self.move(found_water.position)
                 self.drink(found_water)
+            elif water_step := self.head_for_water():
+                self.move(water_step)
             else:
                 # move towards random direction
-                direction = [random.randint(-1, 1), random.randint(-1, 1)]
+                direction = self.random_direction()
                 new_pos = [
                     self.position[0] + direction[0],
                     self.position[1] + direction[1],
@@ -445,17 +504,25 @@ class Animal(Organism):  # pylint: disable=too-many-public-methods
             func = self.look_for_food
         if self.motive == "eat":
             if found_food := func():
-                self.move(found_food)
                 self.eat(found_food)
+                if not isinstance(found_food, Animal):
+                    # step into the cell the food was eaten from, prey leaves a corpse there
+                    self.move(found_food)
+            elif food_step := self.head_for(self.favorite_food):
+                self.move(food_step)
             else:
                 # move towards random direction
-                self.move([random.randint(-1, 1), random.randint(-1, 1)])
+                self.move(self.random_direction())
 
     def look_for_food(self, limit=None):
         """
         This method is called when the animal looks for food in the reach of the animal's speed.
         """
         home = environment.buildings.Zoo.load_instance(self.home_id)
+        if not home.occupancy_index().any_within(
+            self.favorite_food, self.position[0], self.position[1], self.speed
+        ):
+            return None
         food = []
         for i, j in itertools.product(
             range(-self.speed, self.speed + 1),
@@ -483,7 +550,7 @@ class Animal(Organism):  # pylint: disable=too-many-public-methods
                 partner for partner in nearby_partners if partner.sex != self.sex
             ]:
                 return (
-                    random.choice(partners_in_safe_spots)
+                    self.rolls("mating").choice(partners_in_safe_spots)
                     if (
                         partners_in_safe_spots := [
                             partner
@@ -491,7 +558,7 @@ class Animal(Organism):  # pylint: disable=too-many-public-methods
                             if self.look_for_safe_spot() == partner.position
                         ]
                     )
-                    else random.choice(compatible_partners)
+                    else self.rolls("mating").choice(compatible_partners)
                 )
         return None
 
@@ -500,6 +567,13 @@ class Animal(Organism):  # pylint: disable=too-many-public-methods
         This method is called when the animal looks for water in the reach of the animals speed.
         """
         home = environment.buildings.Zoo.load_instance(self.home_id)
+        water_field = home.get_water_field()
+        if (
+            distance := water_field.distance_at(self.position[0], self.position[1])
+        ) is not None and distance <= self.speed:
+            x, y = water_field.nearest(self.position[0], self.position[1])
+            if isinstance(home.grid[x][y], Water):
+                return home.grid[x][y]
         max_index_i = len(home.grid) - self.speed
         max_index_j = len(home.grid[0]) - self.speed
 
@@ -508,18 +582,50 @@ class Animal(Organism):  # pylint: disable=too-many-public-methods
         j_min = max(self.position[1] - self.speed, 0)
         j_max = min(self.position[1] + self.speed + 1, max_index_j)
 
-        if nearby_water := [
-            home.grid[i][j]
-            for i, j in itertools.product(range(i_min, i_max), range(j_min, j_max))
-            if isinstance(home.grid[i][j], Water)
-        ]:
+        has_water = home.occupancy_index().count_in_rect(
+            Water, i_min, i_max, j_min, j_max
+        )
+        if has_water and (
+            nearby_water := [
+                home.grid[i][j]
+                for i, j in itertools.product(range(i_min, i_max), range(j_min, j_max))
+                if isinstance(home.grid[i][j], Water)
+            ]
+        ):
             return min(nearby_water, key=lambda x: x.size)
         if _drowned := self.check_if_drowned(i_max, i_min, j_max, j_min):
             raise LifeException(self)
         return None
 
+    def head_for(self, target_class):
+        """
+        This method finds the next cell on the way to the nearest thing of a class, however far
+        away it is, from the flow field of the class.
+        :param target_class: the class of thing to head for, e.g. the favorite food
+        :return: the position of the next cell, or None if there is nothing of the class to reach
+        """
+        if target_class is None:
+            return None
+        home = environment.buildings.Zoo.load_instance(self.home_id)
+        dx, dy = home.get_flow_field(target_class).step_towards(self.position[0], self.position[1])
+        if dx == dy == 0:
+            return None
+        return [self.position[0] + dx, self.position[1] + dy]
+
+    def head_for_water(self):
+        """
+        This method finds the next cell on the way to the nearest water, however far away it is.
+        :return: the position of the next cell, or None if there is no water in the zoo
+        """
+        return self.head_for(Water)
+
     def check_if_drowned(self, i_max, i_min, j_max, j_min):
         home = environment.buildings.Zoo.load_instance(self.home_id)
+        occupancy = home.occupancy_index()
+        area = occupancy.area_in_rect(i_min, i_max, j_min, j_max)
+        if area and occupancy.count_in_rect(Water, i_min, i_max, j_min, j_max) < area:
+            # some cell in reach isn't water, so there is somewhere to stand
+            return False
         return all(
             isinstance(home.grid[i][j], Water)
             for i, j in itertools.product(range(i_min, i_max), range(j_min, j_max))
@@ -547,6 +653,12 @@ class Animal(Organism):  # pylint: disable=too-many-public-methods
         if self.position[1] + self.speed > len(home.grid[0]) - 1:
             self.position[1] = len(home.grid[0]) - 1 - self.speed
 
+        if home.occupancy_index().all_within(
+            self.__class__, self.position[0], self.position[1], self.speed
+        ):
+            # every cell in reach is taken by our own species
+            return None
+
         try:
             nearby_cells = [
                 home.grid[self.position[0] + i][self.position[1] + j]
@@ -574,38 +686,25 @@ class Animal(Organism):  # pylint: disable=too-many-public-methods
         An Animal can only eat one food per turn.
         An Animal could die if its hunger is 0 or below.
         """
-        # compatible foods are either plants or animals or both. We can derive that by seeing the
-        # base class of the favorite food.
         home = environment.buildings.Zoo.load_instance(self.home_id)
-        compatible_food_classes = (
-            [self.favorite_food]
-            if issubclass(self.favorite_food, Animal)
-            else [Plant, Corpse]
-        )
-        has_eaten = False
-        while not has_eaten:
-            for compatible_food_class in compatible_food_classes:
-                if isinstance(found_food, (Plant, Corpse)):
-                    self.hunger += found_food.nutrition
-                    home.grid[found_food.position[0]][found_food.position[1]] = None
-                    found_food.die()
-                    self.grow()
-                    has_eaten = True
-                    break
-                elif isinstance(
-                    home.grid[self.position[0] + i][self.position[1] + j],
-                    Animal,
-                ):
-                    attack = self.attack(compatible_food_class)
-                    defense = compatible_food_class.defend(opponent=self)
-                    if attack > defense:
-                        compatible_food_class.energy -= attack - defense
-                        if compatible_food_class.energy <= 0:
-                            # the food is dead now, replace it with a dead animal
-                            compatible_food_class.die(home)
+        if isinstance(found_food, (Plant, Corpse)):
+            self.hunger += found_food.nutrition
+            found_food.is_alive = False
+            home.clear_cell(found_food.position[0], found_food.position[1])
+            self.grow()
+            return
+        if isinstance(found_food, Animal):
+            attack = self.attack(found_food)
+            defense = found_food.defend(opponent=self)
+            if attack > defense:
+                found_food.energy -= attack - defense
+                if found_food.energy <= 0:
+                    # the food is dead now, die replaces it with a corpse
+                    self.hunger += found_food.size
+                    found_food.die("predation")
+                    return
         # if the animal has not eaten it will grow even more hungry
-        if not has_eaten:
-            self.hunger += 1
+        self.hunger += 1
 
 
 class Carnivore(Animal):
@@ -613,12 +712,7 @@ class Carnivore(Animal):
     This is the class for carnivores.
     """
 
-    def __init__(self, *args, **kwargs):
-        """
-        This method is called when the carnivore is created.
-        """
-        super().__init__(*args, **kwargs)
-        self.favorite_food = Animal
+    __slots__ = ()
 
     def __str__(self):
         """
@@ -633,12 +727,7 @@ class Herbivore(Animal):
     This is the class for herbivores.
     """
 
-    def __init__(self, home_id):
-        """
-        This method is called when the herbivore is created.
-        """
-        super().__init__(home_id)
-        self.favorite_food = Plant
+    __slots__ = ()
 
     def __str__(self):
         """
@@ -653,12 +742,14 @@ class Omnivore(Animal):
     This is the class for omnivores.
     """
 
+    __slots__ = ()
+
     def __init__(self, home_id):
         """
         This method is called when the omnivore is created.
         """
         super().__init__(home_id)
-        self.favorite_food = random.choice([Plant, Animal])
+        self.favorite_food = self.rolls("birth").choice([Plant, Animal])
 
     def __str__(self):
         """
@@ -673,12 +764,7 @@ class Predator(Carnivore):
     This is the class for predators.
     """
 
-    def __init__(self, home_id):
-        """
-        This method is called when the predator is created.
-        """
-        super().__init__(home_id)
-        self.favorite_food = Prey
+    __slots__ = ()
 
     def __str__(self):
         """
@@ -692,31 +778,33 @@ class Predator(Carnivore):
         This method is called when the animal takes a turn.
         """
         self.motivation(turn_number)
+        self.predator_hunger()
         self.moved_based_on_motive()
 
     def predator_hunger(self):
         """
-        This method is called when the predator is hungry.
+        This method is called when the predator is hungry, it attacks the prey it hunts down.
         :return:
         """
-        if self.motive == "hunger":
-            if found_food := self.hunt():
-                self.move(found_food)
-                self.eat(found_food)
+        self.base_hunger(func=self.hunt)
 
     def hunt(self):
         """
         This method is called when the predator hunts.
-        The predator will check the surrounding tiles for prey and move towards it.
-        The predator can move its speed in any direction and will attack the prey if it is in range.
+        The predator looks for the nearest animal that isn't a predator within its speed in
+        any direction, which it moves towards and attacks.
+        :return: the prey, or None if there is none in range
         """
-        self.check_nearby_tiles()
-
-        for animal in self.animals_nearby:
-            if not isinstance(animal, Predator):
-                # the predator will change its position to an unoccupied tile adjacent to the prey
-                self.check_nearby_tiles()
-                self.position = random.choice(self.nearby_unoccupied_tiles)
+        home = environment.buildings.Zoo.load_instance(self.home_id)
+        if nearest := home.spatial_index().nearest(
+            Animal,
+            self.position[0],
+            self.position[1],
+            radius=self.speed,
+            exclude=lambda animal: isinstance(animal, Predator),
+        ):
+            return nearest[0][3]
+        return None
 
 
 class Prey(Herbivore):
@@ -724,12 +812,7 @@ class Prey(Herbivore):
     This is the class for prey.
     """
 
-    def __init__(self, home_id):
-        """
-        This method is called when the prey is created.
-        """
-        super().__init__(home_id)
-        self.favorite_food = Plant
+    __slots__ = ()
 
     def __str__(self):
         """
@@ -740,21 +823,24 @@ class Prey(Herbivore):
 
     def run_away(self):
         """
-        If the prey is near a predator, it will run away.
+        If the prey is near a predator, it will run away to the unoccupied tile nearby that is
+        furthest from the nearest predator.
         """
+        home = environment.buildings.Zoo.load_instance(self.home_id)
+        nearest = home.spatial_index().nearest(
+            Predator, self.position[0], self.position[1], radius=self.speed
+        )
+        if not nearest:
+            return
+        _, predator_x, predator_y, _ = nearest[0]
         self.check_nearby_tiles()
-
-        try:
-            nearest_predator = min(
-                self.animals_nearby, key=lambda x: abs(x.position[0] - self.position[0])
+        if self.nearby_unoccupied_tiles:
+            self.move(
+                max(
+                    self.nearby_unoccupied_tiles,
+                    key=lambda tile: chebyshev(tile[0] - predator_x, tile[1] - predator_y),
+                )
             )
-        except ValueError:
-            nearest_predator = None
-        if nearest_predator and isinstance(nearest_predator, Predator):
-            # the prey will change its position to an unoccupied tile adjacent to the predator
-            self.check_nearby_tiles()
-            with contextlib.suppress(IndexError):
-                self.position = random.choice(self.nearby_unoccupied_tiles)
 
     def turn(self, turn_number):
         """
@@ -778,12 +864,7 @@ class Scavenger(Animal):
     This is the class for scavengers.
     """
 
-    def __init__(self, home_id):
-        """
-        This method is called when the scavenger is created.
-        """
-        super().__init__(home_id)
-        self.favorite_food = Corpse
+    __slots__ = ()
 
     def __str__(self):
         """
@@ -795,19 +876,15 @@ class Scavenger(Animal):
     def scavenge(self):
         """
         This method is called when the scavenger scavenges.
+        The scavenger looks for the nearest corpse within its speed, to move to and eat.
+        :return: the corpse, or None if there is none in range
         """
-        self.check_nearby_tiles()
-        if self.nearby_occupied_tiles:
-            nearest_dead_animal = min(
-                self.nearby_occupied_tiles,
-                key=lambda x: abs(x.position[0] - self.position[0]),
-            )
-        else:
-            nearest_dead_animal = None
-        if nearest_dead_animal and isinstance(nearest_dead_animal, Corpse):
-            # the scavenger will change its position to an unoccupied tile adjacent to the dead animal
-            self.check_nearby_tiles()
-            self.position = random.choice(self.nearby_unoccupied_tiles)
+        home = environment.buildings.Zoo.load_instance(self.home_id)
+        if nearest := home.spatial_index().nearest(
+            Corpse, self.position[0], self.position[1], radius=self.speed
+        ):
+            return nearest[0][3]
+        return None
 
     def turn(self, turn_number):
         """
@@ -830,16 +907,9 @@ class Lion(Predator):
     This is the class for lions.
     """
 
-    def __init__(self, home_id):
-        """
-        This method is called when the lion is created.
-        """
-        super().__init__(home_id)
-        self.strength = 5
-        self.size = 5
-        self.favorite_food = Zebra
-        self.emoji = "🦁"
-        self.max_age = 10 * 365
+    __slots__ = ()
+
+    emoji = "🦁"
 
     def __str__(self):
         """
@@ -854,16 +924,9 @@ class Zebra(Prey):
     This is the class for zebras.
     """
 
-    def __init__(self, home_id):
-        """
-        This method is called when the zebra is created.
-        """
-        super().__init__(home_id)
-        self.favorite_food = Grass
-        self.speed = 5
-        self.size = 3
-        self.emoji = "🦓"
-        self.max_age = 10 * 365
+    __slots__ = ()
+
+    emoji = "🦓"
 
     def __str__(self):
         """
@@ -878,16 +941,9 @@ class Elephant(Herbivore):
     This is the class for elephants.
     """
 
-    def __init__(self, home_id):
-        """
-        This method is called when the elephant is created.
-        """
-        super().__init__(home_id)
-        self.strength = 10
-        self.size = 10
-        self.favorite_food = Tree
-        self.emoji = "🐘"
-        self.max_age = 30 * 365
+    __slots__ = ()
+
+    emoji = "🐘"
 
     def __str__(self):
         """
@@ -902,16 +958,9 @@ class Hyena(Scavenger):
     This is the class for hyenas.
     """
 
-    def __init__(self, home_id):
-        """
-        This method is called when the hyena is created.
-        """
-        super().__init__(home_id)
-        self.strength = 3
-        self.size = 3
-        self.favorite_food = Corpse
-        self.emoji = "🦡"
-        self.max_age = 10 * 365
+    __slots__ = ()
+
+    emoji = "🦡"
 
     def __str__(self):
         """
@@ -926,16 +975,9 @@ class Giraffe(Prey):
     This is the class for giraffes.
     """
 
-    def __init__(self, home_id):
-        """
-        This method is called when the giraffe is created.
-        """
-        super().__init__(home_id)
-        self.favorite_food = Tree
-        self.speed = 3
-        self.size = 5
-        self.emoji = "🦒"
-        self.max_age = 10 * 365
+    __slots__ = ()
+
+    emoji = "🦒"
 
     def __str__(self):
         """
@@ -950,16 +992,9 @@ class Rhino(Herbivore):
     This is the class for rhinos.
     """
 
-    def __init__(self, home_id):
-        """
-        This method is called when the rhino is created.
-        """
-        super().__init__(home_id)
-        self.strength = 7
-        self.size = 7
-        self.favorite_food = Bush
-        self.emoji = "🦏"
-        self.max_age = 10 * 365
+    __slots__ = ()
+
+    emoji = "🦏"
 
     def __str__(self):
         """
@@ -967,3 +1002,28 @@ class Rhino(Herbivore):
         """
 
         return "Rhino"
+
+
+# the templates of the species, each only names what differs from its parent class
+register(
+    Animal,
+    strength=1,
+    speed=1,
+    size=1,
+    favorite_food=None,
+    max_age=10 * 365,
+    max_energy=100,
+    max_hunger=100,
+    max_thirst=100,
+)
+register(Carnivore, favorite_food=Animal)
+register(Herbivore, favorite_food=Plant)
+register(Predator, favorite_food=Prey)
+register(Prey, favorite_food=Plant)
+register(Scavenger, favorite_food=Corpse)
+register(Lion, strength=5, size=5, favorite_food=Zebra)
+register(Zebra, speed=5, size=3, favorite_food=Grass)
+register(Elephant, strength=10, size=10, favorite_food=Tree, max_age=30 * 365)
+register(Hyena, strength=3, size=3, favorite_food=Corpse)
+register(Giraffe, speed=3, size=5, favorite_food=Tree)
+register(Rhino, strength=7, size=7, favorite_food=Bush)
@@ -1,4 +1,5 @@
 from assets import GameAsset
+from organisms.species import PackedStat, unbound_state
 
 
 class Corpse(GameAsset):
@@ -6,16 +7,31 @@ class Corpse(GameAsset):
     This is the class for dead animals.
     """
 
+    __slots__ = ("former_animal", "nutrients", "position", "home_id", "is_alive", "engine_cell")
+
+    emoji = "💀"
+    size = PackedStat(GameAsset.size)
+
     def __init__(self, former_animal=None):
         """
         This method is called when the dead animal is created.
         """
+        # the (engine, row, column) the corpse is a view of, None while it isn't bound
+        self.engine_cell = None
         super().__init__()
         self.former_animal = former_animal.__str__()
         self.nutrients = former_animal.size + former_animal.virility
         self.size = former_animal.size
         self.position = former_animal.position
-        self.emoji = "💀"
+        self.home_id = getattr(former_animal, "home_id", None)
+        self.is_alive = True
+
+    @property
+    def nutrition(self):
+        """
+        :return: how much eating the corpse feeds an animal, the nutrients it has left
+        """
+        return self.nutrients
 
     def die(self, zoo):
         """
@@ -25,15 +41,35 @@ class Corpse(GameAsset):
         self.size -= 1
         self.nutrients -= 1
         if self.size <= 0:
-            zoo.grid[self.position[0]][self.position[1]] = None
+            self.is_alive = False
+            zoo.clear_cell(self.position[0], self.position[1])
 
-    def turn(self, *args, **kwargs):
+    def turn(self, turn_number=None, zoo=None):
         """
         This method is called when the dead animal turns.
         """
+        if zoo is None:
+            import environment.buildings  # pylint: disable=import-outside-toplevel
 
-        self.die(*args, **kwargs)
+            zoo = environment.buildings.Zoo.load_instance(self.home_id)
+        self.die(zoo)
         return "decomposed"
 
+    def __getstate__(self):
+        """
+        This method is called when the corpse is pickled, its size is kept in the corpse rather
+        than in the engine it is bound to.
+        """
+        _, state = super().__getstate__()
+        return None, unbound_state(self, state)
+
+    def __setstate__(self, state):
+        """
+        This method is called when a pickled corpse is loaded, it is unbound until it is put on
+        a grid again.
+        """
+        self.engine_cell = None
+        super().__setstate__(state)
+
     def __str__(self):
         return "Corpse"
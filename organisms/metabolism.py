@@ -0,0 +1,118 @@
+"""
+The batched metabolism phase.
+Instead of every animal ageing and checking its own pulse during its turn, the zoo runs this
+phase once per turn over arrays of every living animal. While the grid engine is switched on
+the stats are read from and written to the engine's arrays, the animals are bound to their
+cells, otherwise they are packed from the animals and written back.
+The drains are per turn by default, which is what the intent model uses. The in place model
+passes no drains: its animals pay for every step they take when they move, as they always
+have, so an animal that stays put only ages.
+"""
+import numpy as np
+
+# how much each stat drains every turn
+DRAINS = {
+    "hunger": 1,
+    "thirst": 1,
+    "energy": 1,
+}
+
+# the stats the drains apply to
+STATS = ("hunger", "thirst", "energy")
+
+# the first matching cause is recorded when an animal dies
+CAUSES_OF_DEATH = ("old age", "starvation", "dehydration", "exhaustion")
+
+
+def pack(animals, attributes):
+    """
+    Pack the attributes of a list of animals into arrays.
+    :param animals: the animals to pack
+    :param attributes: the names of the attributes to pack
+    :return: a dictionary of attribute name to array
+    """
+    return {
+        name: np.fromiter(
+            (getattr(animal, name) for animal in animals),
+            dtype=np.int64,
+            count=len(animals),
+        )
+        for name in attributes
+    }
+
+
+def bound_engine(animals):
+    """
+    :param animals: the animals
+    :return: the engine every animal is bound to, or None if any of them isn't bound to it
+    """
+    cells = [animal.engine_cell for animal in animals]
+    engine = cells[0][0] if cells[0] is not None else None
+    if engine is None or any(cell is None or cell[0] is not engine for cell in cells):
+        return None
+    return engine
+
+
+def metabolize(animals, turn_number, drains=None, skipped=None):
+    """
+    Apply one turn of drains, ageing and death checks to every living animal at once.
+    :param animals: the animals in the zoo
+    :param turn_number: the current turn
+    :param drains: optional override of the per turn drains, {} to only age and check them
+    :param skipped: optional dictionary of animals to the number of turns they skipped,
+        e.g. while asleep, which are drained on top of this one
+    :return: a list of the animals that died this turn
+    """
+    if drains is None:
+        drains = DRAINS
+    living = [animal for animal in animals if animal.is_alive]
+    if not living:
+        return []
+    engine = bound_engine(living)
+    if engine is not None:
+        cells = (animal.engine_cell for animal in living)
+        xs, ys = np.array([cell[1:] for cell in cells], dtype=np.intp).T
+        stats = {name: engine.fields[name][xs, ys].astype(np.int64) for name in STATS}
+    else:
+        stats = pack(living, STATS)
+    stats.update(pack(living, ("birth_turn", "max_age")))
+    elapsed = 1
+    if skipped:
+        elapsed += np.fromiter(
+            (skipped.get(animal, 0) for animal in living),
+            dtype=np.int64,
+            count=len(living),
+        )
+    for name, drain in drains.items():
+        stats[name] -= drain * elapsed
+    age = np.maximum(turn_number - stats["birth_turn"], 0)
+
+    causes = np.select(
+        [
+            age > stats["max_age"],
+            stats["hunger"] <= 0,
+            stats["thirst"] <= 0,
+            stats["energy"] <= 0,
+        ],
+        list(range(1, len(CAUSES_OF_DEATH) + 1)),
+        default=0,
+    )
+
+    if engine is not None:
+        for name in STATS:
+            engine.fields[name][xs, ys] = stats[name]
+        engine.age[xs, ys] = age
+    else:
+        for index, animal in enumerate(living):
+            for name in STATS:
+                setattr(animal, name, int(stats[name][index]))
+            animal.age = int(age[index])
+    for animal in living:
+        animal.metabolised_turn = turn_number
+
+    deaths = []
+    for index in np.nonzero(causes)[0].tolist():
+        animal = living[index]
+        animal.die(CAUSES_OF_DEATH[causes[index] - 1])
+        deaths.append(animal)
+    return deaths
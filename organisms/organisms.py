@@ -3,13 +3,33 @@ This module contains the base classes for all organisms.
 """
 
 import logging
-from uuid import uuid4
+import zlib
 
 from faker import Faker
 
+import environment.rng
+from database.ids import next_id
 from assets import GameAsset
+from organisms.species import PackedStat, unbound_state
 
-faker = Faker()
+# names are picked from a pool made once by a seeded Faker, asking Faker for every organism
+# costs more than the rest of making it
+NAME_POOL_SIZE = 1000
+NAME_SEED = 0
+name_pool = []
+
+
+def names():
+    """
+    This function returns the pool of names, making it the first time it is needed.
+    The pool is the same on every run, so an organism keeps its name when it is loaded again.
+    :return: a list of names
+    """
+    if not name_pool:
+        faker = Faker()
+        faker.seed_instance(NAME_SEED)
+        name_pool.extend(faker.name() for _ in range(NAME_POOL_SIZE))
+    return name_pool
 
 
 class Organism(GameAsset):
@@ -17,20 +37,79 @@ class Organism(GameAsset):
     This is the base class for all organisms.
     """
 
+    __slots__ = (
+        "id",
+        "is_alive",
+        "_name",
+        "home_id",
+        "cause_of_death",
+        "position",
+        "_overrides",
+        "engine_cell",
+    )
+
+    emoji = "🤷"
+    size = PackedStat(GameAsset.size)
+
     def __init__(self, home_id):
         """
         This method is called when an organism is created.
         :param home_id:
         """
+        # the (engine, row, column) the organism is a view of, None while it isn't bound
+        self.engine_cell = None
         super().__init__()
-        self.id = uuid4()  # pylint: disable=invalid-name
+        self.id = next_id(home_id)  # pylint: disable=invalid-name
         self.is_alive = True
-        self.emoji = "🤷"
-        self.name = faker.name()
+        # the stats that differ from the species template, see organisms.species
+        self._overrides = None
         self.home_id = home_id
-        self.title = f"{self.name} the {self.__class__.__name__}"
         self.cause_of_death = None
 
+    @property
+    def name(self):
+        """
+        The name of the organism, picked from the pool by its id the first time it is read.
+        :return:
+        """
+        try:
+            return self._name
+        except AttributeError:
+            pool = names()
+            self._name = pool[zlib.crc32(str(self.id).encode()) % len(pool)]
+            return self._name
+
+    @name.setter
+    def name(self, name):
+        self._name = name
+
+    @property
+    def title(self):
+        """
+        :return: the name and kind of the organism, e.g. "Jane Doe the Lion"
+        """
+        return f"{self.name} the {self.__class__.__name__}"
+
+    def __setstate__(self, state):
+        """
+        This method is called when a pickled organism is loaded.
+        Organisms pickled before the species templates carry every stat, the ones that match
+        the template are dropped again.
+        :param state: the pickled state
+        :return:
+        """
+        self._overrides = None
+        self.engine_cell = None
+        super().__setstate__(state)
+
+    def __getstate__(self):
+        """
+        This method is called when an organism is pickled, its packed stats are kept in the
+        organism rather than in the engine it is bound to.
+        """
+        _, state = super().__getstate__()
+        return None, unbound_state(self, state)
+
     def refresh_home_id(self, home_id):
         """
         This method refreshes the home id of the organism.
@@ -39,6 +118,14 @@ class Organism(GameAsset):
         """
         self.home_id = home_id
 
+    def rolls(self, subsystem):
+        """
+        This method gets a stream of random numbers from the organism's zoo.
+        :param subsystem: the name of the subsystem, e.g. "combat"
+        :return: a RollStream
+        """
+        return environment.rng.stream(self.home_id, subsystem)
+
     def __str__(self):
         """
         This method is called when an organism is printed.
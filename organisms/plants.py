@@ -1,11 +1,11 @@
 import contextlib
 import itertools
 import logging
-import random
 
 import environment.buildings
 from organisms.dead_things import Corpse
 from organisms.organisms import Organism
+from organisms.species import PackedStat, SpeciesStat, register
 
 
 class Plant(Organism):
@@ -13,29 +13,44 @@ class Plant(Organism):
     This is the class for plants.
     """
 
+    __slots__ = (
+        "_age",
+        "nearby_occupied_tiles",
+        "unoccupied_tiles",
+        "nearby_unoccupied_tiles",
+        "birth_turn",
+    )
+
+    emoji = "🌱"
+    age = PackedStat()
+    # the stats every plant of a species starts with, registered at the end of the module
+    nutrition = SpeciesStat()
+    favorite_food = SpeciesStat()
+    max_age = SpeciesStat()
+    # the chance to grow each turn, and whether the plant spreads seeds to empty neighbours
+    growth_chance = 0.01
+    seeds = True
+
     def __init__(self, home_id):
         """
         This method is called when the plant is created.
         """
         super().__init__(home_id)
-        self.size = 1
+        self.size = self.species["size"]
         self.age = 1
-        self.nutrition = 1
-        self.favorite_food = Corpse
         self.position = [0, 0]
-        self.emoji = "🌱"
-        self.max_age = 15 * 365
-        self.nearby_occupied_tiles = []
-        self.unoccupied_tiles = []
-        self.nearby_unoccupied_tiles = []
+        # shared until the plant first looks at its neighbours
+        self.nearby_occupied_tiles = ()
+        self.unoccupied_tiles = ()
+        self.nearby_unoccupied_tiles = ()
         self.birth_turn = 1
 
     def grow(self):
         """
         This method is called when the plant grows.
         """
-        # roll a d100 if it is 1 then the plant grows by 1
-        if random.randint(1, 100) == 1:
+        # by default roll a d100, if it is 1 then the plant grows by 1
+        if self.rolls("growth").random() < self.growth_chance:
             self.size += 1
 
     def die(self):
@@ -44,10 +59,8 @@ class Plant(Organism):
         """
         try:
             home = environment.buildings.Zoo.load_instance(self.home_id)
-            home._instance = None
             self.is_alive = False
-            home.grid[self.position[0]][self.position[1]] = None
-            home.reprocess_tiles()
+            home.clear_cell(self.position[0], self.position[1])
         except (TypeError, ValueError) as e:
             logging.error(e)
 
@@ -120,11 +133,10 @@ class Plant(Organism):
         """
         home = environment.buildings.Zoo.load_instance(self.home_id)
         baby_plant = self.__class__(home_id=self.home_id)
-        baby_plant.position = random.choice(self.unoccupied_tiles)
+        baby_plant.position = self.rolls("growth").choice(self.unoccupied_tiles)
         self.unoccupied_tiles.remove(baby_plant.position)
         self.nearby_unoccupied_tiles.remove(baby_plant.position)
-        home.grid[baby_plant.position[0]][baby_plant.position[1]] = baby_plant
-        home.reprocess_tiles()
+        home.set_cell(baby_plant.position[0], baby_plant.position[1], baby_plant)
         return baby_plant
 
 
@@ -133,12 +145,9 @@ class Tree(Plant):
     This is the class for trees.
     """
 
-    def __init__(self, home_id):
-        """
-        This method is called when the tree is created.
-        """
-        super().__init__(home_id)
-        self.emoji = "🌳"
+    __slots__ = ()
+
+    emoji = "🌳"
 
     def __str__(self):
         """
@@ -153,12 +162,9 @@ class Bush(Plant):
     This is the class for bushes.
     """
 
-    def __init__(self, home_id):
-        """
-        This method is called when the bush is created.
-        """
-        super().__init__(home_id)
-        self.emoji = "🌿"
+    __slots__ = ()
+
+    emoji = "🌿"
 
     def __str__(self):
         """
@@ -173,12 +179,9 @@ class Grass(Plant):
     This is the class for grass.
     """
 
-    def __init__(self, home_id):
-        """
-        This method is called when the grass is created.
-        """
-        super().__init__(home_id)
-        self.emoji = "🌾"
+    __slots__ = ()
+
+    emoji = "🌾"
 
     def __str__(self):
         """
@@ -186,3 +189,6 @@ class Grass(Plant):
         """
 
         return "Grass"
+
+
+register(Plant, size=1, nutrition=1, favorite_food=Corpse, max_age=15 * 365)
@@ -0,0 +1,160 @@
+"""
+Species templates: the stats every organism of a species starts with, held once per species.
+A species is registered with the stats that set it apart from its parent class, e.g.
+register(Lion, strength=5, size=5), and its template is the parent's template updated with
+them. An organism reads its stats through SpeciesStat descriptors, which return the template's
+value unless that organism's own value differs, and only those differences are kept on the
+organism (and pickled with it).
+The stats that change every turn (size, hunger, thirst, ...) are PackedStat descriptors
+instead: while the organism is in a cell of a zoo with the grid engine switched on they live in
+the engine's arrays, and the organism is a view of its cell.
+"""
+
+# the template of every registered class, by class
+TEMPLATES = {}
+
+
+def register(kind, **stats):
+    """
+    Register the template of a class of organisms.
+    :param kind: the class
+    :param stats: the stats that differ from the template of its parent class
+    :return: the template
+    """
+    template = dict(getattr(kind, "species", None) or {})
+    template.update(stats)
+    kind.species = TEMPLATES[kind] = template
+    return template
+
+
+def template_of(kind):
+    """
+    :return: the template of a class, the one of its closest registered parent if it has none
+    """
+    return getattr(kind, "species", None) or {}
+
+
+class SpeciesStat:
+    """
+    A stat of an organism that comes from the template of its species until it is set to
+    something else. The values that differ are kept in the organism's _overrides dictionary,
+    which is None while there are none.
+    """
+
+    __slots__ = ("name",)
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return template_of(owner).get(self.name, self)
+        overrides = instance._overrides
+        if overrides is not None and self.name in overrides:
+            return overrides[self.name]
+        return instance.species[self.name]
+
+    def __set__(self, instance, value):
+        overrides = instance._overrides
+        # the engine packs some species stats, e.g. strength, when the organism is put in a cell
+        cell = getattr(instance, "engine_cell", None)
+        if cell is not None and self.name in cell[0].fields:
+            cell[0].fields[self.name][cell[1], cell[2]] = value
+        if instance.species.get(self.name, self) == value:
+            if overrides is not None:
+                overrides.pop(self.name, None)
+                if not overrides:
+                    instance._overrides = None
+            return
+        if overrides is None:
+            overrides = instance._overrides = {}
+        overrides[self.name] = value
+
+    def __delete__(self, instance):
+        """
+        Go back to the value of the template.
+        """
+        self.__set__(instance, instance.species[self.name])
+
+
+class PackedStat:
+    """
+    A stat that the grid engine packs in its arrays. While the thing is bound to a cell of an
+    engine (its engine_cell is (engine, row, column)) the stat is read from and written to the
+    engine's array of the same name, otherwise it is kept in a slot of the thing, by default
+    the slot named after the stat with a leading underscore.
+    """
+
+    __slots__ = ("name", "slot")
+
+    def __init__(self, slot=None):
+        """
+        :param slot: the member descriptor of the slot the stat is kept in while unbound
+        """
+        self.slot = slot
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        if self.slot is None:
+            self.slot = owner.__dict__[f"_{name}"]
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        cell = instance.engine_cell
+        if cell is None:
+            return self.slot.__get__(instance)
+        return int(cell[0].fields[self.name][cell[1], cell[2]])
+
+    def __set__(self, instance, value):
+        cell = instance.engine_cell
+        if cell is None:
+            self.slot.__set__(instance, value)
+        else:
+            cell[0].fields[self.name][cell[1], cell[2]] = value
+
+
+# the packed stats of every class, by class
+PACKED_STATS = {}
+
+
+def packed_stats(kind):
+    """
+    :return: a dictionary of the PackedStat descriptors of a class by name
+    """
+    if kind not in PACKED_STATS:
+        PACKED_STATS[kind] = {
+            name: stat
+            for name in dir(kind)
+            if isinstance(stat := getattr(kind, name, None), PackedStat)
+        }
+    return PACKED_STATS[kind]
+
+
+def unbind(thing):
+    """
+    Take a thing off the cell of the engine it is bound to, its packed stats are copied from
+    the arrays back into its slots.
+    :param thing: the thing
+    :return:
+    """
+    if thing.engine_cell is None:
+        return
+    values = {name: getattr(thing, name) for name in packed_stats(type(thing))}
+    thing.engine_cell = None
+    for name, value in values.items():
+        setattr(thing, name, value)
+
+
+def unbound_state(thing, state):
+    """
+    Make the pickled state of a thing hold its packed stats rather than the engine it is
+    bound to.
+    :param thing: the thing being pickled
+    :param state: the dictionary of its slots
+    :return: the state
+    """
+    if state.pop("engine_cell", None) is not None:
+        for name, stat in packed_stats(type(thing)).items():
+            state[stat.slot.__name__] = getattr(thing, name)
+    return state
@@ -0,0 +1,91 @@
+"""
+The batched plant phase.
+Instead of every plant rolling its own growth, checking its own neighbours and placing its own
+seedling, the zoo runs this phase once per turn over arrays of every living plant: one draw
+for who grows, one pass for ageing and one set of array operations to pick where the seeds
+land. Per-species behaviour comes from the class attributes of each plant (growth_chance,
+seeds).
+"""
+import numpy as np
+
+from environment.fields import OFFSETS
+from organisms.metabolism import pack
+
+
+def seeding_targets(xs, ys, empty, uniform):
+    """
+    Pick an empty neighbouring cell for every plant at once.
+    When several plants pick the same cell the first one in the list gets it.
+    :param xs: the rows of the plants
+    :param ys: the columns of the plants
+    :param empty: a boolean array of the empty cells of the grid, or an array-like that
+        can be indexed with arrays of rows and columns
+    :param uniform: a function returning an array of random floats of a given shape
+    :return: the indices of the plants that seed, and the rows and columns they seed
+    """
+    height, width = empty.shape
+    offsets = np.array(OFFSETS)
+    nx = xs[:, None] + offsets[:, 0]
+    ny = ys[:, None] + offsets[:, 1]
+    inside = (nx >= 0) & (nx < height) & (ny >= 0) & (ny < width)
+    candidates = inside & empty[np.clip(nx, 0, height - 1), np.clip(ny, 0, width - 1)]
+    # a random key for every candidate, the largest one is the pick
+    keys = np.where(candidates, uniform(candidates.shape), -1.0)
+    picks = keys.argmax(axis=1)
+    seeders = np.nonzero(candidates.any(axis=1))[0]
+    target_x = nx[seeders, picks[seeders]]
+    target_y = ny[seeders, picks[seeders]]
+    _, first = np.unique(target_x * width + target_y, return_index=True)
+    first.sort()
+    return seeders[first], target_x[first], target_y[first]
+
+
+def grow_plants(zoo, plants, turn_number):
+    """
+    Run one turn of dying, growing, seeding and ageing for every plant at once.
+    :param zoo: the zoo the plants live in
+    :param plants: the living plants on the grid
+    :param turn_number: the current turn
+    :return: the plants that died and the seedlings that sprouted
+    """
+    if not plants:
+        return [], []
+    rolls = zoo.rng.stream("growth")
+    stats = pack(plants, ("age", "max_age", "birth_turn"))
+    chances = np.fromiter(
+        (plant.growth_chance for plant in plants), dtype=float, count=len(plants)
+    )
+    dying = stats["max_age"] <= stats["age"]
+    grows = ~dying & (rolls.uniform(len(plants)) < chances)
+    age = turn_number - stats["birth_turn"]
+
+    died = []
+    for index in np.nonzero(dying)[0].tolist():
+        plant = plants[index]
+        plant.is_alive = False
+        zoo.clear_cell(plant.position[0], plant.position[1])
+        died.append(plant)
+    for index in np.nonzero(grows)[0].tolist():
+        plants[index].size += 1
+    for plant, plant_age in zip(plants, age.tolist()):
+        if plant.is_alive:
+            plant.age = plant_age
+
+    seedlings = []
+    if zoo.full:
+        return died, seedlings
+    can_seed = ~dying & np.fromiter(
+        (plant.seeds for plant in plants), dtype=bool, count=len(plants)
+    )
+    parents = np.nonzero(can_seed)[0]
+    xs = np.fromiter((plants[i].position[0] for i in parents), dtype=int, count=len(parents))
+    ys = np.fromiter((plants[i].position[1] for i in parents), dtype=int, count=len(parents))
+    seeders, target_x, target_y = seeding_targets(xs, ys, zoo.empty_mask(), rolls.uniform)
+    for index, x, y in zip(seeders.tolist(), target_x.tolist(), target_y.tolist()):
+        parent = plants[parents[index]]
+        seedling = parent.__class__(home_id=parent.home_id)
+        seedling.position = [x, y]
+        seedling.birth_turn = turn_number
+        zoo.set_cell(x, y, seedling)
+        seedlings.append(seedling)
+    return died, seedlings
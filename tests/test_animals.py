@@ -9,6 +9,7 @@ import pytest
 
 import environment.liquids
 import organisms.animals
+import organisms.metabolism
 import organisms.plants
 
 
@@ -96,3 +97,51 @@ class TestAnimals:
         )  # animal stepped on grass, so it's still there
         assert mock_zoo.grid[1][0].__class__.__name__ == "Animal"
         assert mock_zoo.grid[1][1].__class__.__name__ == "Grass"
+
+    def test_metabolism_drains_and_ages_animals(self, mock_zoo, fake_animal):
+        """
+        Test that the batched metabolism phase drains and ages every living animal.
+        """
+        fake_animal.birth_turn = 1
+        deaths = organisms.metabolism.metabolize([fake_animal], turn_number=5)
+        assert deaths == []
+        assert fake_animal.hunger == 49
+        assert fake_animal.thirst == 49
+        assert fake_animal.energy == 49
+        assert fake_animal.age == 4
+
+    def test_metabolism_drains_the_engine_arrays(self, mock_zoo, fake_animal):
+        """
+        Test that the metabolism phase drains and ages animals bound to the engine in its arrays.
+        """
+        engine = mock_zoo.enable_engine()
+        fake_animal.position = [0, 0]
+        fake_animal.birth_turn = 1
+        mock_zoo.set_cell(0, 0, fake_animal)
+        assert fake_animal.engine_cell == (engine, 0, 0)
+        organisms.metabolism.metabolize([fake_animal], turn_number=3)
+        assert engine.hunger[0, 0] == 49
+        assert engine.age[0, 0] == 2
+        assert fake_animal.thirst == 49
+
+    def test_metabolism_without_drains_only_ages(self, mock_zoo, fake_animal):
+        """
+        Test that the in place model's metabolism phase leaves the drains to the moves.
+        """
+        fake_animal.birth_turn = 1
+        organisms.metabolism.metabolize([fake_animal], turn_number=5, drains={})
+        assert fake_animal.hunger == 50
+        assert fake_animal.age == 4
+
+    def test_metabolism_reports_deaths(self, mock_zoo, fake_animal):
+        """
+        Test that animals that run out of water die during the metabolism phase.
+        """
+        fake_animal.position = [0, 0]
+        mock_zoo.grid[0][0] = fake_animal
+        fake_animal.thirst = 1
+        deaths = organisms.metabolism.metabolize([fake_animal], turn_number=2)
+        assert deaths == [fake_animal]
+        assert not fake_animal.is_alive
+        assert fake_animal.cause_of_death == "dehydration"
+        assert mock_zoo.grid[0][0].__class__.__name__ == "Corpse"
@@ -0,0 +1,57 @@
+"""
+Tests for the sparse, chunked grid.
+"""
+import pytest
+
+import environment.buildings
+import environment.chunks
+import organisms.plants
+
+
+class TestChunkedGrid:
+    """
+    Class for tests around the behaviour of the ChunkedGrid.
+    """
+
+    def test_chunks_are_allocated_on_demand(self):
+        """
+        Test that only the chunks that hold something are allocated, that a crowded chunk
+        moves to a list and that emptied chunks can be freed again.
+        """
+        changes = []
+        grid = environment.chunks.ChunkedGrid(
+            10, 12, chunk_size=4, on_change=lambda *change: changes.append(change)
+        )
+        grass = [organisms.plants.Grass(home_id=None) for _ in range(6)]
+        grid[1][1] = grass[0]
+        grid[9][-1] = grass[1]
+        assert len(grid.chunks) == 2 and (len(grid), len(grid[0])) == (10, 12)
+        assert grid[9][11] is grass[1] and grid[5][5] is None
+        assert changes == [(1, 1, None, grass[0]), (9, 11, None, grass[1])]
+        for y, thing in enumerate(grass[2:]):
+            grid[0][y] = thing
+        assert isinstance(grid.chunks[(0, 0)].cells, list)
+        assert [thing for _, _, thing in grid.items()] == [*grass[2:], grass[0], grass[1]]
+        assert grid.count(lambda cell: cell is None) == 10 * 12 - 6
+        with pytest.raises(IndexError):
+            grid[10][0] = grass[0]
+        for x, y, _ in list(grid.items()):
+            grid[x][y] = None
+        assert grid.compact() == 2 and not grid.chunks
+
+    def test_sparse_zoo(self):
+        """
+        Test that a sparse zoo counts its vacant cells and schedules its plants from the
+        chunks, and that filling in the blanks doesn't allocate any.
+        """
+        zoo = environment.buildings.Zoo(height=300, width=300, sparse=True)
+        tree = organisms.plants.Tree(home_id=zoo.id)
+        tree.position = [250, 10]
+        zoo.set_cell(250, 10, tree)
+        zoo.fill_blanks()
+        assert isinstance(zoo.grid, environment.chunks.ChunkedGrid)
+        assert len(zoo.grid.chunks) == 1
+        assert zoo.vacant_cells == zoo.count_vacant_cells() == 300 * 300 - 1
+        assert zoo.holds(tree) and list(zoo.scheduler) == [tree]
+        zoo.grid = zoo.grid
+        assert zoo.empty_mask()[[250, 0], [10, 0]].tolist() == [False, True]
@@ -0,0 +1,50 @@
+"""
+Tests for the array-backed grid engine.
+"""
+import environment.engine
+import organisms.animals
+
+
+class TestGridEngine:
+    """
+    Class for tests around the behaviour of the GridEngine.
+    """
+
+    def test_engine_packs_the_grid(self, mock_zoo):
+        """
+        Test that the engine sees the same cells as the grid of objects.
+        """
+        engine = mock_zoo.enable_engine()
+        assert engine.count(environment.engine.PLANT) == 4
+        assert engine.count(environment.engine.EMPTY) == 0
+
+    def test_engine_round_trips_animal_stats(self, mock_zoo):
+        """
+        Test that changes made to the arrays are written back onto the animals.
+        """
+        animal = organisms.animals.Zebra(home_id=mock_zoo.id)
+        animal.position = [1, 1]
+        mock_zoo.grid[1][1] = animal
+        engine = mock_zoo.enable_engine()
+        assert engine.count(environment.engine.ANIMAL) == 1
+        assert engine.hunger[1, 1] == animal.hunger
+        engine.hunger[engine.mask(environment.engine.ANIMAL)] -= 10
+        engine.store(mock_zoo.grid)
+        assert animal.hunger == 40
+
+    def test_animals_are_views_of_their_cell(self, mock_zoo):
+        """
+        Test that an animal on the grid reads and writes its stats in the arrays, and keeps
+        them when it leaves the grid, without the engine being packed again.
+        """
+        engine = mock_zoo.enable_engine()
+        animal = organisms.animals.Zebra(home_id=mock_zoo.id)
+        animal.position = [1, 1]
+        mock_zoo.set_cell(1, 1, animal)
+        animal.hunger = 7
+        assert engine.hunger[1, 1] == 7
+        engine.thirst[1, 1] = 3
+        assert animal.thirst == 3
+        mock_zoo.clear_cell(1, 1)
+        assert engine.count(environment.engine.ANIMAL) == 0
+        assert (animal.hunger, animal.thirst, animal.engine_cell) == (7, 3, None)
@@ -0,0 +1,153 @@
+"""
+Tests for the distance fields.
+"""
+import numpy as np
+
+import environment.buildings
+import environment.fields
+import organisms.plants
+
+
+class TestDistanceField:
+    """
+    Class for tests around the behaviour of DistanceField objects.
+    """
+
+    def test_distance_is_number_of_moves(self):
+        """
+        Test that distances count moves in any of the eight directions.
+        """
+        sources = np.zeros((5, 6), dtype=bool)
+        sources[0, 0] = True
+        sources[4, 5] = True
+        field = environment.fields.DistanceField(sources)
+        assert field.distance_at(0, 0) == 0
+        assert field.distance_at(2, 2) == 2
+        assert field.distance_at(3, 4) == 1
+        assert field.nearest(1, 1) == (0, 0)
+        assert field.nearest(3, 3) == (4, 5)
+
+    def test_step_towards_nearest_source(self):
+        """
+        Test that following the steps always reaches the nearest source.
+        """
+        sources = np.zeros((8, 8), dtype=bool)
+        sources[6, 1] = True
+        field = environment.fields.DistanceField(sources)
+        x, y = 0, 7
+        for _ in range(field.distance_at(x, y)):
+            dx, dy = field.step_towards(x, y)
+            x, y = x + dx, y + dy
+        assert (x, y) == (6, 1)
+        assert field.step_towards(6, 1) == (0, 0)
+
+    def test_no_sources(self):
+        """
+        Test that a field without sources has no distances.
+        """
+        field = environment.fields.DistanceField(np.zeros((3, 3), dtype=bool))
+        assert field.distance_at(1, 1) is None
+        assert field.nearest(1, 1) is None
+
+    def test_flow_field_goes_around_what_is_in_the_way(self):
+        """
+        Test that a field limited to the passable cells leads around a wall and that cells
+        walled off from every source have no distance.
+        """
+        sources = np.zeros((5, 5), dtype=bool)
+        sources[0, 0] = True
+        passable = np.ones((5, 5), dtype=bool)
+        # a wall across the grid with a gap in the last column
+        passable[2, :4] = False
+        field = environment.fields.DistanceField(sources, passable=passable)
+        assert field.distance_at(4, 0) == 8
+        x, y = 4, 0
+        for _ in range(field.distance_at(x, y)):
+            dx, dy = field.step_towards(x, y)
+            x, y = x + dx, y + dy
+            assert passable[x, y]
+        assert (x, y) == (0, 0)
+        passable[2, 4] = False
+        field = environment.fields.DistanceField(sources, passable=passable)
+        assert field.distance_at(4, 0) is None
+
+
+class TestCachedField:
+    """
+    Class for tests around the behaviour of CachedField objects.
+    """
+
+    def test_changes_out_of_reach_keep_the_field(self):
+        """
+        Test that a change further from a cell than its nearest source leaves the cached
+        distances as they are, and a change in reach has the field worked out again.
+        """
+        sources = np.zeros((30, 30), dtype=bool)
+        sources[2, 2] = True
+        field = environment.fields.CachedField(lambda: sources)
+        assert field.distance_at(4, 4) == 2
+        cached = field.field
+        sources[28, 28] = True
+        field.forget(28, 28)
+        assert field.distance_at(4, 4) == 2
+        assert field.field is cached
+        sources[4, 6] = True
+        field.forget(4, 6)
+        assert field.distance_at(4, 4) == 2
+        assert field.field is not cached
+        assert field.step_towards(4, 5) == (0, 1)
+        assert field.nearest(27, 27) == (28, 28)
+
+    def test_zoo_keeps_the_field_of_a_far_change(self):
+        """
+        Test that a dense zoo doesn't work out a flow field again for a cell when something
+        of its class comes or goes far away from it.
+        """
+        zoo = environment.buildings.Zoo(height=30, width=30)
+        grass = organisms.plants.Grass(zoo.id)
+        grass.position = [2, 2]
+        zoo.set_cell(2, 2, grass)
+        field = zoo.get_flow_field(organisms.plants.Grass)
+        assert field.distance_at(5, 5) == 3
+        cached = field.field
+        zoo.set_cell(25, 25, organisms.plants.Grass(zoo.id))
+        assert field.distance_at(5, 5) == 3
+        assert field.field is cached
+        zoo.clear_cell(2, 2)
+        assert field.distance_at(5, 5) == 20
+        assert field.field is not cached
+
+
+class TestLocalField:
+    """
+    Class for tests around the behaviour of LocalField objects.
+    """
+
+    def test_blocks_match_the_whole_field_in_reach(self):
+        """
+        Test that a field worked out block by block agrees with the whole grid field for
+        the sources in reach, sees nothing beyond them and forgets the blocks a change is in.
+        """
+        sources = np.zeros((40, 40), dtype=bool)
+        sources[5, 5] = True
+        passable = np.ones((40, 40), dtype=bool)
+        passable[3, :8] = False
+
+        def window_of(array):
+            return lambda window: array[window[0] : window[1], window[2] : window[3]]
+
+        whole = environment.fields.DistanceField(sources, passable=passable)
+        field = environment.fields.LocalField(
+            40, 40, window_of(sources), window_of(passable), block_size=8, reach=8
+        )
+        for x, y in [(0, 0), (10, 2), (12, 12)]:
+            assert field.distance_at(x, y) == whole.distance_at(x, y)
+            assert field.nearest(x, y) == whole.nearest(x, y) == (5, 5)
+            assert field.step_towards(x, y) == whole.step_towards(x, y)
+        assert field.distance_at(39, 39) is None
+        assert field.step_towards(39, 39) == (0, 0)
+        sources[38, 38] = True
+        assert field.distance_at(39, 39) is None
+        field.forget(38, 38)
+        assert field.distance_at(39, 39) == 1
+        assert (0, 0) in field.blocks
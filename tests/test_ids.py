@@ -0,0 +1,28 @@
+"""
+Tests for the integer ids of the entities of a zoo.
+"""
+import uuid
+
+import database.ids
+import organisms.plants
+
+
+class TestIdAllocator:
+    """
+    Class for tests around handing out the ids of a zoo.
+    """
+
+    def test_ids_increase_and_survive_a_reload(self):
+        """
+        Test that a zoo hands out increasing ids under its own number, that a fresh allocator
+        carries on after the reserved block and that ids turn into the same UUID every time.
+        """
+        zoo_id = str(uuid.uuid4())
+        first, second = (organisms.plants.Grass(home_id=zoo_id).id for _ in range(2))
+        assert second == first + 1
+        number = database.ids.zoo_number(first)
+        assert number > 0 and database.ids.zoo_number(second) == number
+        reloaded = database.ids.IdAllocator(zoo_id).allocate()
+        assert reloaded == first + database.ids.BLOCK_SIZE
+        assert database.ids.as_uuid(zoo_id, first) == database.ids.as_uuid(zoo_id, first)
+        assert database.ids.zoo_number(organisms.plants.Grass(home_id=None).id) == 0
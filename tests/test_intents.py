@@ -0,0 +1,109 @@
+"""
+Tests for the intent/resolve turn model.
+"""
+import environment.buildings
+import environment.intents
+import organisms.animals
+import organisms.plants
+
+
+def make_snapshot(things, height=3, width=3):
+    """
+    Make a snapshot of a small grid with things at their positions.
+    """
+    grid = [[None for _ in range(width)] for _ in range(height)]
+    for thing in things:
+        grid[thing.position[0]][thing.position[1]] = thing
+    return environment.intents.GridSnapshot(grid)
+
+
+def place(thing, x, y):
+    """
+    Give a thing a position and return it.
+    """
+    thing.position = [x, y]
+    return thing
+
+
+class TestIntents:
+    """
+    Class for tests around deciding and resolving intents.
+    """
+
+    def test_conflicts_do_not_depend_on_order(self):
+        """
+        Test that two animals moving into the same cell are settled the same way whichever
+        intent comes first.
+        """
+        first = place(organisms.animals.Elephant(home_id=None), 0, 0)
+        second = place(organisms.animals.Elephant(home_id=None), 0, 2)
+        snapshot = make_snapshot([first, second])
+        intents = [
+            environment.intents.Intent("move", (0, 2), target=(0, 1)),
+            environment.intents.Intent("move", (0, 0), target=(0, 1)),
+        ]
+        accepted = environment.intents.resolve(intents, snapshot, 7, 1)
+        assert accepted == environment.intents.resolve(intents[::-1], snapshot, 7, 1)
+        assert [intent.source for intent in accepted] == [(0, 0)]
+
+    def test_eaten_plant_does_not_act(self):
+        """
+        Test that a plant that is eaten loses its own intent and its cell goes to the eater.
+        """
+        elephant = place(organisms.animals.Elephant(home_id=None), 1, 0)
+        grass = place(organisms.plants.Grass(home_id=None), 1, 1)
+        snapshot = make_snapshot([elephant, grass])
+        intents = [
+            environment.intents.Intent("spawn", (1, 1), spawn_at=(1, 2)),
+            environment.intents.Intent("eat", (1, 0), target=(1, 1)),
+            environment.intents.Intent("move", (0, 0), target=(1, 1)),
+        ]
+        accepted = environment.intents.resolve(intents, snapshot, 7, 1)
+        assert [intent.kind for intent in accepted] == ["eat"]
+
+    def test_decide_is_repeatable_and_read_only(self):
+        """
+        Test that deciding twice with the same rolls gives the same intent and leaves the
+        entity and the snapshot untouched.
+        """
+        elephant = place(organisms.animals.Elephant(home_id=None), 1, 1)
+        snapshot = make_snapshot([elephant])
+        before = elephant.__getstate__()
+        intents = [
+            environment.intents.decide(
+                elephant,
+                snapshot,
+                environment.intents.entity_rng(7, elephant.position, 3),
+            )
+            for _ in range(2)
+        ]
+        assert intents[0] == intents[1]
+        assert elephant.__getstate__() == before
+        assert snapshot.at(1, 1) is elephant
+
+    def test_rolls_follow_the_seed(self):
+        """
+        Test that the rolls of an entity depend on the seed of the zoo and the cell the entity
+        starts the turn in.
+        """
+        rolls = environment.intents.entity_rng(7, (1, 2), 1).random()
+        assert environment.intents.entity_rng(7, [1, 2], 1).random() == rolls
+        assert environment.intents.entity_rng(7, (2, 1), 1).random() != rolls
+        assert environment.intents.entity_rng(8, (1, 2), 1).random() != rolls
+
+    def test_snapshot_keeps_the_start_of_the_turn(self):
+        """
+        Test that a snapshot of a zoo still answers with what was in a cell after the cell
+        changed, and that only the changed cell is copied.
+        """
+        zoo = environment.buildings.Zoo(height=3, width=3)
+        elephant = place(organisms.animals.Elephant(home_id=None), 1, 1)
+        zoo.set_cell(1, 1, elephant)
+        snapshot = environment.intents.GridSnapshot(zoo.grid, fields=zoo.get_flow_field)
+        zoo.snapshots.append(snapshot)
+        zoo.clear_cell(1, 1)
+        zoo.set_cell(1, 1, place(organisms.plants.Grass(home_id=None), 1, 1))
+        zoo.snapshots.remove(snapshot)
+        assert snapshot.at(1, 1) is elephant
+        assert [cell for _, _, cell in snapshot.within(0, 0, 1)] == [None, None, elephant]
+        assert list(snapshot.before) == [(1, 1)]
@@ -0,0 +1,37 @@
+"""
+Tests for the compact entities and the memory report.
+"""
+import pickle
+
+import memory_report
+import organisms.animals
+
+
+class TestMemoryReport:
+    """
+    Class for tests around the size of the entities of a zoo.
+    """
+
+    def test_entities_are_slotted_and_smaller(self):
+        """
+        Test that no entity carries a __dict__ and that every kind is smaller than it was.
+        """
+        for entity in memory_report.sample_entities():
+            assert not hasattr(entity, "__dict__")
+        results = memory_report.report(count=200)
+        assert set(results) == {
+            type(entity).__name__ for entity in memory_report.sample_entities()
+        }
+        assert all(sizes["after"] < sizes["before"] for sizes in results.values())
+
+    def test_entities_pickled_with_a_dict_still_load(self):
+        """
+        Test that an entity pickled before the slots loads, skipping the class metadata.
+        """
+        lion = organisms.animals.Lion(home_id=None)
+        lion.hunger = 7
+        state = {**memory_report.slot_state(lion), "emoji": "x", "query": "lion"}
+        loaded = organisms.animals.Lion.__new__(organisms.animals.Lion)
+        loaded.__setstate__(state)
+        assert (loaded.hunger, loaded.emoji, loaded.query) == (7, "🦁", "lion")
+        assert pickle.loads(pickle.dumps(loaded)).title == lion.title
@@ -0,0 +1,48 @@
+"""
+Tests for the Monte Carlo runner.
+"""
+import json
+
+import monte_carlo
+
+
+class TestMonteCarlo:
+    """
+    Class for tests around running many seeded zoos.
+    """
+
+    def test_runs_stream_into_results_file(self, tmp_path):
+        """
+        Test that every seed is run in a worker with its own database and summarised.
+        """
+        output = tmp_path / "results.jsonl"
+        results = monte_carlo.run(
+            [1, 2, 1],
+            output,
+            workers=2,
+            turns=2,
+            height=6,
+            width=6,
+            database_dir=tmp_path,
+        )
+        summaries = [json.loads(line) for line in output.read_text().splitlines()]
+        assert sorted(summary["seed"] for summary in summaries) == [1, 1, 2]
+        assert results["runs"] == 3
+        assert (tmp_path / "zoo-2.db").exists()
+        # the same seed gives the same zoo
+        first, second = [summary for summary in summaries if summary["seed"] == 1]
+        assert first["population"] == second["population"]
+
+    def test_aggregate(self):
+        """
+        Test the survival statistics over a few summaries.
+        """
+        results = monte_carlo.aggregate(
+            [
+                {"seed": 0, "turns_survived": 10, "population": {"Lion": 2}, "wall_time": 1},
+                {"seed": 1, "turns_survived": 4, "population": {}, "wall_time": 2},
+            ]
+        )
+        assert results["survival_rate"] == 0.5
+        assert results["mean_turns_survived"] == 7
+        assert results["mean_population"] == {"Lion": 1}
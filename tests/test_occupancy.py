@@ -0,0 +1,60 @@
+"""
+Tests for the per-type occupancy bitmaps.
+"""
+import environment.liquids
+import environment.occupancy
+import organisms.plants
+
+
+class TestOccupancyIndex:
+    """
+    Class for tests around the behaviour of the OccupancyIndex.
+    """
+
+    def test_counts_within_radius(self):
+        """
+        Test that counts within a radius match what is on the grid, including subclasses.
+        """
+        grid = [[None for _ in range(5)] for _ in range(5)]
+        grid[0][0] = organisms.plants.Grass(home_id=None)
+        grid[4][4] = organisms.plants.Tree(home_id=None)
+        grid[2][2] = environment.liquids.Water()
+        index = environment.occupancy.OccupancyIndex.from_grid(grid)
+        assert index.count_within(organisms.plants.Plant, 2, 2, 2) == 2
+        assert index.count_within(organisms.plants.Grass, 2, 2, 2) == 1
+        assert index.count_within(organisms.plants.Plant, 1, 1, 1) == 1
+        assert not index.any_within(environment.liquids.Water, 0, 0, 1)
+        assert index.any_within(environment.liquids.Water, 0, 0, 2)
+
+    def test_updates_invalidate_tables(self):
+        """
+        Test that adding and removing things is reflected in later queries.
+        """
+        grid = [[None for _ in range(3)] for _ in range(3)]
+        index = environment.occupancy.OccupancyIndex.from_grid(grid)
+        water = environment.liquids.Water()
+        assert index.count_within(environment.liquids.Water, 1, 1, 1) == 0
+        index.add(1, 1, water)
+        assert index.count_within(environment.liquids.Water, 1, 1, 1) == 1
+        index.remove(1, 1, water)
+        assert index.count_within(environment.liquids.Water, 1, 1, 1) == 0
+        assert not index.all_within(environment.liquids.Water, 1, 1, 1)
+
+    def test_chunks_of_a_big_grid(self):
+        """
+        Test that counts add up across chunks, that a window of a bitmap only covers its
+        cells and that a chunk with nothing left in it is freed.
+        """
+        index = environment.occupancy.OccupancyIndex(300, 300, chunk_size=64)
+        water = environment.liquids.Water()
+        index.add(63, 63, water)
+        index.add(64, 64, water)
+        index.add(250, 10, organisms.plants.Grass(home_id=None))
+        assert index.count_within(environment.liquids.Water, 63, 63, 1) == 2
+        assert index.count_within(organisms.plants.Plant, 250, 10, 0) == 1
+        window = index.bitmap(environment.liquids.Water, (60, 70, 60, 70))
+        assert window.shape == (10, 10)
+        assert window[3, 3] and window[4, 4] and window.sum() == 2
+        index.remove(64, 64, water)
+        assert (1, 1) not in index.bitmaps[environment.liquids.Water]
+        assert index.count_within(environment.liquids.Water, 64, 64, 0) == 0
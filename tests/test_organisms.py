@@ -3,6 +3,7 @@ Tests for the behaviour of organisms.
 """
 import environment.buildings
 import organisms.organisms
+import organisms.plants
 
 
 class TestOrganisms:
@@ -20,3 +21,17 @@ class TestOrganisms:
         organism.position = [x_pos, y_pos]
         mock_zoo.grid[x_pos][y_pos] = organism
         assert organism.id is not None
+
+    def test_names_are_picked_on_first_use(self):
+        """
+        Test that an organism has no name until it is read, and then keeps the one its id picks.
+        """
+        grass = organisms.plants.Grass(home_id=None)
+        assert "_name" not in grass.__getstate__()[1]
+        assert grass.name in organisms.organisms.names()
+        assert grass.title == f"{grass.name} the Grass"
+        twin = organisms.plants.Grass(home_id=None)
+        twin.id = grass.id
+        assert twin.name == grass.name
+        twin.name = "Fern"
+        assert twin.title == "Fern the Grass"
@@ -0,0 +1,43 @@
+"""
+Tests for paging the chunks of a grid to the database.
+"""
+import uuid
+
+import environment.buildings
+import environment.paging
+import environment.scheduler
+import organisms.plants
+
+
+class TestPagedChunkGrid:
+    """
+    Class for tests around the behaviour of the PagedChunkGrid.
+    """
+
+    def test_chunks_are_paged_under_the_budget(self):
+        """
+        Test that only the budget of chunks stays in memory, that evicted chunks are written
+        back and read in again on first use, and that vacant cells are counted from the store.
+        """
+        store = environment.paging.ChunkStore(
+            str(uuid.uuid4()),
+            environment.buildings.is_vacant,
+            environment.scheduler.takes_turns,
+        )
+        loaded, evicted = [], []
+        grid = environment.paging.PagedChunkGrid(
+            8, 8, store, budget=1, chunk_size=4, on_load=loaded.extend, on_evict=evicted.extend
+        )
+        first, second = (organisms.plants.Bush(home_id=None) for _ in range(2))
+        first.size = 7
+        grid[0][1] = first
+        grid[5][6] = second
+        assert list(grid.chunks) == [(1, 1)]
+        assert evicted == [(0, 1, first)]
+        assert store.keys() == [(0, 0)]
+        assert grid[7][7] is None and list(grid.chunks) == [(1, 1)]
+        paged_in = grid[0][1]
+        assert paged_in is not first and paged_in.size == 7
+        assert loaded == [(0, 1, paged_in)]
+        assert grid.count(environment.buildings.is_vacant) == 64 - 2
+        assert sorted(store.busiest(5)) == [(0, 0), (1, 1)]
@@ -0,0 +1,48 @@
+"""
+Tests for the registry of the live zoos.
+"""
+import environment.buildings
+import organisms.plants
+from environment.buildings import Zoo
+
+
+def make_zoo():
+    """
+    Make a small zoo of grass.
+    """
+    return environment.buildings.create_zoo(
+        height=2,
+        width=2,
+        options=["plant"],
+        plants=[organisms.plants.Grass],
+        process_images=False,
+    )
+
+
+class TestZooRegistry:
+    """
+    Class for tests around holding several zoos in one process.
+    """
+
+    def test_zoos_are_handed_out_by_id_and_evicted_least_recently_used(self, monkeypatch):
+        """
+        Test that every zoo is live under its own id, that the least recently used one is
+        saved and evicted over the limit and that an invalidated zoo is read again.
+        """
+        Zoo.clear_instance()
+        monkeypatch.setattr(Zoo.registry, "limit", 2)
+        first, second = make_zoo(), make_zoo()
+        assert Zoo.load_instance(first.id) is first
+        assert Zoo.load_instance(second.id) is second
+        first.clear_cell(0, 0)
+        # first was used before second, so it goes when a third zoo comes in
+        Zoo.load_instance(first.id)
+        Zoo.load_instance(second.id)
+        third = make_zoo()
+        assert first.id not in Zoo.registry and len(Zoo.registry) == 2
+        reloaded = Zoo.load_instance(first.id)
+        assert reloaded is not first and reloaded.grid[0][0] is None
+        assert Zoo.load_instance(third.id) is third
+        assert Zoo.invalidate(third.id) is third
+        assert Zoo.load_instance(third.id) is not third
+        Zoo.clear_instance()
@@ -0,0 +1,43 @@
+"""
+Tests for the random number streams.
+"""
+import environment.rng
+
+
+class TestRandomService:
+    """
+    Class for tests around the behaviour of the RandomService.
+    """
+
+    def test_same_seed_same_rolls(self):
+        """
+        Test that two services with the same seed roll the same numbers, whatever order the
+        substreams are asked for in.
+        """
+        first = environment.rng.RandomService(seed=42)
+        second = environment.rng.RandomService(seed=42)
+        second.stream("combat").randint(1, 20)
+        weather = [first.stream("weather").randint(1, 6) for _ in range(2000)]
+        assert weather == [second.stream("weather").randint(1, 6) for _ in range(2000)]
+        assert set(weather) == {1, 2, 3, 4, 5, 6}
+        fresh = environment.rng.RandomService(seed=42)
+        assert [fresh.stream("combat").randint(1, 20) for _ in range(10)] != [
+            fresh.stream("weather").randint(1, 20) for _ in range(10)
+        ]
+
+    def test_choices(self):
+        """
+        Test that choices only pick from the options and respect zero weights.
+        """
+        rolls = environment.rng.RandomService(seed=1).stream("test")
+        assert {rolls.choice("ab") for _ in range(100)} == {"a", "b"}
+        assert {rolls.weighted_choice("abc", [1, 0, 1]) for _ in range(100)} == {"a", "c"}
+        assert rolls.rolls(1, 3, 50).max() <= 3
+
+    def test_service_per_zoo(self):
+        """
+        Test that a zoo keeps its service, and with it its place in every stream.
+        """
+        service = environment.rng.service_for("test-zoo", seed=3)
+        assert environment.rng.service_for("test-zoo", seed=4) is service
+        assert environment.rng.stream("test-zoo", "fill") is service.stream("fill")
@@ -0,0 +1,52 @@
+"""
+Tests for the active-entity scheduler.
+"""
+import environment.base_elements
+import environment.scheduler
+import organisms.plants
+
+
+class TestScheduler:
+    """
+    Class for tests around the behaviour of the Scheduler.
+    """
+
+    def test_registers_only_entities_that_take_turns(self):
+        """
+        Test that dirt is not registered and that entities keep their registration order.
+        """
+        grass = organisms.plants.Grass(home_id=None)
+        bush = organisms.plants.Bush(home_id=None)
+        dirt = environment.base_elements.Dirt()
+        scheduler = environment.scheduler.Scheduler([bush, dirt, grass, bush])
+        assert scheduler.snapshot() == [bush, grass]
+        assert dirt not in scheduler
+
+    def test_sweep_drops_dead_and_departed(self):
+        """
+        Test that the sweep drops dead entities and entities that left the grid.
+        """
+        alive, dead, departed = (organisms.plants.Grass(home_id=None) for _ in range(3))
+        scheduler = environment.scheduler.Scheduler([alive, dead, departed])
+        scheduler.mark_dead(dead)
+        assert scheduler.is_dead(dead)
+        assert scheduler.sweep(lambda entity: entity is not departed) == 2
+        assert scheduler.snapshot() == [alive]
+        assert not scheduler.is_dead(dead)
+
+    def test_parked_entities_wake_when_due(self):
+        """
+        Test that a parked entity stays registered but skips its turns until it wakes,
+        and that an entity that died while parked never wakes.
+        """
+        sleeper, doomed, awake = (organisms.plants.Grass(home_id=None) for _ in range(3))
+        scheduler = environment.scheduler.Scheduler([sleeper, doomed, awake])
+        scheduler.park(sleeper, turn=1, wake_turn=4)
+        scheduler.park(doomed, turn=1, wake_turn=2)
+        doomed.is_alive = False
+        assert scheduler.snapshot() == [awake]
+        assert sleeper in scheduler and len(scheduler) == 3
+        assert scheduler.wake(3) == {}
+        assert doomed not in scheduler
+        assert scheduler.wake(4) == {sleeper: 2}
+        assert scheduler.snapshot() == [awake, sleeper]
@@ -0,0 +1,180 @@
+"""
+Tests for the sharded turns of the intent/resolve model.
+"""
+import collections
+
+import environment.buildings
+import environment.intents
+import environment.sharding
+import organisms.animals
+import organisms.metabolism
+import organisms.plants
+from environment.grid import Tile
+
+
+def make_zoo(seed, height=8, width=16):
+    """
+    Make a small zoo full of animals, plants and water, its grid has a row per unit of width.
+    """
+    animals = [
+        organisms.animals.Elephant,
+        organisms.animals.Zebra,
+        organisms.animals.Lion,
+    ]
+    plants = [organisms.plants.Grass, organisms.plants.Bush]
+    return environment.buildings.create_zoo(
+        height=height,
+        width=width,
+        animals=animals,
+        plants=plants,
+        process_images=False,
+        seed=seed,
+    )
+
+
+def run_sharded(zoo, turns, shards):
+    """
+    Run a zoo over worker processes and take its stripes back.
+    :return: the number of turns run
+    """
+    turn = 0
+    with environment.sharding.ShardedZoo(zoo, shards) as sharded:
+        while turn < turns and sharded.take_turn(turn):
+            turn += 1
+        sharded.collect()
+    return turn
+
+
+def take_whole_turn(zoo, turn):
+    """
+    Take a turn of the intent/resolve model over the whole zoo in this process, like
+    main.take_turn does.
+    """
+    scheduler = zoo.scheduler
+    woken = scheduler.wake(turn)
+    for animal in woken:
+        animal.sleep_counter = 0
+    entities = scheduler.snapshot()
+    animals = [thing for thing in entities if isinstance(thing, organisms.animals.Animal)]
+    for thing in organisms.metabolism.metabolize(animals, turn_number=turn, skipped=woken):
+        scheduler.mark_dead(thing)
+    environment.intents.run_turn(
+        zoo,
+        [
+            thing
+            for thing in entities
+            if not scheduler.is_dead(thing) and thing.is_alive and zoo.holds(thing)
+        ],
+        turn,
+    )
+    scheduler.sweep(zoo.holds)
+    for animal in animals:
+        if animal.sleep_counter > 0 and animal.is_alive:
+            scheduler.park(animal, turn, wake_turn=turn + animal.sleep_counter + 1)
+    zoo.elapsed_turns += 1
+    zoo.advance_environment(verbose=False)
+
+
+def layout(zoo):
+    """
+    :return: what is in every occupied cell of a zoo, by position
+    """
+    cells = {}
+    for x, row in enumerate(zoo.grid):
+        for y, cell in enumerate(row):
+            thing = cell.type if isinstance(cell, Tile) else cell
+            if thing is not None:
+                cells[x, y] = (
+                    type(thing).__name__,
+                    getattr(thing, "hunger", None),
+                    getattr(thing, "size", None),
+                )
+    return cells
+
+
+class TestSharding:
+    """
+    Class for tests around the behaviour of the sharded turns.
+    """
+
+    def test_stripes_cover_every_row(self):
+        """
+        Test that the stripes cover every row once, even with more shards than rows.
+        """
+        assert environment.sharding.stripes(10, 3) == [(0, 3), (3, 7), (7, 10)]
+        assert environment.sharding.stripes(2, 4) == [(0, 1), (1, 2)]
+
+    def test_border_cells_stand_in_for_the_snapshot(self):
+        """
+        Test that border intents are resolved against the cells the workers sent back, an
+        empty cell going to the first claim on it.
+        """
+        elephant = organisms.animals.Elephant(home_id=None)
+        elephant.position = [3, 0]
+        cells = environment.sharding.BorderCells({(3, 0): elephant})
+        intents = [
+            environment.intents.Intent("move", (3, 0), target=(4, 0)),
+            environment.intents.Intent("move", (5, 0), target=(4, 0)),
+        ]
+        accepted = environment.intents.resolve(intents, cells, 7, 1)
+        assert [intent.source for intent in accepted] == [(3, 0)]
+        assert environment.sharding.rows_of(intents[0]) == [3, 4]
+
+    def test_intents_sharing_a_cell_settle_together(self):
+        """
+        Test that an intent is settled with the border intents when it shares a cell with
+        one, even through another intent, and otherwise stays with the stripe.
+        """
+        intents = [
+            environment.intents.Intent("move", (4, 0), target=(5, 0)),
+            environment.intents.Intent("eat", (7, 0), target=(6, 0)),
+            environment.intents.Intent("move", (5, 1), target=(6, 0)),
+            environment.intents.Intent("move", (5, 0), target=(5, 1)),
+            environment.intents.Intent("rest", (8, 3)),
+        ]
+        border, local = environment.sharding.border_intents(
+            intents, lambda intent: intent.source[0] == 7
+        )
+        assert border == intents[:4]
+        assert local == intents[4:]
+
+    def test_stripes_keep_every_entity_once(self):
+        """
+        Test that a zoo run over two workers keeps every entity in one cell, at its own
+        position, and the scheduler in step with the grid once the stripes are collected.
+        """
+        zoo = make_zoo(seed=5)
+        run_sharded(zoo, turns=12, shards=2)
+        ids = collections.Counter()
+        for x, row in enumerate(zoo.grid):
+            for y, cell in enumerate(row):
+                thing = cell.type if isinstance(cell, Tile) else cell
+                if getattr(thing, "id", None) is not None:
+                    ids[thing.id] += 1
+                    assert list(thing.position) == [x, y]
+        assert all(count == 1 for count in ids.values())
+        assert all(zoo.holds(entity) for entity in zoo.scheduler)
+        assert zoo.elapsed_turns == 12
+
+    def test_same_seed_same_run(self):
+        """
+        Test that two sharded runs of zoos with the same seed end the same way.
+        """
+        first, second = make_zoo(seed=9), make_zoo(seed=9)
+        assert run_sharded(first, turns=10, shards=2) == run_sharded(second, 10, 2)
+        assert layout(first) == layout(second)
+
+    def test_stripes_play_out_like_the_whole_zoo(self):
+        """
+        Test that a sharded run leaves every cell as a run of the whole zoo in one process
+        does, turn after turn, rain and all.
+        """
+        whole, striped = make_zoo(seed=3), make_zoo(seed=3)
+        assert layout(striped) == layout(whole)
+        with environment.sharding.ShardedZoo(striped, 3) as sharded:
+            assert len(sharded.bounds) == 3
+            for turn in range(8):
+                take_whole_turn(whole, turn)
+                sharded.take_turn(turn)
+                sharded.collect()
+                assert layout(striped) == layout(whole)
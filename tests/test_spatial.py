@@ -0,0 +1,130 @@
+"""
+Tests for the spatial hash of the animals and corpses.
+"""
+import environment.buildings
+import environment.spatial
+import organisms.animals
+import organisms.dead_things
+
+
+def make_zoo(height, width, animals):
+    """
+    Make a zoo with animals put at the given positions.
+    """
+    zoo = environment.buildings.Zoo(height=height, width=width)
+    for (x, y), animal_class in animals.items():
+        animal = animal_class(zoo.id)
+        animal.position = [x, y]
+        zoo.set_cell(x, y, animal)
+    return zoo
+
+
+class TestSpatialHash:
+    """
+    Class for tests around finding the animals nearest to a cell.
+    """
+
+    def test_nearest_counts_rows_and_columns(self):
+        """
+        Test that the nearest animals are found by their distance in rows and columns, across
+        buckets, for both metrics and within a radius.
+        """
+        zoo = make_zoo(
+            20,
+            20,
+            {
+                (10, 2): organisms.animals.Zebra,
+                (12, 11): organisms.animals.Zebra,
+                (2, 19): organisms.animals.Lion,
+                (14, 14): organisms.animals.Zebra,
+            },
+        )
+        index = environment.spatial.SpatialHash.from_grid(zoo.grid, bucket_size=4)
+        # the zebra on the same row is the furthest away
+        hits = index.nearest(organisms.animals.Zebra, 10, 10, k=2)
+        assert [(x, y) for _, x, y, _ in hits] == [(12, 11), (14, 14)]
+        assert index.nearest(organisms.animals.Animal, 10, 10, k=3, metric="euclidean")[2][
+            1:3
+        ] == (10, 2)
+        assert [
+            (x, y) for _, x, y, _ in index.within(organisms.animals.Animal, 10, 10, radius=4)
+        ] == [(12, 11), (14, 14)]
+        assert [
+            (x, y)
+            for _, x, y, _ in index.within(
+                organisms.animals.Animal, 10, 10, radius=4, metric="euclidean"
+            )
+        ] == [(12, 11)]
+        assert index.nearest(organisms.animals.Predator, 10, 10, radius=5) == []
+
+    def test_index_follows_the_grid(self):
+        """
+        Test that the index of a zoo is kept up to date as animals move, and that a predator
+        hunts the nearest prey in range.
+        """
+        zoo = make_zoo(
+            10,
+            10,
+            {(5, 5): organisms.animals.Lion, (5, 8): organisms.animals.Zebra},
+        )
+        environment.buildings.Zoo.clear_instance()
+        environment.buildings.Zoo.registry.add(zoo)
+        lion, zebra = zoo.grid[5][5], zoo.grid[5][8]
+        lion.speed = 2
+        assert lion.hunt() is None
+        zoo.clear_cell(5, 8)
+        zebra.position = [6, 6]
+        zoo.set_cell(6, 6, zebra)
+        assert lion.hunt() is zebra
+        assert zoo.spatial_index().nearest(organisms.animals.Zebra, 0, 9)[0][1:3] == (6, 6)
+        environment.buildings.Zoo.clear_instance()
+
+    def test_scavenger_eats_the_corpse_in_reach(self):
+        """
+        Test that a hungry scavenger taking its turn eats the corpse next to it and stays on the
+        grid.
+        """
+        zoo = make_zoo(6, 6, {(2, 2): organisms.animals.Hyena})
+        zoo.autosave = False
+        environment.buildings.Zoo.clear_instance()
+        environment.buildings.Zoo.registry.add(zoo)
+        hyena = zoo.grid[2][2]
+        zebra = organisms.animals.Zebra(zoo.id)
+        zebra.position = [2, 3]
+        corpse = organisms.dead_things.Corpse(zebra)
+        zoo.set_cell(2, 3, corpse)
+        hyena.hunger = 2
+        nutrition = corpse.nutrition
+        assert hyena.turn(turn_number=1) == "eat"
+        # the hyena steps into the corpse's cell and may wander off, each step costs 1 hunger
+        assert nutrition <= hyena.hunger <= 2 + nutrition
+        assert not corpse.is_alive
+        assert zoo.grid[2][3] is not corpse
+        assert zoo.holds(hyena)
+        environment.buildings.Zoo.clear_instance()
+
+    def test_predator_kills_the_prey_it_hunts(self):
+        """
+        Test that a hungry predator taking its turn attacks the prey it hunts down, leaving a
+        corpse where the prey was.
+        """
+        zoo = make_zoo(
+            8,
+            8,
+            {(4, 4): organisms.animals.Lion, (4, 5): organisms.animals.Zebra},
+        )
+        zoo.autosave = False
+        environment.buildings.Zoo.clear_instance()
+        environment.buildings.Zoo.registry.add(zoo)
+        lion, zebra = zoo.grid[4][4], zoo.grid[4][5]
+        lion.hunger = 2
+        # the attack always beats the defense and the first wound is fatal
+        lion.strength = 100
+        zebra.energy = 1
+        size = zebra.size
+        lion.turn(turn_number=1)
+        assert lion.hunger == 2 + size
+        assert zebra.cause_of_death == "predation"
+        assert isinstance(zoo.grid[4][5], organisms.dead_things.Corpse)
+        assert zoo.holds(lion)
+        environment.buildings.Zoo.clear_instance()
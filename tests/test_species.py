@@ -0,0 +1,33 @@
+"""
+Tests for the species templates.
+"""
+import pickle
+
+import organisms.animals
+import organisms.species
+
+
+class TestSpecies:
+    """
+    Class for tests around the stats organisms share with their species.
+    """
+
+    def test_only_stats_that_differ_are_kept(self):
+        """
+        Test that stats come from the template until they change, and that only the changed
+        ones are kept on the animal and pickled with it.
+        """
+        lion = organisms.animals.Lion(home_id=None)
+        assert (lion.strength, lion.size, lion.favorite_food) == (5, 5, organisms.animals.Zebra)
+        assert organisms.animals.Lion.max_hunger == 100 and lion._overrides is None
+        lion.strength = 6
+        lion.max_age = organisms.animals.Lion.max_age
+        assert lion._overrides == {"strength": 6}
+        loaded = pickle.loads(pickle.dumps(lion))
+        assert (loaded.strength, loaded.speed) == (6, 1)
+        del loaded.strength
+        assert loaded.strength == 5 and loaded._overrides is None
+        elephant = organisms.animals.Elephant.__new__(organisms.animals.Elephant)
+        elephant.__setstate__({"strength": 10, "speed": 2})
+        assert elephant._overrides == {"speed": 2}
+        assert organisms.species.template_of(organisms.animals.Elephant)["max_age"] == 30 * 365
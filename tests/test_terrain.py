@@ -0,0 +1,87 @@
+"""
+Tests for the terrain layer of the zoo.
+"""
+import database
+import environment.base_elements
+import environment.buildings
+import environment.liquids
+import environment.terrain
+import organisms.animals
+
+
+class TestTerrain:
+    """
+    Class for tests around the dirt and water under the occupants of the grid.
+    """
+
+    def test_blanks_are_filled_with_terrain_not_objects(self):
+        """
+        Test that dirt is laid in the terrain layer, stays vacant and shows as dirt, and that
+        water put on the grid keeps its size in the terrain.
+        """
+        zoo = environment.buildings.Zoo(height=3, width=3)
+        zoo.fill_blanks()
+        assert all(cell is None for row in zoo.grid for cell in row)
+        assert zoo.terrain.mask(environment.terrain.DIRT).all()
+        assert zoo.vacant_cells == 9
+        assert zoo.render_emojis()[1][1] == environment.base_elements.Dirt.emoji
+        zoo.make_puddle(1, 1, 4)
+        water = zoo.grid[1][1]
+        water.size -= 1
+        assert zoo.terrain.kind_at(1, 1) == environment.terrain.WATER
+        assert zoo.terrain.size_at(1, 1) == 3
+        zoo.clear_cell(1, 1)
+        assert water.size == 3 and zoo.terrain.kind_at(1, 1) == environment.terrain.BARE
+
+    def test_terrain_is_one_row_that_survives_a_reload(self):
+        """
+        Test that a zoo writes its water and dirt as one terrain row instead of a row each,
+        and gets them back when it is loaded again.
+        """
+        environment.buildings.Zoo.clear_instance()
+        zoo = environment.buildings.create_zoo(
+            height=6,
+            width=6,
+            options=["animal", "water"],
+            animals=[organisms.animals.Elephant],
+            process_images=False,
+            seed=3,
+        )
+        waters = {
+            (x, y): cell.size
+            for x, row in enumerate(zoo.grid)
+            for y, cell in enumerate(row)
+            if isinstance(cell, environment.liquids.Water)
+        }
+        dirt = zoo.terrain.mask(environment.terrain.DIRT).copy()
+        assert waters and dirt.any()
+        db = database.DatabaseConnection()
+        db.execute("SELECT COUNT(*) FROM terrain WHERE home_id = ?", [zoo.id])
+        assert db.fetchone()[0] == 1
+        environment.buildings.Zoo.clear_instance()
+        loaded = environment.buildings.Zoo.load_instance(zoo.id)
+        assert {
+            (x, y): cell.size
+            for x, row in enumerate(loaded.grid)
+            for y, cell in enumerate(row)
+            if isinstance(cell, environment.liquids.Water)
+        } == waters
+        assert (loaded.terrain.mask(environment.terrain.DIRT) == dirt).all()
+        environment.buildings.Zoo.clear_instance()
+
+    def test_window_of_a_sparse_layer(self):
+        """
+        Test that a window of a sparse layer only covers its own cells, and that a cell made
+        bare again drops out of it.
+        """
+        layer = environment.terrain.make_terrain(3000, 3000, sparse=True)
+        layer.set(100, 100, environment.terrain.WATER, 3)
+        layer.set(101, 130, environment.terrain.DIRT, 2)
+        layer.set(2000, 5, environment.terrain.WATER, 1)
+        window = layer.mask(environment.terrain.WATER, (90, 110, 90, 140))
+        assert window.shape == (20, 50)
+        assert window.sum() == 1 and window[10, 10]
+        assert layer.mask(environment.terrain.DIRT, (90, 110, 90, 140))[11, 40]
+        layer.clear(100, 100)
+        assert not layer.mask(environment.terrain.WATER, (90, 110, 90, 140)).any()
+        assert len(layer.chunks) == 2
@@ -0,0 +1,44 @@
+"""
+Tests for the batched plant phase.
+"""
+import numpy as np
+
+import organisms.plants
+import organisms.vegetation
+
+
+class TestVegetation:
+    """
+    Class for tests around growing and seeding every plant at once.
+    """
+
+    def test_seeding_targets_are_empty_neighbours(self):
+        """
+        Test that seeds only land on empty neighbouring cells and never two on one cell.
+        """
+        empty = np.zeros((3, 3), dtype=bool)
+        empty[1, 1] = True
+        xs, ys = np.array([0, 2, 0]), np.array([0, 2, 2])
+        seeders, target_x, target_y = organisms.vegetation.seeding_targets(
+            xs, ys, empty, np.random.default_rng(0).random
+        )
+        assert seeders.tolist() == [0]
+        assert (target_x.tolist(), target_y.tolist()) == ([1], [1])
+
+    def test_grow_plants_keeps_species(self, mock_zoo, monkeypatch):
+        """
+        Test that plants grow, seed and age together and seedlings take after their parent.
+        """
+        monkeypatch.setattr(organisms.plants.Tree, "growth_chance", 1)
+        monkeypatch.setattr(organisms.plants.Grass, "seeds", False)
+        tree = organisms.plants.Tree(home_id=mock_zoo.id)
+        tree.position = [0, 0]
+        grass = organisms.plants.Grass(home_id=mock_zoo.id)
+        grass.position = [1, 1]
+        mock_zoo.grid = [[tree, None], [None, grass]]
+        died, seedlings = organisms.vegetation.grow_plants(mock_zoo, [tree, grass], 5)
+        assert died == []
+        assert tree.size == 2
+        assert (tree.age, grass.age) == (4, 4)
+        assert [type(seedling) for seedling in seedlings] == [organisms.plants.Tree]
+        assert mock_zoo.grid[seedlings[0].position[0]][seedlings[0].position[1]] is seedlings[0]
@@ -0,0 +1,80 @@
+"""
+Tests for the weather engine.
+"""
+import environment.base_elements
+import environment.engine
+import environment.liquids
+import environment.rng
+import environment.weather
+import organisms.plants
+
+
+def make_engine():
+    """
+    Make an engine for a 4x4 grid with a column each of dirt, water, grass and nothing.
+    """
+    grid = [
+        [
+            environment.base_elements.Dirt(position=[x, 0]),
+            environment.liquids.Water(position=[x, 1]),
+            organisms.plants.Grass(home_id=None),
+            None,
+        ]
+        for x in range(4)
+    ]
+    return environment.engine.GridEngine.from_grid(grid)
+
+
+class TestWeather:
+    """
+    Class for tests around the behaviour of the rain.
+    """
+
+    def test_torrential_rain(self):
+        """
+        Test that torrential rain floods every dirt cell and only falls where it should.
+        """
+        rolls = environment.rng.RandomService(seed=1).cell_rolls("rain")
+        changes = environment.weather.rain_changes(make_engine(), "torrential", rolls)
+        effects = {"puddle": set(), "deepen": set()}
+        for effect, xs, ys, _ in changes:
+            effects[effect].update(zip(xs.tolist(), ys.tolist()))
+        assert {(x, 0) for x in range(4)} <= effects["puddle"]
+        assert all(y in (0, 2) for _, y in effects["puddle"])
+        assert all(y == 1 for _, y in effects["deepen"])
+        *_, deepen_amounts = changes[-1]
+        assert set(deepen_amounts.tolist()) <= set(range(1, 21))
+
+    def test_rain_is_seeded(self):
+        """
+        Test that the same seed rains on the same cells.
+        """
+        engine = make_engine()
+        first, second = (
+            environment.weather.rain_changes(
+                engine, "moderate", environment.rng.RandomService(seed=9).cell_rolls("rain")
+            )
+            for _ in range(2)
+        )
+        assert [xs.tolist() for _, xs, _, _ in first] == [xs.tolist() for _, xs, _, _ in second]
+        assert environment.weather.rain_changes(engine, "sunny", None) == []
+
+    def test_stripes_get_the_same_rain(self):
+        """
+        Test that raining on the rows of the grid a few at a time rains on the same cells, by
+        the same amounts, as raining on the whole grid.
+        """
+        engine = make_engine()
+        rolls = environment.rng.CellRolls(3)
+        whole = environment.weather.rain_changes(engine, "torrential", rolls)
+        parts = [
+            environment.weather.rain_changes(engine, "torrential", rolls, rows=rows)
+            for rows in ((0, 1), (1, 4))
+        ]
+        for index, (effect, xs, ys, amounts) in enumerate(whole):
+            cells = {
+                (x, y): amount
+                for part in parts
+                for x, y, amount in zip(*(values.tolist() for values in part[index][1:]))
+            }
+            assert cells == dict(zip(zip(xs.tolist(), ys.tolist()), amounts.tolist()))
@@ -1,13 +1,17 @@
 """
 Test for the zoo module.
 """
-from environment.buildings import zoo
+from environment.buildings import create_zoo
+import itertools
 from random import randint
 
 import pytest
 
 import database
+from environment.base_elements import Dirt
+from environment.buildings import ZooError
 from environment.grid import Tile
+from environment.liquids import Water
 from organisms.animals import Elephant
 from organisms.plants import Bush
 
@@ -154,3 +158,96 @@ class TestZooEntity:
         db.execute("SELECT * FROM animals")
         new_animal_count = len(db.fetchall())
         assert new_animal_count == animal_count
+
+
+class TestZooOccupancy:
+    """
+    Test the live vacancy count of the zoo.
+    """
+
+    def test_vacancy_count_follows_grid_changes(self, mock_zoo):
+        """
+        Test that every grid assignment keeps the vacancy count current.
+        """
+        assert mock_zoo.vacant_cells == 0
+        assert mock_zoo.full
+        mock_zoo.grid[0][0] = None
+        assert mock_zoo.vacant_cells == 1
+        assert not mock_zoo.full
+        mock_zoo.grid[0][0] = Dirt()
+        assert mock_zoo.vacant_cells == 1
+        mock_zoo.grid[0][0] = Bush(home_id=mock_zoo.id)
+        assert mock_zoo.vacant_cells == 0
+        assert mock_zoo.check_full()
+
+    def test_debug_mode_cross_checks_scan(self, mock_zoo):
+        """
+        Test that the debug mode catches a vacancy count that drifted from the grid.
+        """
+        mock_zoo.debug_occupancy = True
+        mock_zoo.grid[1][1] = None
+        assert not mock_zoo.check_full()
+        mock_zoo.vacant_cells += 1
+        with pytest.raises(ZooError):
+            mock_zoo.check_full()
+
+    def test_set_cell_records_dirty_cells(self, mock_zoo):
+        """
+        Test that grid changes are handed to each consumer once and bump the grid version.
+        """
+        assert mock_zoo.pop_dirty_cells("test") is None
+        version = mock_zoo.grid_version
+        mock_zoo.clear_cell(0, 1)
+        mock_zoo.set_cell(1, 0, Dirt())
+        assert mock_zoo.grid_version == version + 2
+        assert mock_zoo.pop_dirty_cells("test") == {(0, 1), (1, 0)}
+        assert mock_zoo.pop_dirty_cells("test") == set()
+
+    def test_render_only_redraws_changed_cells(self, mock_zoo):
+        """
+        Test that the rendered emojis follow grid changes.
+        """
+        first = mock_zoo.render_emojis()
+        mock_zoo.set_cell(0, 0, Dirt())
+        second = mock_zoo.render_emojis()
+        assert second[0][0] == Dirt().emoji
+        assert second[1] == first[1]
+
+    def test_persist_changes_writes_only_changed_cells(self, mock_zoo):
+        """
+        Test that persisting after a change only touches the changed occupants.
+        """
+        db = database.DatabaseConnection()
+        mock_zoo.pop_dirty_cells("persistence")
+        grass = mock_zoo.clear_cell(0, 0)
+        bush = mock_zoo.set_cell(0, 1, Bush(home_id=mock_zoo.id))
+        bush.position = [0, 1]
+        assert mock_zoo.persist_changes() == 3
+        db.execute("SELECT id FROM plants WHERE id=?", [str(grass.id)])
+        assert db.fetchone() is None
+        db.execute("SELECT id FROM plants WHERE id=?", [str(bush.id)])
+        assert db.fetchone() is not None
+        assert mock_zoo.persist_changes() == 0
+
+
+class TestZooWeather:
+    """
+    Test the rain on the zoo.
+    """
+
+    def test_torrential_rain_floods_dirt(self, mock_zoo):
+        """
+        Test that rain changes the cells it falls on through the grid, keeping the counts current.
+        """
+        mock_zoo.grid = [[Dirt(position=[x, y]) for y in range(2)] for x in range(2)]
+        cells = list(itertools.product(range(2), range(2)))
+        assert mock_zoo.vacant_cells == len(cells)
+        assert mock_zoo.apply_rain("torrential") == len(cells)
+        assert all(isinstance(cell, Water) for row in mock_zoo.grid for cell in row)
+        assert mock_zoo.vacant_cells == 0
+        sizes = [cell.size for row in mock_zoo.grid for cell in row]
+        deepened = mock_zoo.apply_rain("mist")
+        assert deepened == sum(
+            cell.size > size
+            for size, cell in zip(sizes, (cell for row in mock_zoo.grid for cell in row))
+        )